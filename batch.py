@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""Bilagskontroll uten GUI for mange klienter.
+
+Leser fakturaliste og hovedbok for hver klient i en mappe, trekker utvalg
+på samme måte som GUI-et (``df.sample(n, random_state=år)``) og skriver
+PDF-rapport og utvalget som Excel. Klientene behandles parallelt i egne
+prosesser, og tidsbruken per klient skrives til ``tidsbruk.csv``::
+
+    python batch.py klienter/ --sample 25 --year 2024 --out rapporter/
+
+Klientene finnes slik:
+
+* hver undermappe er én klient, med fakturalisten og eventuelt hovedboken
+  som ``.xlsx``-filer (hovedboken har «hovedbok» i filnavnet), eller
+* filer direkte i mappen grupperes på navnet uten «fakturaliste» eller
+  «hovedbok» til slutt, f.eks. ``Kunde AS fakturaliste.xlsx`` og
+  ``Kunde AS hovedbok.xlsx``.
+
+Får to klienter samme navn, får den siste et løpenummer, f.eks.
+«Kunde AS (2)».
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from helpers import logger
+from session import Session
+
+_LEDGER_WORD = "hovedbok"
+_INVOICE_WORD = "faktura"
+# Filrollen står til slutt i navnet, f.eks. «Kunde AS fakturaliste.xlsx»
+_ROLE_SUFFIX = re.compile(r"[\s_-]*(fakturaliste|faktura|hovedbok)$", re.IGNORECASE)
+
+SUMMARY_FILE = "tidsbruk.csv"
+SUMMARY_COLUMNS = [
+    "klient",
+    "status",
+    "bilag",
+    "utvalg",
+    "fakturaliste_s",
+    "hovedbok_s",
+    "utvalg_s",
+    "pdf_s",
+    "excel_s",
+    "totalt_s",
+    "feil",
+]
+
+
+@dataclass
+class Client:
+    name: str
+    invoice_path: str
+    gl_path: Optional[str] = None
+
+
+def _xlsx_files(folder: Path) -> list[Path]:
+    # Excel lager låsefiler som starter med «~$» mens filen er åpen
+    return sorted(
+        p for p in folder.iterdir()
+        if p.is_file() and p.suffix.lower() == ".xlsx" and not p.name.startswith("~$")
+    )
+
+
+def _client_from_files(name: str, files: list[Path]) -> Optional[Client]:
+    ledgers = [p for p in files if _LEDGER_WORD in p.name.lower()]
+    invoices = [p for p in files if p not in ledgers]
+    if len(invoices) > 1:
+        invoices = [p for p in invoices if _INVOICE_WORD in p.name.lower()] or invoices
+    if not invoices:
+        logger.warning(f"Fant ingen fakturaliste for {name}")
+        return None
+    if len(invoices) > 1 or len(ledgers) > 1:
+        logger.warning(f"Flere mulige filer for {name}; bruker {invoices[0].name}")
+    return Client(name, str(invoices[0]), str(ledgers[0]) if ledgers else None)
+
+
+def find_clients(folder) -> list[Client]:
+    """Finn klientene i ``folder``, se modulbeskrivelsen."""
+    folder = Path(folder)
+    clients = []
+    for sub in sorted(p for p in folder.iterdir() if p.is_dir()):
+        files = _xlsx_files(sub)
+        if files:
+            client = _client_from_files(sub.name, files)
+            if client is not None:
+                clients.append(client)
+
+    groups: dict[str, list[Path]] = {}
+    for path in _xlsx_files(folder):
+        name = _ROLE_SUFFIX.sub("", path.stem).strip(" _-") or path.stem
+        groups.setdefault(name, []).append(path)
+    for name, files in groups.items():
+        client = _client_from_files(name, files)
+        if client is not None:
+            clients.append(client)
+    return _unique_names(clients)
+
+
+def _unique_names(clients: list[Client]) -> list[Client]:
+    # Navnet brukes som mappe for rapportene og i tidsbruk.csv, så to klienter
+    # kan ikke dele det. Windows skiller ikke på store og små bokstaver.
+    seen: set = set()
+    for client in clients:
+        base, n = client.name, 1
+        while _safe_name(client.name).casefold() in seen:
+            n += 1
+            client.name = f"{base} ({n})"
+        if n > 1:
+            logger.warning(f"Flere klienter heter {base}; bruker {client.name}")
+        seen.add(_safe_name(client.name).casefold())
+    return clients
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[<>:"/\\|?*]+', "_", name).strip() or "klient"
+
+
+def write_sample_excel(session: Session, path: str) -> None:
+    """Skriv utvalget til Excel med kolonner for beslutning og kommentar."""
+    sample = session.sample_df
+    df = sample[[c for c in sample.columns if not str(c).startswith("_")]].copy()
+    df.insert(0, "Bilag", range(1, len(df) + 1))
+    df["Beslutning"] = [d or "" for d in session.decisions]
+    df["Kommentar"] = session.comments
+    df.to_excel(path, index=False, sheet_name="Utvalg")
+
+
+def run_client(
+    client: Client, n: int, year: int, out_dir: str, utfort_av: str = "", use_cache: bool = True
+) -> dict:
+    """Les, trekk utvalg og skriv rapporter for én klient.
+
+    Returnerer en rad til ``tidsbruk.csv``. Feil logges og gis som status,
+    slik at én ødelagt fil ikke stopper resten av kjøringen. Med
+    ``use_cache`` brukes samme mellomlager som GUI-et, se ``data_cache``.
+    """
+    import report
+
+    row = {"klient": client.name, "status": "ok", "bilag": 0, "utvalg": 0, "feil": ""}
+    t_start = time.perf_counter()
+    phase = "fakturaliste"
+    try:
+        session = Session()
+        session.utfort_av = utfort_av
+        t0 = time.perf_counter()
+        session.load_invoices(client.invoice_path, use_cache=use_cache)
+        row["fakturaliste_s"] = round(time.perf_counter() - t0, 3)
+        if not session.has_invoices:
+            raise ValueError("Fakturalisten ser tom ut")
+        session.kunde = session.kunde or client.name
+        if client.gl_path:
+            phase = "hovedbok"
+            t0 = time.perf_counter()
+            session.load_gl(client.gl_path, use_cache=use_cache)
+            row["hovedbok_s"] = round(time.perf_counter() - t0, 3)
+
+        phase = "utvalg"
+        t0 = time.perf_counter()
+        session.make_sample(n, year)
+        row["bilag"] = len(session.df)
+        row["utvalg"] = len(session.sample_df)
+        row["utvalg_s"] = round(time.perf_counter() - t0, 3)
+
+        target = Path(out_dir) / _safe_name(client.name)
+        target.mkdir(parents=True, exist_ok=True)
+        stem = f"bilagskontroll_{_safe_name(client.name)}_{year}"
+
+        phase = "pdf"
+        t0 = time.perf_counter()
+        report.write_report(session, str(target / f"{stem}.pdf"))
+        row["pdf_s"] = round(time.perf_counter() - t0, 3)
+
+        phase = "excel"
+        t0 = time.perf_counter()
+        write_sample_excel(session, str(target / f"{stem}_utvalg.xlsx"))
+        row["excel_s"] = round(time.perf_counter() - t0, 3)
+    except Exception as e:
+        logger.exception(f"Batch: {client.name} feilet under {phase}")
+        row["status"] = f"feil ({phase})"
+        row["feil"] = str(e)
+    row["totalt_s"] = round(time.perf_counter() - t_start, 3)
+    logger.info(f"Batch: {client.name} ferdig på {row['totalt_s']:.2f} s ({row['status']})")
+    return row
+
+
+def _init_worker() -> None:
+    import report
+
+    # Hver klient har sin egen prosess; rapporten skrives i samme prosess
+    report.PDF_WORKERS = 1
+
+
+def run_batch(
+    clients: list[Client], n: int, year: int, out_dir: str, workers: int = 1, **options
+) -> list[dict]:
+    """Kjør :func:`run_client` for alle klientene, parallelt med ``workers`` > 1.
+
+    ``options`` sendes videre til :func:`run_client`.
+    """
+    if workers <= 1 or len(clients) <= 1:
+        return [run_client(c, n, year, out_dir, **options) for c in clients]
+
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    rows: list = [None] * len(clients)
+    with ProcessPoolExecutor(
+        min(workers, len(clients)),
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+    ) as pool:
+        futures = {
+            pool.submit(run_client, c, n, year, out_dir, **options): pos
+            for pos, c in enumerate(clients)
+        }
+        for i, fut in enumerate(as_completed(futures), 1):
+            pos = futures[fut]
+            client = clients[pos]
+            try:
+                rows[pos] = fut.result()
+            except Exception as e:  # prosessen døde
+                logger.error(f"Batch: {client.name} stoppet uventet: {e}")
+                rows[pos] = {"klient": client.name, "status": "feil", "feil": str(e)}
+            print(f"[{i}/{len(clients)}] {client.name}: {rows[pos]['status']}")
+    return rows
+
+
+def write_summary(rows: list[dict], path: str) -> None:
+    """Skriv tidsbruk per klient som CSV med semikolon, slik norsk Excel leser den."""
+    with open(path, "w", newline="", encoding="utf-8-sig") as fh:
+        writer = csv.DictWriter(fh, SUMMARY_COLUMNS, delimiter=";", extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Bilagskontroll uten GUI for mange klienter.")
+    p.add_argument("folder", help="Mappe med fakturaliste og hovedbok per klient")
+    p.add_argument("--sample", type=int, required=True, help="Antall bilag i utvalget")
+    p.add_argument("--year", type=int, default=datetime.now().year, help="År (frø for utvalget)")
+    p.add_argument("--out", default="rapporter", help="Mappe for rapportene")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Antall prosesser")
+    p.add_argument("--no-cache", action="store_true", help="Ikke bruk mellomlageret for innleste filer")
+    p.add_argument("--utfort-av", default="", help="Navn i feltet «Utført av» i rapporten")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    clients = find_clients(args.folder)
+    if not clients:
+        print(f"Fant ingen klienter i {args.folder}")
+        return 1
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    print(f"{len(clients)} klienter, utvalg {args.sample} bilag for {args.year}")
+
+    t0 = time.perf_counter()
+    rows = run_batch(
+        clients, args.sample, args.year, args.out, args.workers,
+        utfort_av=args.utfort_av, use_cache=not args.no_cache,
+    )
+    elapsed = time.perf_counter() - t0
+
+    summary = os.path.join(args.out, SUMMARY_FILE)
+    write_summary(rows, summary)
+    failed = [r for r in rows if r["status"] != "ok"]
+    print(f"Ferdig på {elapsed:.1f} s; {len(rows) - len(failed)} ok, {len(failed)} feilet")
+    for r in failed:
+        print(f"  {r['klient']}: {r['status']} {r.get('feil', '')}")
+    print(f"Tidsbruk per klient: {summary}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    # Nødvendig for arbeidsprosessene i en pakket .exe
+    multiprocessing.freeze_support()
+    sys.exit(main())
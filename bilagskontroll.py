@@ -1,5 +1,24 @@
 # -*- coding: utf-8 -*-
-from gui import App
+
+
+def main(argv=None):
+    from startup import ImportProfiler, parse_args
+
+    args = parse_args(argv)
+    profiler = None
+    if args.profile_startup:
+        # Installeres før ``gui`` importeres, slik at alle importer måles
+        profiler = ImportProfiler()
+        profiler.install()
+
+    from gui import App
+
+    App(profiler=profiler).mainloop()
+
 
 if __name__ == "__main__":
-    App().mainloop()
+    import multiprocessing
+
+    # Nødvendig for tolkeprosessene i en pakket .exe
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,131 @@
+"""Mellomlager på disk for innleste fakturalister og hovedbøker.
+
+Ferdig tolkede data lagres med ``pickle`` (protokoll 5) under
+``CONFIG_DIR/cache``. Nøkkelen er en hash av filinnholdet sammen med
+filstørrelse og endringstid, slik at en endret fil alltid leses på nytt.
+Mellomlageret begrenses til ``CACHE_MAX_MB``; filene som er brukt minst
+nylig slettes først.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from helpers import logger
+from helpers_path import CONFIG_DIR
+
+try:
+    from settings import CACHE_ENABLED, CACHE_MAX_MB
+except ImportError:  # pragma: no cover - valgfri innstilling
+    CACHE_ENABLED, CACHE_MAX_MB = True, 1024
+
+# Økes når formatet på lagrede data endres, slik at gamle filer ignoreres.
+CACHE_VERSION = 8
+CACHE_DIR = CONFIG_DIR / "cache"
+_SUFFIX = ".pkl"
+_CHUNK = 1024 * 1024
+
+
+def cache_key(path: str, kind: str, **params) -> str:
+    """Beregn nøkkel for ``path`` ut fra innhold, størrelse og endringstid."""
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{CACHE_VERSION}|{kind}|{sorted(params.items())}|".encode())
+    h.update(f"{st.st_size}|{st.st_mtime_ns}|".encode())
+    with open(path, "rb") as fh:
+        while chunk := fh.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}{_SUFFIX}"
+
+
+def load_entry(key: str) -> Optional[dict]:
+    """Hent lagrede data for ``key`` eller ``None`` ved bom."""
+    entry = _entry_path(key)
+    try:
+        with entry.open("rb") as fh:
+            payload = pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        logger.warning(f"Ugyldig mellomlager {entry.name}, sletter: {e}")
+        entry.unlink(missing_ok=True)
+        return None
+    try:
+        # Endringstiden brukes som LRU-markør ved opprydding.
+        os.utime(entry)
+    except OSError as e:
+        logger.debug(f"Kunne ikke oppdatere tidsstempel for {entry.name}: {e}")
+    return payload
+
+
+def store_entry(key: str, payload: dict) -> None:
+    """Lagre ``payload`` atomisk og rydd opp til størrelsesgrensen."""
+    entry = _entry_path(key)
+    tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as fh:
+            pickle.dump(payload, fh, protocol=5)
+        os.replace(tmp, entry)
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning(f"Kunne ikke skrive mellomlager: {e}")
+        tmp.unlink(missing_ok=True)
+        return
+    evict(CACHE_MAX_MB * 1024 * 1024)
+
+
+def evict(max_bytes: int) -> None:
+    """Slett minst nylig brukte filer til mellomlageret er under ``max_bytes``."""
+    try:
+        entries = [(p, p.stat()) for p in CACHE_DIR.glob(f"*{_SUFFIX}")]
+    except OSError as e:
+        logger.debug(f"Kunne ikke liste mellomlager: {e}")
+        return
+    total = sum(st.st_size for _, st in entries)
+    for p, st in sorted(entries, key=lambda e: e[1].st_mtime_ns):
+        if total <= max_bytes:
+            break
+        try:
+            p.unlink()
+            total -= st.st_size
+            logger.info(f"Slettet {p.name} fra mellomlager")
+        except OSError as e:
+            logger.debug(f"Kunne ikke slette {p.name}: {e}")
+
+
+def clear_cache() -> None:
+    """Tøm hele mellomlageret."""
+    evict(0)
+
+
+def cached_load(kind: str, path: str, build: Callable[[], dict], **params) -> dict:
+    """Hent data for ``path`` fra mellomlageret eller bygg dem med ``build``.
+
+    ``kind`` og ``params`` inngår i nøkkelen slik at ulike lesemåter av
+    samme fil ikke blandes.
+    """
+    if not CACHE_ENABLED:
+        return build()
+    t0 = time.perf_counter()
+    try:
+        key = cache_key(path, kind, **params)
+    except OSError as e:
+        logger.warning(f"Kunne ikke beregne nøkkel for mellomlager: {e}")
+        return build()
+    payload = load_entry(key)
+    if payload is not None:
+        logger.info(
+            f"Hentet {kind} fra mellomlager på {time.perf_counter() - t0:.2f} s"
+        )
+        return payload
+    payload = build()
+    store_entry(key, payload)
+    return payload
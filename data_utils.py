@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import re
-from typing import Optional, List
+from typing import Callable, Iterable, Optional, List
 from decimal import Decimal
 
-from helpers import parse_amount, logger
+from helpers import parse_ore_series, ore_to_decimal, logger
+from progress import ProgressCallback
 
 
+# Celler som matcher dette markerer en summeringsrad i fakturalisten
+_SUM_PATTERN = re.compile(r"\bsum\b", re.IGNORECASE)
+
+# Kolonner i den ferdige visningen av bilagslinjer fra hovedboken
+LEDGER_COLS: List[str] = ["Kontonr", "Konto", "Beskrivelse", "MVA", "MVA-beløp", "Beløp", "Postert av"]
+
+# Kolonner i hovedboken som leses i tillegg til dem fra ``guess_gl_columns``
+GL_EXTRA_COLUMNS: tuple[str, ...] = ("Fakturadato",)
+
 FALLBACK_NET_COLUMNS: List[str] = [
     "Beløp",
     "Belop",
@@ -23,20 +33,25 @@ def _pd():
     return pd
 
 
-def load_invoice_df(path: str, header_idx: int = 4) -> tuple[pd.DataFrame, Optional[str]]:
+def load_invoice_df(
+    path: str,
+    header_idx: int = 4,
+    progress: Optional[ProgressCallback] = None,
+    in_process: bool = False,
+) -> tuple[pd.DataFrame, Optional[str]]:
     """Leser fakturalisten fra Excel og henter også kundenavn.
 
     Returnerer en tupel med ``DataFrame`` og eventuelt kundenavn hvis dette
-    finnes i de øverste radene av filen.
+    finnes i de øverste radene av filen. ``progress`` kalles med antall
+    leste rader, se :mod:`progress`. Med ``in_process`` tolkes filen i en
+    egen prosess, se :mod:`excel_process`.
     """
     logger.info(f"Laster fakturaliste fra {path}")
+    _, columns, n = _read_sheet(path, None, progress, in_process, None)
+
     pd = _pd()
-    raw = pd.read_excel(
-        path,
-        engine="openpyxl",
-        header=None,
-        dtype=str,
-        engine_kwargs={"read_only": True},
+    raw = pd.DataFrame(
+        {i: col[:n] for i, col in enumerate(columns)}, columns=range(len(columns)), dtype=str
     )
     kunde = extract_customer_from_invoice_file(df=raw)
     df = raw.iloc[header_idx + 1 :].reset_index(drop=True)
@@ -44,34 +59,335 @@ def load_invoice_df(path: str, header_idx: int = 4) -> tuple[pd.DataFrame, Optio
     return df, kunde
 
 
-def load_gl_df(path: str, nrows: int = 10) -> pd.DataFrame:
-    """Leser hovedboken fra Excel.
+def _read_sheet(path, nrows, progress, in_process, usecols):
+    if in_process:
+        from excel_process import read_sheet_in_process
+
+        return read_sheet_in_process(path, nrows, progress, usecols)
+    return read_sheet(path, nrows, progress, usecols)
+
+
+def _cell_to_str(v) -> Optional[str]:
+    """Konverter en celleverdi fra ``openpyxl`` slik ``read_excel(dtype=str)`` gjør."""
+    if v is None:
+        return None
+    if isinstance(v, str):
+        return v
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
 
-    Leser et lite antall rader med ``openpyxl`` for å finne riktig header og
-    leser deretter hele filen én gang med ``pandas``.
+def _unique_columns(header: list) -> list:
+    """Lag unike kolonnenavn på samme måte som ``pandas``.
+
+    Tomme celler blir ``Unnamed: <n>`` og duplikater får suffiks ``.1``,
+    ``.2`` osv.
+    """
+    cols = []
+    seen: dict = {}
+    for i, name in enumerate(header):
+        if name is None or name == "":
+            name = f"Unnamed: {i}"
+        elif isinstance(name, float) and name.is_integer():
+            name = int(name)
+        base = name
+        n = seen.get(base, 0)
+        while name in seen:
+            n += 1
+            name = f"{base}.{n}"
+        seen[base] = n
+        seen[name] = 0
+        cols.append(name)
+    return cols
+
+
+# Hvor ofte innleserne rapporterer framdrift (antall rader)
+PROGRESS_EVERY = 2000
+
+
+def _stream_columns(rows, columns: list, progress=None, total=None, offset: int = 0):
+    """Strøm ``rows`` inn i kolonnelister.
+
+    Returnerer kolonnene og antall rader frem til og med siste rad med data.
+    ``offset`` er antall rader som allerede er lest, og brukes bare til
+    framdriften.
+    """
+    n_rows = 0
+    last_data_row = 0
+    for row in rows:
+        width = len(row)
+        if width > len(columns):
+            columns.extend([None] * n_rows for _ in range(width - len(columns)))
+        has_data = False
+        for col, v in zip(columns, row):
+            s = _cell_to_str(v)
+            if s is not None and s != "":
+                has_data = True
+            col.append(s)
+        for col in columns[width:]:
+            col.append(None)
+        n_rows += 1
+        if has_data:
+            last_data_row = n_rows
+        if progress is not None and n_rows % PROGRESS_EVERY == 0:
+            progress(offset + n_rows, total)
+    if progress is not None:
+        progress(offset + n_rows, offset + n_rows)
+    return columns, last_data_row
+
+
+def _trim_columns(columns: list, header: Optional[list], n_rows: int) -> list:
+    """Fjern tomme kolonner til høyre, slik ``read_excel`` gjør.
+
+    Med ``header`` fjernes bare kolonner der også headercellen er tom;
+    listen endres da på stedet.
+    """
+    def empty(i):
+        return (header is None or header[i] in (None, "")) and not any(
+            v not in (None, "") for v in columns[i][:n_rows]
+        )
+
+    if header is not None:
+        header += [None] * (len(columns) - len(header))
+    while columns and empty(len(columns) - 1):
+        columns.pop()
+        if header is not None:
+            header.pop()
+    return columns
+
+
+def _project_rows(rows, keep: list[int]):
+    """Plukk ut kolonnene ``keep`` fra hver rad; korte rader fylles med ``None``."""
+    from operator import itemgetter
+
+    if not keep:
+        return (() for _ in rows)
+    width = max(keep) + 1
+    pick = itemgetter(*keep)
+    single = len(keep) == 1
+
+    def gen():
+        for row in rows:
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            yield (pick(row),) if single else pick(row)
+
+    return gen()
+
+
+_PROJECTED_PARSER = None
+
+
+def _projected_parser_cls():
+    """Lag (én gang) en ``WorkSheetParser`` som bare tolker utvalgte kolonner.
+
+    ``openpyxl`` tolker ellers hver celle (tall, datoer, delte strenger)
+    før vi får raden. Her hoppes cellene i andre kolonner over rett etter
+    at kolonnen er lest fra cellereferansen.
+    """
+    global _PROJECTED_PARSER
+    if _PROJECTED_PARSER is None:
+        from openpyxl.utils.cell import column_index_from_string
+        from openpyxl.worksheet._reader import WorkSheetParser
+
+        class ProjectedParser(WorkSheetParser):
+            def __init__(self, *args, positions: dict[int, int], **kwargs):
+                super().__init__(*args, **kwargs)
+                self.positions = positions
+                self.letters: dict[str, int] = {}
+
+            def parse_row(self, row):
+                r = row.get("r")
+                self.row_counter = int(float(r)) if r else self.row_counter + 1
+                self.col_counter = 0
+                out = [None] * len(self.positions)
+                for el in row:
+                    coord = el.get("r")
+                    if coord:
+                        letters = coord.rstrip("0123456789")
+                        col = self.letters.get(letters)
+                        if col is None:
+                            col = self.letters[letters] = column_index_from_string(letters)
+                    else:
+                        col = self.col_counter + 1
+                    self.col_counter = col
+                    pos = self.positions.get(col)
+                    if pos is not None:
+                        out[pos] = self.parse_cell(el)["value"]
+                return self.row_counter, tuple(out)
+
+        _PROJECTED_PARSER = ProjectedParser
+    return _PROJECTED_PARSER
+
+
+def _projected_rows(ws, keep: list[int], start: int):
+    """Rader fra og med rad ``start`` (1-basert) med bare kolonnene ``keep``.
+
+    Bruker en egen parser slik at ubrukte celler aldri tolkes. Parseren
+    bygger på interne grensesnitt i ``openpyxl``; den første raden sjekkes
+    derfor mot ``iter_rows`` før resten strømmes. Mangler grensesnittene
+    eller gir de et annet resultat, brukes ``iter_rows`` og
+    :func:`_project_rows` i stedet.
+    """
+    from itertools import chain
+
+    def fallback():
+        return _project_rows(ws.iter_rows(min_row=start, values_only=True), keep)
+
+    wb = ws.parent
+    try:
+        parser_cls = _projected_parser_cls()
+        source = ws._get_source()
+        parser = parser_cls(
+            source,
+            ws._shared_strings,
+            data_only=wb.data_only,
+            epoch=wb.epoch,
+            date_formats=wb._date_formats,
+            timedelta_formats=wb._timedelta_formats,
+            positions={c + 1: i for i, c in enumerate(keep)},
+        )
+    except (ImportError, AttributeError, TypeError) as e:
+        logger.debug(f"Kolonneutvalg i parseren er ikke tilgjengelig: {e}")
+        return fallback()
+
+    parsed = parser.parse()
+    try:
+        first = next((item for item in parsed if item[0] >= start), None)
+        if first is not None:
+            idx, row = first
+            check = ws.iter_rows(min_row=idx, max_row=idx, values_only=True)
+            expected = next(_project_rows(check, keep), None)
+            if row != expected:
+                raise ValueError(f"rad {idx} ble {row!r}, ventet {expected!r}")
+    except Exception as e:
+        source.close()
+        logger.warning(f"Kolonneutvalg i parseren ga feil resultat, leser hele rader: {e}")
+        return fallback()
+
+    def gen():
+        empty = (None,) * len(keep)
+        expected = start
+        with source:
+            if first is None:
+                return
+            for idx, row in chain([first], parsed):
+                # Rader som mangler i filen er tomme, som i ``iter_rows``.
+                for _ in range(expected, idx):
+                    yield empty
+                expected = idx + 1
+                yield row
+
+    return gen()
+
+
+def read_sheet(
+    path: str,
+    nrows: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    usecols: Optional[Callable[[list], Iterable[str]]] = None,
+) -> tuple[Optional[list], list, int]:
+    """Les det aktive arket som tekstkolonner.
+
+    Arbeidsboken åpnes kun én gang. Med ``nrows`` brukes de første
+    ``nrows`` radene til å finne headerraden, og resten strømmes fra samme
+    ``iter_rows``-gjennomløp direkte inn i kolonnelister. Uten ``nrows``
+    er alle rader data og headeren ``None``.
+
+    ``usecols`` får de unike kolonnenavnene fra headerraden og returnerer
+    navnene som skal leses, slik som en funksjon gitt til ``read_excel``.
+    Celler i andre kolonner tolkes ikke av parseren, og headeren som
+    returneres består da av de unike navnene.
+
+    Returnerer ``(header, kolonner, antall rader)``. Kolonnene kan være
+    lengre enn antall rader; overskytende verdier er tomme.
     """
-    logger.info(f"Laster hovedbok fra {path}")
     import openpyxl
+    from itertools import chain, islice
 
     wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-    ws = wb.active
-    header_idx = 0
-    for i, row in enumerate(ws.iter_rows(min_row=1, max_row=nrows, values_only=True)):
-        if not row:
-            continue
-        non_empty = sum(1 for c in row if c not in (None, ""))
-        if non_empty > len(row) / 2:
-            header_idx = i
-            break
-    wb.close()
+    try:
+        ws = wb.active
+        rows = ws.iter_rows(values_only=True)
+        header = None
+        skipped = 0
+        if nrows is not None:
+            head = list(islice(rows, nrows))
+            header_idx = 0
+            for i, row in enumerate(head):
+                if not row:
+                    continue
+                non_empty = sum(1 for c in row if c not in (None, ""))
+                if non_empty > len(row) / 2:
+                    header_idx = i
+                    break
+            header = list(head[header_idx]) if head else []
+            skipped = header_idx + 1
+            if usecols is None:
+                rows = chain(head[skipped:], rows)
+            else:
+                rows.close()
+                names = _unique_columns(header)
+                wanted = set(usecols(names))
+                keep = [i for i, name in enumerate(names) if name in wanted]
+                header = [names[i] for i in keep]
+                rows = chain(
+                    _project_rows(head[skipped:], keep),
+                    _projected_rows(ws, keep, len(head) + 1),
+                )
+        columns, n = _stream_columns(
+            rows,
+            [[] for _ in header or ()],
+            progress,
+            ws.max_row,
+            offset=skipped,
+        )
+    finally:
+        wb.close()
+    _trim_columns(columns, header, n)
+    return header, columns, n
+
+
+def gl_usecols(names: list) -> list:
+    """Kolonnene i hovedboken som appen bruker.
+
+    Det er kolonnene fra :func:`guess_gl_columns` og ``GL_EXTRA_COLUMNS``.
+    De to første kolonnene tas alltid med, fordi ``guess_invoice_col``
+    faller tilbake på kolonne nummer to; slik gir gjetting på de utvalgte
+    kolonnene samme svar som på hele arket.
+    """
+    wanted = {c for c in guess_gl_columns(names).values() if c is not None}
+    wanted.update(GL_EXTRA_COLUMNS)
+    wanted.update(str(c) for c in names[:2])
+    return [c for c in names if str(c) in wanted]
+
+
+def load_gl_df(
+    path: str,
+    nrows: int = 10,
+    progress: Optional[ProgressCallback] = None,
+    in_process: bool = False,
+    usecols: Optional[Callable[[list], Iterable[str]]] = None,
+) -> pd.DataFrame:
+    """Leser hovedboken fra Excel.
+
+    Headerraden finnes blant de første ``nrows`` radene, se
+    :func:`read_sheet`. Alle verdier leses som tekst, tilsvarende
+    ``read_excel(dtype=str)``. ``progress`` kalles med antall leste rader,
+    se :mod:`progress`. Med ``in_process`` tolkes filen i en egen prosess,
+    se :mod:`excel_process`. ``usecols`` begrenser hvilke kolonner som
+    leses, typisk :func:`gl_usecols`; se :func:`read_sheet`.
+    """
+    logger.info(f"Laster hovedbok fra {path}")
+    header, columns, n = _read_sheet(path, nrows, progress, in_process, usecols)
 
     pd = _pd()
-    return pd.read_excel(
-        path,
-        engine="openpyxl",
-        header=header_idx,
+    names = _unique_columns(header)
+    return pd.DataFrame(
+        {name: col[:n] for name, col in zip(names, columns)},
+        columns=names,
         dtype=str,
-        engine_kwargs={"read_only": True},
     )
 
 
@@ -129,49 +445,486 @@ def extract_customer_from_invoice_file(
 
 
 
-def _net_amount_from_row(row: pd.Series, net_amount_col: Optional[str]) -> Optional[Decimal]:
-    """Hent netto beløp fra raden ved å sjekke prioriterte kolonner."""
+def calc_net_amounts(df: pd.DataFrame, net_amount_col: Optional[str]) -> pd.Series:
+    """Beregn nettobeløp i øre for alle rader i ``df``.
+
+    Hver kandidatkolonne tolkes i ett vektorisert gjennomløp, og verdiene
+    slås sammen i prioritert rekkefølge: først ``net_amount_col``, deretter
+    ``FALLBACK_NET_COLUMNS``. Senere kolonner tolkes kun for rader som ennå
+    mangler beløp. Resultatet er en ``Int64``-kolonne med heltall øre.
+    """
+    pd = _pd()
+    import numpy as np
+
     cols = []
     if net_amount_col:
         cols.append(net_amount_col)
     cols.extend(c for c in FALLBACK_NET_COLUMNS if c != net_amount_col)
+    result = np.zeros(len(df), dtype=np.int64)
+    found = np.zeros(len(df), dtype=bool)
     for col in cols:
-        if col in row:
-            val = parse_amount(row.get(col))
-            if val is not None:
-                return val
-    return None
+        if col not in df.columns:
+            continue
+        ser = df[col]
+        if isinstance(ser, pd.DataFrame):
+            ser = ser.iloc[:, 0]
+        pos = np.flatnonzero(~found)
+        vals = parse_ore_series(ser.iloc[pos])
+        ok = vals.notna().to_numpy()
+        result[pos[ok]] = vals.to_numpy(dtype=np.int64, na_value=0)[ok]
+        found[pos[ok]] = True
+        if found.all():
+            break
+    return pd.Series(pd.arrays.IntegerArray(result, ~found), index=df.index)
+
+
+def prepare_invoice_df(df: pd.DataFrame) -> tuple[str, Optional[str]]:
+    """Gjett nøkkelkolonner i fakturalisten og legg til hjelpekolonner.
+
+    Legger til ``_netto_ore`` og ``_sum_row`` og returnerer kolonnene for
+    fakturanummer og nettobeløp.
+    """
+    from helpers import guess_invoice_col, guess_net_amount_col
+
+    invoice_col = guess_invoice_col(df.columns)
+    net_amount_col = guess_net_amount_col(df.columns)
+    try:
+        df["_netto_ore"] = calc_net_amounts(df, net_amount_col)
+    except (TypeError, ValueError):
+        logger.exception("Kunne ikke beregne nettobeløp")
+        df["_netto_ore"] = _pd().array([None] * len(df), dtype="Int64")
+    df["_sum_row"] = find_sum_rows(df)
+    return invoice_col, net_amount_col
+
+
+def guess_gl_columns(cols) -> dict[str, Optional[str]]:
+    """Gjett hvilke kolonner i hovedboken som brukes til bilagslinjene.
+
+    Returnerer et kart fra rolle (``"invoice"``, ``"accountno"`` osv.) til
+    kolonnenavn, eller ``None`` når kolonnen mangler. Kartet returneres av
+    :func:`prepare_gl_df` og :func:`load_gl_data` (``cols``) og brukes av
+    :func:`gl_usecols`, :func:`build_ledger_view` og ``Session.gl_cols``.
+    """
+    from helpers import guess_invoice_col, guess_col
+
+    cols = [str(c) for c in cols]
+    return {
+        "invoice":     guess_invoice_col(cols),
+        "accountno":   guess_col(cols, r"^kontonr\.?$", r"konto.*nummer", r"account.*(number|no)", r"acct.*no"),
+        "accountname": guess_col(cols, r"^kontonavn$", r"konto\s*navn", r"^konto$", r"account.*name", r"(?:^| )navn$"),
+        "text":        guess_col(cols, r"^tekst$", r"text", r"posteringstekst"),
+        "desc":        guess_col(cols, r"beskrivelse", r"description", r"forklaring"),
+        "vatcode":     guess_col(cols, r"^mva(?!-)|mva[- ]?kode", r"^vat(?!.*amount)|tax code"),
+        "vatamount":   guess_col(cols, r"mva[- ]?bel(ø|o)p", r"vat amount", r"tax amount"),
+        "debit":       guess_col(cols, r"^debet$", r"debit"),
+        "credit":      guess_col(cols, r"^kredit$", r"credit"),
+        "amount":      guess_col(cols, r"^bel(ø|o)p$", r"amount", r"sum"),
+        "postedby":    guess_col(cols, r"postert\s*av", r"bokf(ø|o)rt\s*av", r"registrert\s*av", r"posted\s*by", r"created\s*by"),
+    }
+
+
+class LedgerIndex:
+    """Kompakt oppslag fra normalisert fakturanummer til rader i hovedboken.
+
+    Lagres som en permutasjon av radposisjonene gruppert per nøkkel og
+    forskyvninger inn i permutasjonen (CSR-format), pluss en ordbok fra
+    nøkkel til gruppe. Oppslag er dermed ett ordbokoppslag, like raskt som
+    i ordboken fra ``groupby().indices`` som ble brukt tidligere, uten en
+    egen array per fakturanummer. Grensesnittet ``get``/``in``/``len`` er
+    det samme.
+    """
+
+    __slots__ = ("slots", "offsets", "perm")
+
+    def __init__(self, slots, offsets, perm):
+        self.slots = slots
+        self.offsets = offsets
+        self.perm = perm
+
+    @classmethod
+    def build(cls, values) -> "LedgerIndex":
+        """Bygg indeks fra en sekvens med normaliserte fakturanummer."""
+        pd = _pd()
+        import numpy as np
+
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=True)
+        n = len(codes)
+        pos_dtype = np.int32 if n < 2**31 else np.int64
+        # Manglende verdier (-1) holdes utenfor indeksen.
+        valid = codes >= 0
+        perm = np.argsort(codes[valid], kind="stable").astype(pos_dtype)
+        if not valid.all():
+            perm = np.flatnonzero(valid).astype(pos_dtype)[perm]
+        counts = np.bincount(codes[valid], minlength=len(uniques))
+        offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        slots = {str(key): i for i, key in enumerate(uniques)}
+        return cls(slots, offsets, perm)
+
+    def get(self, key, default=None):
+        """Returner radposisjonene for ``key`` eller ``default``."""
+        i = self.slots.get(key)
+        if i is None:
+            return default
+        # ``item`` gir Python-tall, som gjør slicingen raskere enn med numpy-skalarer
+        return self.perm[self.offsets.item(i) : self.offsets.item(i + 1)]
+
+    def __contains__(self, key) -> bool:
+        return key in self.slots
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @property
+    def nbytes(self) -> int:
+        import sys
+
+        # Nøkkelstrengene deles med ``_inv_norm`` i hovedboken og telles ikke
+        return sys.getsizeof(self.slots) + self.offsets.nbytes + self.perm.nbytes
+
+
+def prepare_gl_df(gl: pd.DataFrame) -> tuple[dict[str, Optional[str]], LedgerIndex]:
+    """Gjett kolonner i hovedboken, normaliser fakturanummer og bygg indeks.
+
+    Legger til kolonnen ``_inv_norm`` og returnerer kolonnekartet fra
+    :func:`guess_gl_columns` sammen med en :class:`LedgerIndex` fra
+    normalisert fakturanummer til radposisjoner.
+    """
+    from helpers import only_digits
+
+    cols = guess_gl_columns(gl.columns)
+    if cols["invoice"] in gl.columns:
+        gl["_inv_norm"] = gl[cols["invoice"]].map(only_digits)
+    else:
+        gl["_inv_norm"] = ""
+    return cols, LedgerIndex.build(gl["_inv_norm"])
+
+
+def build_ledger_view(gl: pd.DataFrame, cols: dict[str, Optional[str]]) -> pd.DataFrame:
+    """Lag en visningsklar tabell over alle linjer i hovedboken.
+
+    Kontonummer og -navn skilles, beløp formateres og ``Beløp`` beregnes som
+    debet minus kredit når egen beløpskolonne mangler. Alt gjøres kolonnevis
+    én gang etter innlasting, slik at visning av et bilag bare er et utsnitt.
+    Tabellen har kolonnene i ``LEDGER_COLS`` samt ``_belop_ore`` (``Int64``)
+    og samme radrekkefølge som ``gl``.
+    """
+    pd = _pd()
+    import numpy as np
+    from helpers import to_str, fmt_money, fmt_ore, map_unique
+
+    n = len(gl)
+
+    def col(name):
+        c = cols.get(name)
+        if not c or c not in gl.columns:
+            return None
+        ser = gl[c]
+        return ser.iloc[:, 0] if isinstance(ser, pd.DataFrame) else ser
+
+    def text(name):
+        ser = col(name)
+        if ser is None:
+            return pd.Series([""] * n, index=gl.index, dtype=object)
+        return map_unique(ser, to_str, "")
+
+    def ore(name):
+        ser = col(name)
+        if ser is None:
+            return pd.Series(pd.array([None] * n, dtype="Int64"), index=gl.index)
+        return parse_ore_series(ser)
+
+    konto_nr = text("accountno")
+    konto_navn = text("accountname")
+    # Kontonummer fra starten av kontonavnet, f.eks. "4300 Varekjøp"
+    empty_nr = konto_nr == ""
+    if empty_nr.any():
+        found = konto_navn[empty_nr].str.extract(r"^\s*(\d{3,6})\b", expand=False)
+        konto_nr[empty_nr] = found.fillna("").astype(object)
+    # Kontonavn fra kombinert kontokolonne, f.eks. "4300 - Varekjøp"
+    empty_navn = konto_navn == ""
+    if empty_navn.any():
+        parts = konto_nr[empty_navn].str.extract(r"^\s*(\d{3,6})\s*[-–:]?\s*(.+)$")
+        matched = parts[1].notna()
+        konto_navn[matched[matched].index] = parts.loc[matched, 1].astype(object)
+
+    beskr = text("desc")
+    beskr = beskr.where(beskr != "", text("text"))
+
+    belop = ore("amount")
+    deb, kre = ore("debit"), ore("credit")
+    has_dk = (deb.notna() | kre.notna()) & belop.isna()
+    if has_dk.any():
+        belop[has_dk] = deb[has_dk].fillna(0) - kre[has_dk].fillna(0)
+
+    vat = col("vatamount")
+    view = pd.DataFrame({
+        "Kontonr": konto_nr,
+        "Konto": konto_navn,
+        "Beskrivelse": beskr,
+        "MVA": text("vatcode"),
+        "MVA-beløp": map_unique(vat, fmt_money, "") if vat is not None else "",
+        "Beløp": map_unique(belop, fmt_ore, ""),
+        "Postert av": text("postedby"),
+        "_belop_ore": belop,
+    }, index=gl.index)
+    return view.reset_index(drop=True)
+
+
+# Tekstkolonner med færre unike verdier enn denne andelen av radene lagres
+# som ``category``
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _numeric_uniques(uniques):
+    """Tolk unike tekstverdier som tall hvis alle kan gjenskapes eksakt.
+
+    Returnerer en ``int64``- eller ``float64``-array, eller ``None`` hvis en
+    verdi ikke er et tall på kanonisk form (f.eks. ``"0123"``, ``"1 234"``
+    eller ``"1,5"``), slik at ingen informasjon går tapt.
+    """
+    import numpy as np
+
+    ints = []
+    for u in uniques:
+        try:
+            i = int(u)
+        except (TypeError, ValueError):
+            break
+        if str(i) != u:
+            return None
+        ints.append(i)
+    else:
+        arr = np.array(ints)
+        return arr if arr.dtype.kind == "i" else None
+    floats = []
+    for u in uniques:
+        try:
+            f = float(u)
+        except (TypeError, ValueError):
+            return None
+        if not np.isfinite(f):
+            return None
+        if repr(f) != u and not (f.is_integer() and str(int(f)) == u):
+            return None
+        floats.append(f)
+    return np.array(floats, dtype=np.float64)
+
+
+def compact_df(df: pd.DataFrame, label: str = "", numeric: bool = True) -> list[tuple]:
+    """Komprimer tekstkolonnene i ``df`` på stedet.
+
+    Med ``numeric`` får kolonner der alle verdier er tall på kanonisk form
+    numerisk dtype (minste heltallstype som passer, ellers ``float64``).
+    Kolonner med få unike verdier blir ``category``. Andre kolonner beholdes.
+
+    Minnebruken før og etter per kolonne logges, og returneres som liste med
+    ``(kolonne, dtype før, dtype etter, byte før, byte etter)``.
+    """
+    pd = _pd()
+    import numpy as np
+
+    n = len(df)
+    report = []
+    for i, name in enumerate(list(df.columns)):
+        ser = df.iloc[:, i]
+        before = int(ser.memory_usage(index=False, deep=True))
+        dtype_before = str(ser.dtype)
+        if n and (ser.dtype == object or pd.api.types.is_string_dtype(ser.dtype)):
+            codes, uniques = pd.factorize(ser)
+            uniques = np.asarray(uniques, dtype=object)
+            nums = _numeric_uniques(uniques) if numeric and len(uniques) else None
+            if nums is not None:
+                missing = codes < 0
+                if nums.dtype.kind == "i":
+                    lo, hi = nums.min(), nums.max()
+                    small = next(
+                        t for t in (np.int8, np.int16, np.int32, np.int64)
+                        if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max
+                    )
+                    values = nums.astype(small)[codes]
+                    if missing.any():
+                        values = pd.arrays.IntegerArray(values, missing)
+                else:
+                    values = nums[codes]
+                    values[missing] = np.nan
+                ser = pd.Series(values, index=ser.index)
+            elif len(uniques) <= CATEGORY_MAX_RATIO * n:
+                ser = pd.Series(
+                    pd.Categorical.from_codes(codes, categories=uniques),
+                    index=ser.index,
+                )
+            df.isetitem(i, ser)
+        after = int(df.iloc[:, i].memory_usage(index=False, deep=True))
+        report.append((name, dtype_before, str(df.iloc[:, i].dtype), before, after))
+
+    total_before = sum(r[3] for r in report)
+    total_after = sum(r[4] for r in report)
+    mb = 1024 * 1024
+    for name, d0, d1, b0, b1 in report:
+        logger.info(f"Minne {label} {name}: {d0} {b0 / mb:.1f} MB -> {d1} {b1 / mb:.1f} MB")
+    logger.info(
+        f"Minne {label} totalt: {total_before / mb:.1f} MB -> {total_after / mb:.1f} MB"
+    )
+    return report
+
+
+def _check_cancel(progress) -> None:
+    token = getattr(progress, "token", None)
+    if token is not None:
+        token.check()
+
+
+def load_invoice_data(
+    path: str,
+    header_idx: int = 4,
+    progress: Optional[ProgressCallback] = None,
+    in_process: bool = False,
+) -> dict:
+    """Les og klargjør fakturalisten slik GUI-et og batchkjøringen bruker den.
+
+    Returnerer ``df``, ``kunde``, ``invoice_col``, ``net_amount_col`` og
+    ``sum_net_all``. Resultatet kan mellomlagres med ``data_cache``.
+    """
+    df, kunde = load_invoice_df(path, header_idx, progress=progress, in_process=in_process)
+    _check_cancel(progress)
+    invoice_col = net_amount_col = None
+    if not df.dropna(how="all").empty:
+        invoice_col, net_amount_col = prepare_invoice_df(df)
+    return {
+        "df": df,
+        "kunde": kunde,
+        "invoice_col": invoice_col,
+        "net_amount_col": net_amount_col,
+        "sum_net_all": calc_sum_net_all(df),
+    }
+
+
+def load_gl_data(
+    path: str,
+    progress: Optional[ProgressCallback] = None,
+    in_process: bool = False,
+) -> dict:
+    """Les og klargjør hovedboken slik GUI-et og batchkjøringen bruker den.
+
+    Returnerer ``df``, kolonnene fra :func:`guess_gl_columns` (``cols``,
+    tatt vare på som ``Session.gl_cols``), ``gl_index`` og ferdig visning
+    av bilagslinjene (``view``).
+    """
+    gl = load_gl_df(path, nrows=10, progress=progress, in_process=in_process, usecols=gl_usecols)
+    cols, index, view = {}, None, None
+    if gl is not None and not gl.dropna(how="all").empty:
+        _check_cancel(progress)
+        cols, index = prepare_gl_df(gl)
+        _check_cancel(progress)
+        view = build_ledger_view(gl, cols)
+        compact_df(gl, "hovedbok")
+        # Visningen er tekst og beholdes som tekst
+        compact_df(view, "bilagslinjer", numeric=False)
+    return {"df": gl, "cols": cols, "gl_index": index, "view": view}
+
+
+def draw_sample(df: pd.DataFrame, n: int, year: int) -> pd.DataFrame:
+    """Trekk ``n`` bilag fra ``df`` med året som frø, slik at utvalget kan gjentas."""
+    n = max(1, min(n, len(df)))
+    return df.sample(n=n, random_state=year).reset_index(drop=True).copy()
 
 
 def calc_sum_kontrollert(sample_df: Optional[pd.DataFrame], decisions: list) -> Decimal:
-    """Summer netto-beløp for rader som er kontrollert."""
-    if sample_df is None or "_netto_float" not in sample_df.columns:
+    """Summer netto-beløp for rader som er kontrollert.
+
+    Summeringen skjer vektorisert i heltall øre og konverteres eksakt til
+    ``Decimal`` til slutt.
+    """
+    if sample_df is None or "_netto_ore" not in sample_df.columns:
         return Decimal("0")
     import pandas as pd
 
     dec_ser = pd.Series(decisions).reindex(sample_df.index)
     mask = dec_ser.notna()
-    vals = sample_df.loc[mask, "_netto_float"].dropna().tolist()
-    return sum(vals, Decimal("0"))
+    return ore_to_decimal(sample_df.loc[mask, "_netto_ore"].sum())
+
+
+class ReviewStats:
+    """Løpende antall og øresummer per beslutning i et utvalg.
+
+    Holdes oppdatert med :meth:`record` hver gang en beslutning endres, slik
+    at statuskortet og PDF-rapporten kan lese tallene uten å gå gjennom hele
+    utvalget på nytt.
+    """
+
+    def __init__(self, amounts_ore, decisions=None):
+        self._amounts = [int(a) for a in amounts_ore]
+        self._decisions = [None] * len(self._amounts)
+        self.counts: dict = {None: len(self._amounts)}
+        self.sums_ore: dict = {None: sum(self._amounts)}
+        for idx, dec in enumerate(decisions or []):
+            if dec is not None:
+                self.record(idx, dec)
+
+    @classmethod
+    def from_sample(cls, sample_df: Optional[pd.DataFrame], decisions=None) -> "ReviewStats":
+        """Bygg statistikk for ``sample_df`` med eventuelle eksisterende beslutninger."""
+        if sample_df is None:
+            return cls([], decisions)
+        if "_netto_ore" in sample_df.columns:
+            amounts = sample_df["_netto_ore"].to_numpy(dtype="int64", na_value=0)
+        else:
+            amounts = [0] * len(sample_df)
+        return cls(amounts, decisions)
+
+    def record(self, idx: int, decision) -> None:
+        """Registrer ``decision`` for rad ``idx`` og oppdater tellerne."""
+        old = self._decisions[idx]
+        if old == decision:
+            return
+        amount = self._amounts[idx]
+        self.counts[old] -= 1
+        self.sums_ore[old] -= amount
+        self.counts[decision] = self.counts.get(decision, 0) + 1
+        self.sums_ore[decision] = self.sums_ore.get(decision, 0) + amount
+        self._decisions[idx] = decision
+
+    def count(self, decision) -> int:
+        return self.counts.get(decision, 0)
+
+    def sum_for(self, decision) -> Decimal:
+        return ore_to_decimal(self.sums_ore.get(decision, 0))
+
+    @property
+    def sum_kontrollert(self) -> Decimal:
+        """Sum for alle rader som har fått en beslutning."""
+        return ore_to_decimal(
+            sum(v for k, v in self.sums_ore.items() if k is not None)
+        )
+
+
+def find_sum_rows(df: pd.DataFrame) -> pd.Series:
+    """Finn summeringsrader i fakturalisten.
+
+    En rad regnes som summeringsrad hvis en av de synlige cellene inneholder
+    ordet «sum». Resultatet beregnes kolonnevis én gang ved innlasting og
+    lagres som ``_sum_row``.
+    """
+    pd = _pd()
+    import numpy as np
+
+    mask = np.zeros(len(df), dtype=bool)
+    for col, ser in df.items():
+        if str(col).startswith("_"):
+            continue
+        mask |= ser.astype(str).str.contains(_SUM_PATTERN, na=False).to_numpy(dtype=bool)
+    return pd.Series(mask, index=df.index)
 
 
 def calc_sum_net_all(df: Optional[pd.DataFrame], skip_last: bool = True) -> Decimal:
-    """Summer netto-beløp for alle rader i ``df``."""
-    if df is None or df.dropna(how="all").empty or "_netto_float" not in df.columns:
-        return Decimal("0")
-    df_eff = df.dropna(how="all").copy()
-    sum_pattern = re.compile(r"\bsum\b", re.IGNORECASE)
-    if skip_last and len(df_eff) > 0:
-        last_row = df_eff.iloc[-1].astype(str)
-        if last_row.str.contains(sum_pattern).any():
-            df_eff = df_eff.iloc[:-1]
-    mask = ~(
-        df_eff.fillna("").astype(str)
-        .stack()
-        .str.contains(sum_pattern)
-        .groupby(level=0)
-        .any()
-    )
-    vals = df_eff.loc[mask, "_netto_float"].dropna().tolist()
-    return sum(vals, Decimal("0"))
+    """Summer netto-beløp for alle rader i ``df``.
 
+    Summeringsrader holdes utenfor, også den siste raden (``skip_last`` er
+    beholdt for bakoverkompatibilitet). Masken i ``_sum_row`` brukes hvis
+    den finnes; ellers beregnes den med :func:`find_sum_rows`.
+    """
+    if df is None or "_netto_ore" not in df.columns or df.empty:
+        return Decimal("0")
+    sum_rows = df["_sum_row"] if "_sum_row" in df.columns else find_sum_rows(df)
+    return ore_to_decimal(df.loc[~sum_rows.astype(bool), "_netto_ore"].sum())
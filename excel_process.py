@@ -0,0 +1,116 @@
+"""Tolking av Excel-filer i en egen prosess.
+
+``openpyxl`` er ren Python, så tolking i en tråd holder GIL-en og gjør at
+GUI-et hakker og at to filer ikke leses raskere samtidig enn etter
+hverandre. :func:`read_sheet_in_process` kjører :func:`data_utils.read_sheet`
+i en egen prosess og sender kolonnene tilbake i kompakt form: hver kolonne
+som heltallskoder (``array('i')``) pluss en liste med unike verdier.
+``DataFrame`` settes sammen i GUI-prosessen.
+
+Barneprosessen importerer verken ``pandas`` eller ``numpy``.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import pickle
+import queue
+from array import array
+from typing import Optional
+
+from helpers import logger
+from progress import ProgressCallback
+
+# Hvor lenge foreldreprosessen venter på meldinger før den ser etter avbrudd
+_POLL_SECONDS = 0.1
+
+
+def pack_columns(columns: list, n: int) -> list:
+    """Kod kolonnene som ``(koder, unike verdier)``. Kode 0 er tom celle."""
+    packed = []
+    for col in columns:
+        index: dict = {None: 0}
+        codes = array("i", [index.setdefault(v, len(index)) for v in col[:n]])
+        packed.append((codes, list(index)[1:]))
+    return packed
+
+
+def unpack_columns(packed: list) -> list:
+    """Gjør om resultatet fra :func:`pack_columns` til ``object``-arrays."""
+    import numpy as np
+
+    columns = []
+    for codes, uniques in packed:
+        table = np.array([None, *uniques], dtype=object)
+        columns.append(table[np.frombuffer(codes, dtype=np.intc)])
+    return columns
+
+
+def _child(out, path: str, nrows: Optional[int], usecols) -> None:
+    from data_utils import read_sheet
+
+    def progress(done, total=None, message=None):
+        out.put(("progress", (done, total, message)))
+
+    try:
+        header, columns, n = read_sheet(path, nrows, progress, usecols)
+        out.put(("done", (header, pack_columns(columns, n), n)))
+    except Exception as e:  # sendes videre til foreldreprosessen
+        # ``Queue.put`` pickler i en egen tråd, og feil der blir borte
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(repr(e))
+        out.put(("error", e))
+
+
+def read_sheet_in_process(
+    path: str,
+    nrows: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    usecols=None,
+):
+    """Som :func:`data_utils.read_sheet`, men tolket i en egen prosess.
+
+    Framdrift fra barneprosessen videresendes til ``progress``. Kaster
+    ``progress`` (for eksempel ``jobs.JobCancelled``), eller er jobben
+    avbrutt via ``progress.token``, avsluttes barneprosessen straks.
+    ``usecols`` må være en funksjon på modulnivå, slik at den kan sendes
+    til barneprosessen.
+    """
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(out, path, nrows, usecols), daemon=True)
+    proc.start()
+    token = getattr(progress, "token", None)
+    try:
+        while True:
+            try:
+                kind, value = out.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if token is not None:
+                    token.check()
+                if proc.is_alive():
+                    continue
+                # Prosessen kan ha sendt siste melding og avsluttet etter
+                # at ventingen over gikk ut; hent den før vi gir opp.
+                try:
+                    kind, value = out.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    raise RuntimeError(
+                        f"Tolkeprosessen stoppet uventet (kode {proc.exitcode})"
+                    ) from None
+            if kind == "progress":
+                if progress is not None:
+                    progress(*value)
+            elif kind == "error":
+                raise value
+            else:
+                header, packed, n = value
+                return header, unpack_columns(packed), n
+    except BaseException:
+        if proc.is_alive():
+            logger.info(f"Avslutter tolkeprosess for {path}")
+            proc.terminate()
+        raise
+    finally:
+        proc.join()
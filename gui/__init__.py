@@ -6,7 +6,6 @@ import os
 import re
 
 from decimal import Decimal
-from pathlib import Path
 
 from .style import style
 from helpers import logger
@@ -18,6 +17,21 @@ except Exception as e:  # pragma: no cover - valfri innstilling
     logger.warning(f"UI_SCALING kunne ikke lastes: {e}")
     UI_SCALING = None
 
+try:
+    from settings import PARSE_IN_PROCESS
+except ImportError:  # pragma: no cover - valgfri innstilling
+    PARSE_IN_PROCESS = True
+
+try:
+    from settings import PDF_PRERENDER
+except ImportError:  # pragma: no cover - valgfri innstilling
+    PDF_PRERENDER = True
+
+try:
+    from settings import STARTUP_WARMUP
+except ImportError:  # pragma: no cover - valgfri innstilling
+    STARTUP_WARMUP = True
+
 # CustomTkinter importeres ved behov for raskere oppstart.
 _ctk_mod = None
 
@@ -41,13 +55,17 @@ OPEN_PO_URL = "https://go.poweroffice.net/#reports/purchases/invoice?"
 MAX_APP_WIDTH = 1600
 MIN_APP_WIDTH = 1200
 
-if os.name == "nt":
-    _CONFIG_DIR = Path(os.getenv("APPDATA") or Path.home()) / "Bilagskontroll"
-else:
-    _CONFIG_DIR = Path.home() / ".bilagskontroll"
+from helpers_path import CONFIG_DIR as _CONFIG_DIR
 
 WINDOW_CONFIG_FILE = _CONFIG_DIR / "settings.json"
 
+# Ventetid før oppvarmingen av tunge moduler starter, se ``startup.py``
+WARMUP_DELAY_MS = 300
+
+# Prioritet for bakgrunnsjobber; innlesing går foran eksport
+JOB_PRIORITY_LOAD = 10
+JOB_PRIORITY_EXPORT = 0
+
 # For bakoverkompatibilitet
 get_color = style.get_color
 
@@ -65,9 +83,40 @@ def create_button(master, **kwargs):
     options.update(kwargs)
     return ctk.CTkButton(master, **options)
 
+class _SessionAttr:
+    """Attributt på ``App`` som leses og skrives i ``App.session``.
+
+    GUI-koden kan dermed fortsatt bruke ``self.sample_df`` osv., mens
+    dataene ligger i en ``session.Session`` som kan brukes uten Tk.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj.session, self.name)
+
+    def __set__(self, obj, value):
+        setattr(obj.session, self.name, value)
+
+
 # ----------------- App -----------------
 class App:
-    def __init__(self):
+    df = _SessionAttr()
+    invoice_col = _SessionAttr()
+    net_amount_col = _SessionAttr()
+    sum_net_all = _SessionAttr()
+    gl_df = _SessionAttr()
+    gl_index = _SessionAttr()
+    gl_view = _SessionAttr()
+    sample_df = _SessionAttr()
+    decisions = _SessionAttr()
+    comments = _SessionAttr()
+    review = _SessionAttr()
+
+    def __init__(self, profiler=None):
         import tkinter as tk
         ctk = _ctk()
 
@@ -114,37 +163,48 @@ class App:
 
         self.app_icon_img = None
 
-        self.df = None
-        self.sample_df = None
-        self.decisions, self.comments = [], []
+        # Data, utvalg og beslutninger ligger i ``session``; se ``_SessionAttr``
+        from session import Session
+
+        self.session = Session()
+        # Forhåndsberegning av visningsdata for nabobilag
+        from .prefetch import RenderPrefetcher, build_render_payload
+
+        self._prefetcher = RenderPrefetcher(
+            lambda i: build_render_payload(self, i, self._current_row_dict(i))
+        )
+        # Bilag som er lagt ut for PDF-rapporten, se ``report_cache``
+        self._fragments = None
+        if PDF_PRERENDER:
+            from report_cache import FragmentCache
+
+            self._fragments = FragmentCache(prepare=self._section_with_ledger)
         self.idx = 0
-        self.invoice_col = None
-        self.net_amount_col = None
         self.antall_bilag = 0
 
-        # GL
-        self.gl_df = None
-        self.gl_invoice_col = None
-        self.gl_accountno_col = None
-        self.gl_accountname_col = None
-        self.gl_text_col = None
-        self.gl_desc_col = None
-        self.gl_vatcode_col = None
-        self.gl_vatamount_col = None
-        self.gl_debit_col = None
-        self.gl_credit_col = None
-        self.gl_amount_col = None
-        self.gl_postedby_col = None
-
-        # Framdriftsindikator
+        # Kø for GUI-oppdateringer fra bakgrunnstråder
+        from .dispatch import UiDispatcher
+
+        self.ui = UiDispatcher()
+        self.ui.attach(self)
+
+        # Bakgrunnsjobber: "fakturaliste", "hovedbok" og "eksport"
+        from jobs import JobScheduler
+
+        self.jobs = JobScheduler(dispatch=self.ui.post)
+
+        # Framdriftsindikator, se ``_start_progress``
+        self._progress = []
         self._progress_job = None
-        self._progress_running = False
-        self._progress_val = 0
-        self._progress_msg = ""
         self._pdf_prompt_shown = False
 
+        # Oppvarming og valgfri måling av oppstarten, se ``startup.py``
+        self._startup_profiler = profiler
+        self._warmup_token = None
+
         self.logo_img = None
         self._theme_initialized = False
+        self._mark_startup("vindu opprettet")
         self.after_idle(self._build_ui)
 
     def _init_fonts(self):
@@ -240,12 +300,43 @@ class App:
         from .mainview import build_ledger_widgets
 
         build_ledger_widgets(self)
+        self._mark_startup("bilagslinjer klare")
 
     def _post_init(self):
+        self._mark_startup("GUI bygd")
         self.after(200, self._init_theme)
         self.after(200, self.load_logo_images)
         self._init_dnd()
         self.after(200, self._init_icon)
+        # Nye tegneoppgaver kjøres før dette, så vinduet er tegnet her
+        self.after_idle(self._mark_startup, "vindu tegnet")
+        if STARTUP_WARMUP:
+            self.after(WARMUP_DELAY_MS, self._start_warmup)
+        elif self._startup_profiler is not None:
+            self.after(WARMUP_DELAY_MS, self._report_startup)
+
+    def _mark_startup(self, label):
+        if self._startup_profiler is not None:
+            self._startup_profiler.mark(label)
+
+    def _start_warmup(self):
+        """Importer tunge moduler i bakgrunnen mens brukeren velger filer."""
+        from jobs import CancelToken
+        from startup import start_warmup
+
+        def done(_timings):
+            self.ui.post(self._report_startup)
+
+        self._warmup_token = CancelToken()
+        start_warmup(token=self._warmup_token, on_done=done)
+
+    def _report_startup(self):
+        profiler = self._startup_profiler
+        if profiler is None:
+            return
+        profiler.mark("oppvarming ferdig" if STARTUP_WARMUP else "oppstart ferdig")
+        profiler.uninstall()
+        profiler.report()
 
     def _init_dnd(self):
         TkinterDnD = getattr(self, "_TkinterDnD", None)
@@ -359,15 +450,17 @@ class App:
             return
 
     def _on_drop(self, event):
-        path = event.data.strip("{}").strip()
-        if not path.lower().endswith((".xlsx", ".xls")):
-            return
-        if "hovedbok" in os.path.basename(path).lower():
-            self.gl_path_var.set(path)
-            self._load_gl_excel()
-        else:
-            self.file_path_var.set(path)
-            self._load_excel()
+        # Slippes fakturaliste og hovedbok samtidig, leses de parallelt.
+        for path in self.tk.splitlist(event.data):
+            path = path.strip()
+            if not path.lower().endswith((".xlsx", ".xls")):
+                continue
+            if "hovedbok" in os.path.basename(path).lower():
+                self.gl_path_var.set(path)
+                self._load_gl_excel()
+            else:
+                self.file_path_var.set(path)
+                self._load_excel()
 
     # Files
     def choose_file(self):
@@ -387,6 +480,12 @@ class App:
     def destroy(self):
         ctk = _ctk()
         self._save_window_size()
+        if self._warmup_token is not None:
+            self._warmup_token.cancel()
+        if self._fragments is not None:
+            self._fragments.close()
+        self.jobs.shutdown()
+        self.ui.detach()
         try:
             if hasattr(self, "ledger_tree") and hasattr(self, "_ledger_configure_id"):
                 self.ledger_tree.unbind("<Configure>", self._ledger_configure_id)
@@ -486,8 +585,9 @@ class App:
         from tkinter import messagebox
 
         self._ensure_helpers()
-        from data_utils import load_invoice_df, _net_amount_from_row
-        from .busy import show_busy, hide_busy, run_in_thread
+        from data_utils import load_invoice_data
+        from data_cache import cached_load
+        from .busy import show_busy, hide_busy
 
         path = self.file_path_var.get()
         if not path:
@@ -503,54 +603,59 @@ class App:
         def finalize():
             if big and hasattr(self, "inline_status"):
                 self.inline_status.configure(text="")
-            self._finish_progress()
+            self._finish_progress(progress)
             hide_busy(self)
 
-        def worker():
-            self.after(0, lambda: self._start_progress("Laster fakturaliste..."))
-            try:
-                df, cust = load_invoice_df(path, header_idx)
-            except (OSError, ValueError) as e:
-                logger.error(f"Klarte ikke lese Excel: {e}")
-                self.after(0, lambda: (messagebox.showerror(APP_TITLE, f"Klarte ikke lese Excel:\n{e}"), finalize()))
-                return
+        def build():
+            return load_invoice_data(
+                path, header_idx, progress=progress, in_process=PARSE_IN_PROCESS and big
+            )
 
-            def success():
-                self.antall_bilag = len(df.dropna(how="all"))
-                self.df = df
-                if cust:
-                    self.kunde_var.set(cust)
-                    if hasattr(self, "kunde_entry"):
-                        self.kunde_entry.configure(state="disabled")
-                if self.df is None or self.df.dropna(how="all").empty:
-                    messagebox.showwarning(APP_TITLE, "Excel-filen ser tom ut.")
-                    finalize()
-                    return
-                self.invoice_col = guess_invoice_col(self.df.columns)
-                self.net_amount_col = guess_net_amount_col(self.df.columns)
-                try:
-                    self.df["_netto_float"] = self.df.apply(
-                        _net_amount_from_row, axis=1, args=(self.net_amount_col,)
-                    )
-                except (TypeError, ValueError):
-                    logger.exception("Kunne ikke beregne nettobeløp")
-                    self.df["_netto_float"] = None
-                self.sample_df = None; self.decisions=[]; self.comments=[]; self.idx=0
-                self._update_counts_labels()
-                self.render()
-                self._update_year_options()
+        progress = self._start_progress("Laster fakturaliste...")
+
+        def worker(token):
+            progress.token = token
+            return cached_load("fakturaliste", path, build, header_idx=header_idx)
+
+        def failed(e):
+            logger.error(f"Klarte ikke lese Excel: {e}")
+            messagebox.showerror(APP_TITLE, f"Klarte ikke lese Excel:\n{e}")
+            finalize()
+
+        def success(data):
+            self.session.set_invoice_data(data)
+            self.antall_bilag = len(self.df.dropna(how="all"))
+            self.idx = 0
+            if data["kunde"]:
+                self.kunde_var.set(data["kunde"])
+                if hasattr(self, "kunde_entry"):
+                    self.kunde_entry.configure(state="disabled")
+            self._reset_prefetch()
+            if not self.session.has_invoices:
+                messagebox.showwarning(APP_TITLE, "Excel-filen ser tom ut.")
                 finalize()
-
-            self.after(0, success)
-
-        run_in_thread(worker)
+                return
+            self._update_counts_labels()
+            self.render()
+            self._update_year_options()
+            finalize()
+
+        self.jobs.submit(
+            "fakturaliste",
+            worker,
+            priority=JOB_PRIORITY_LOAD,
+            on_done=success,
+            on_error=failed,
+            on_cancel=finalize,
+        )
 
     def _load_gl_excel(self):
         from tkinter import messagebox
 
         self._ensure_helpers()
-        from data_utils import load_gl_df
-        from .busy import show_busy, hide_busy, run_in_thread
+        from data_utils import load_gl_data
+        from data_cache import cached_load
+        from .busy import show_busy, hide_busy
 
         path = self.gl_path_var.get()
         if not path:
@@ -565,60 +670,49 @@ class App:
         def finalize():
             if big and hasattr(self, "inline_status"):
                 self.inline_status.configure(text="")
-            self._finish_progress()
+            self._finish_progress(progress)
             hide_busy(self)
 
-        def worker():
-            self.after(0, lambda: self._start_progress("Laster hovedbok..."))
-            try:
-                gl = load_gl_df(path, nrows=10)
-            except (OSError, ValueError) as e:
-                logger.error(f"Klarte ikke lese hovedbok: {e}")
-                self.after(0, lambda: (messagebox.showerror(APP_TITLE, f"Klarte ikke lese hovedbok:\n{e}"), finalize()))
-                return
+        def build():
+            return load_gl_data(path, progress=progress, in_process=PARSE_IN_PROCESS and big)
+
+        progress = self._start_progress("Laster hovedbok...")
+
+        def worker(token):
+            progress.token = token
+            return cached_load("hovedbok", path, build, nrows=10)
 
-            def success():
-                if gl is None or gl.dropna(how="all").empty:
-                    messagebox.showwarning(APP_TITLE, "Hovedboken ser tom ut.")
-                    finalize()
-                    return
-
-                self.gl_df = gl
-                cols = [str(c) for c in gl.columns]
-                self.gl_invoice_col     = guess_invoice_col(cols)
-                self.gl_accountno_col   = guess_col(cols, r"^kontonr\.?$", r"konto.*nummer", r"account.*(number|no)", r"acct.*no")
-                self.gl_accountname_col = guess_col(cols, r"^kontonavn$", r"konto\s*navn", r"^konto$", r"account.*name", r"(?:^| )navn$")
-                self.gl_text_col        = guess_col(cols, r"^tekst$", r"text", r"posteringstekst")
-                self.gl_desc_col        = guess_col(cols, r"beskrivelse", r"description", r"forklaring")
-                self.gl_vatcode_col     = guess_col(cols, r"^mva(?!-)|mva[- ]?kode", r"^vat(?!.*amount)|tax code")
-                self.gl_vatamount_col   = guess_col(cols, r"mva[- ]?bel(ø|o)p", r"vat amount", r"tax amount")
-                self.gl_debit_col       = guess_col(cols, r"^debet$", r"debit")
-                self.gl_credit_col      = guess_col(cols, r"^kredit$", r"credit")
-                self.gl_amount_col      = guess_col(cols, r"^bel(ø|o)p$", r"amount", r"sum")
-                self.gl_postedby_col    = guess_col(cols, r"postert\s*av", r"bokf(ø|o)rt\s*av", r"registrert\s*av", r"posted\s*by", r"created\s*by")
-
-                from helpers import only_digits
-                if self.gl_invoice_col in self.gl_df.columns:
-                    self.gl_df["_inv_norm"] = self.gl_df[self.gl_invoice_col].map(only_digits)
-                else:
-                    self.gl_df["_inv_norm"] = ""
-                self.gl_index = self.gl_df.groupby("_inv_norm").indices
-
-                from .ledger import populate_ledger_table
-                from .mainview import build_ledger_widgets
-                self.populate_ledger_table = populate_ledger_table
-
-                if not hasattr(self, "ledger_tree"):
-                    build_ledger_widgets(self)
-
-                if self.sample_df is not None:
-                    self.render()
-                self._update_year_options()
+        def failed(e):
+            logger.error(f"Klarte ikke lese hovedbok: {e}")
+            messagebox.showerror(APP_TITLE, f"Klarte ikke lese hovedbok:\n{e}")
+            finalize()
+
+        def success(data):
+            gl = data["df"]
+            if gl is None or gl.dropna(how="all").empty:
+                messagebox.showwarning(APP_TITLE, "Hovedboken ser tom ut.")
                 finalize()
+                return
 
-            self.after(0, success)
+            self.session.set_gl_data(data)
+            self._reset_prefetch()
 
-        run_in_thread(worker)
+            if not hasattr(self, "ledger_tree"):
+                self._build_ledger_widgets()
+
+            if self.sample_df is not None:
+                self.render()
+            self._update_year_options()
+            finalize()
+
+        self.jobs.submit(
+            "hovedbok",
+            worker,
+            priority=JOB_PRIORITY_LOAD,
+            on_done=success,
+            on_error=failed,
+            on_cancel=finalize,
+        )
 # Sampling / nav
     def _update_counts_labels(self):
         self.lbl_filecount.configure(text=f"Antall bilag: {self.antall_bilag}")
@@ -634,23 +728,18 @@ class App:
         except ValueError:
             messagebox.showinfo(APP_TITLE, "Oppgi antall og år.")
             return
-        n = max(1, min(n, len(self.df)))
-        logger.info(f"Trekker utvalg på {n} bilag for år {year}")
         try:
-            self.sample_df = (
-                self.df.sample(n=n, random_state=year)
-                .reset_index(drop=True)
-                .copy()
-            )
+            self.session.make_sample(n, year)
         except ValueError as e:
             logger.error(f"Feil ved trekking av utvalg: {e}")
             messagebox.showerror(APP_TITLE, f"Feil ved trekking av utvalg:\n{e}"); return
-        self.decisions = [None]*len(self.sample_df); self.comments=[""]*len(self.sample_df); self.idx=0
+        self.idx = 0
+        self._reset_prefetch()
         self.render()
 
-    def _current_row_dict(self):
+    def _current_row_dict(self, idx=None):
         self._ensure_helpers()
-        row = self.sample_df.iloc[self.idx]
+        row = self.sample_df.iloc[self.idx if idx is None else idx]
         return {
             str(c): to_str(row[c])
             for c in self.sample_df.columns
@@ -660,7 +749,8 @@ class App:
     def set_decision_and_next(self, val, advance=True):
         if self.sample_df is None: return
         self.comments[self.idx] = self.comment_box.get("0.0", "end").strip()
-        self.decisions[self.idx] = val
+        self.session.record(self.idx, val)
+        self._prerender(self.idx)
         if advance and self.idx < len(self.sample_df) - 1:
             self.idx += 1
         self.render()
@@ -668,12 +758,14 @@ class App:
     def prev(self):
         if self.sample_df is None: return
         self.comments[self.idx] = self.comment_box.get("0.0", "end").strip()
+        self._prerender(self.idx)
         self.idx = max(0, self.idx - 1)
         self.render()
 
     def next(self):
         if self.sample_df is None: return
         self.comments[self.idx] = self.comment_box.get("0.0", "end").strip()
+        self._prerender(self.idx)
         self.idx = min(len(self.sample_df) - 1, self.idx + 1)
         self.render()
 
@@ -699,85 +791,138 @@ class App:
     # Summary / status
     def _update_status_card(self):
         self._ensure_helpers()
-        from data_utils import calc_sum_kontrollert, calc_sum_net_all
-        sum_k = calc_sum_kontrollert(self.sample_df, self.decisions)
-        sum_a = calc_sum_net_all(self.df)
+        review = self.review
+        sum_k = review.sum_kontrollert if review is not None else Decimal("0")
+        sum_a = self.sum_net_all
         pct = (sum_k / sum_a * Decimal("100")) if sum_a else Decimal("0")
         self.lbl_st_sum_kontrollert.configure(text=f"Sum kontrollert: {fmt_money(sum_k)} kr")
         self.lbl_st_sum_alle.configure(text=f"Sum alle bilag: {fmt_money(sum_a)} kr")
         self.lbl_st_pct.configure(text=f"% kontrollert av sum: {fmt_pct(pct)}")
-        if self.sample_df is not None:
-            approved = sum(1 for d in self.decisions if d == "Godkjent")
-            rejected = sum(1 for d in self.decisions if d == "Ikke godkjent")
-            remaining = sum(1 for d in self.decisions if d is None)
+        if self.sample_df is not None and review is not None:
+            approved = review.count("Godkjent")
+            rejected = review.count("Ikke godkjent")
+            remaining = review.count(None)
             self.lbl_st_godkjent.configure(text=f"Godkjent: {approved}")
             self.lbl_st_ikkegodkjent.configure(text=f"Ikke godkjent: {rejected}")
             self.lbl_st_gjen.configure(text=f"Gjenstår å kontrollere: {remaining}")
             if remaining == 0 and not self._pdf_prompt_shown:
                 from tkinter import messagebox
-                from report import export_pdf
-                from .busy import show_busy, hide_busy, run_in_thread
 
                 self._pdf_prompt_shown = True
                 if messagebox.askyesno(APP_TITLE, "Ønsker du å eksportere PDF rapport?"):
-                    show_busy(self, "Eksporterer rapport...")
-
-                    def finalize():
-                        self._finish_progress()
-                        hide_busy(self)
-
-                    def worker():
-                        self.after(0, lambda: self._start_progress("Eksporterer rapport..."))
-                        try:
-                            export_pdf(self)
-                        finally:
-                            self.after(0, finalize)
-
-                    run_in_thread(worker)
+                    self._export_pdf()
         else:
             self.lbl_st_godkjent.configure(text="Godkjent: –")
             self.lbl_st_ikkegodkjent.configure(text="Ikke godkjent: –")
             self.lbl_st_gjen.configure(text="Gjenstår å kontrollere: –")
 
     # Status
+    # Hvor ofte framdriften hentes fra bakgrunnsarbeidet (millisekunder)
+    PROGRESS_FRAME_MS = 100
+
     def _start_progress(self, msg: str):
-        self._progress_msg = msg
-        self._progress_val = 0
-        self._progress_running = True
+        """Vis framdrift for en ny jobb og returner kanalen den rapporterer til.
+
+        Kanalen kan kalles fra bakgrunnstråden. Hovedtråden henter siste
+        tilstand hvert ``PROGRESS_FRAME_MS`` millisekund. Når flere jobber
+        går samtidig vises den som startet sist.
+        """
+        from progress import ProgressChannel
+
+        channel = ProgressChannel(msg)
+        self._progress.append(channel)
         self._set_status(msg, 0)
-        self._progress_job = self.after(100, self._progress_step)
+        if self._progress_job is None:
+            self._progress_job = self.after(self.PROGRESS_FRAME_MS, self._progress_step)
+        return channel
 
     def _progress_step(self):
-        if not self._progress_running:
+        from progress import fmt_eta
+
+        self._progress_job = None
+        if not self._progress:
             return
-        self._progress_val = min(95, self._progress_val + 2)
-        self._set_status(self._progress_msg, self._progress_val)
-        self._progress_job = self.after(100, self._progress_step)
+        state = self._progress[-1].snapshot(force=True)
+        if state.fraction is None:
+            self._set_status(state.message)
+        else:
+            eta = fmt_eta(state.eta)
+            self._set_status(
+                state.message,
+                state.fraction * 100,
+                f"{eta} igjen" if eta else "",
+            )
+        self._progress_job = self.after(self.PROGRESS_FRAME_MS, self._progress_step)
 
-    def _finish_progress(self):
-        self._progress_running = False
+    def _finish_progress(self, channel=None):
+        """Avslutt framdriften for ``channel`` (eller alle jobber)."""
+        if channel is None:
+            finished = self._progress[-1:]
+            self._progress.clear()
+        else:
+            finished = [c for c in self._progress if c is channel]
+            self._progress = [c for c in self._progress if c is not channel]
+        if self._progress:
+            return
         if self._progress_job is not None:
             self.after_cancel(self._progress_job)
             self._progress_job = None
-        self._set_status(self._progress_msg, 100)
-        self.after(500, lambda: self._set_status(""))
+        if finished:
+            self._set_status(finished[0].snapshot(force=True).message, 100)
+        self.after(500, lambda: None if self._progress else self._set_status(""))
 
-    def _set_status(self, msg: str, progress: float | None = None):
+    def _set_status(self, msg: str, progress: float | None = None, detail: str = ""):
         if hasattr(self, "status_label"):
             if progress is not None:
-                self.status_label.configure(text=f"{msg} {progress:.0f}%")
+                text = f"{msg} {progress:.0f}%"
             else:
-                self.status_label.configure(text=msg)
-            self.status_label.update_idletasks()
+                text = msg
+            if detail:
+                text = f"{text} – {detail}"
+            self.status_label.configure(text=text)
         if hasattr(self, "progress_bar"):
             if progress is not None:
                 self.progress_bar.grid(**getattr(self, "progress_bar_grid", {}))
                 self.progress_bar.set(max(0, min(1, progress / 100)))
-                self.progress_bar.update_idletasks()
             else:
                 self.progress_bar.grid_remove()
 
     # PDF
+    def _export_pdf(self):
+        """Spør etter filnavn og lag PDF-rapporten som bakgrunnsjobb.
+
+        Eksporten venter til pågående innlesing er ferdig.
+        """
+        from report import ask_pdf_path, export_pdf
+        from .busy import show_busy, hide_busy
+
+        save = ask_pdf_path(self)
+        if not save:
+            return
+        # Tk-variabler leses her i hovedtråden, ikke under eksporten
+        self.session.kunde = self.kunde_var.get() if hasattr(self, "kunde_var") else ""
+        self.session.utfort_av = self.utfort_av_var.get() if hasattr(self, "utfort_av_var") else ""
+        show_busy(self, "Eksporterer rapport...")
+        progress = self._start_progress("Eksporterer rapport...")
+
+        def finalize(*_):
+            self._finish_progress(progress)
+            hide_busy(self)
+
+        def worker(token):
+            progress.token = token
+            export_pdf(self, save, progress)
+
+        self.jobs.submit(
+            "eksport",
+            worker,
+            priority=JOB_PRIORITY_EXPORT,
+            after=("fakturaliste", "hovedbok"),
+            on_done=finalize,
+            on_error=finalize,
+            on_cancel=finalize,
+        )
+
     # Inline
     def _show_inline(self, msg: str, ok=True):
         self.inline_status.configure(
@@ -824,26 +969,54 @@ class App:
         except Exception:
             logger.exception("Feil ved oppdatering av statuskort")
 
+    def _reset_prefetch(self):
+        if getattr(self, "_prefetcher", None) is not None:
+            self._prefetcher.clear()
+        if getattr(self, "_fragments", None) is not None:
+            self._fragments.clear()
+
+    def _prerender(self, idx):
+        """Legg ut bilag ``idx`` for PDF-rapporten i bakgrunnen hvis det er vurdert."""
+        if getattr(self, "_fragments", None) is None:
+            return
+        if not (self.decisions[idx] or self.comments[idx]):
+            return
+        try:
+            from report import bilag_section
+
+            # Bilagslinjene hentes i bakgrunnstråden, se ``_section_with_ledger``
+            section = bilag_section(self.session, idx, len(self.sample_df), ledger=False)
+            self._fragments.submit(section)
+        except Exception:
+            logger.exception(f"Kunne ikke klargjøre bilag {idx + 1} for PDF-rapporten")
+
+    def _section_with_ledger(self, section):
+        from report import add_ledger
+
+        return add_ledger(self.session, section)
+
     def render(self):
         self._ensure_helpers()
         self._update_counts_labels()
         if self.sample_df is not None and len(self.sample_df)>0:
             self.lbl_count.configure(text=f"Bilag: {self.idx+1}/{len(self.sample_df)}")
-            inv_val = to_str(self.sample_df.iloc[self.idx].get(self.invoice_col, "")) if len(self.sample_df)>0 else "—"
+            from .prefetch import current_payload
+            payload = current_payload(self)
+            inv_val = payload["invoice"]
             self.lbl_invoice.configure(text=f"Fakturanr: {inv_val or '—'}")
             st = self.decisions[self.idx] if (self.decisions and self.idx < len(self.decisions)) else None
             self._update_status_label(st)
 
-            row_dict = self._current_row_dict()
             self.detail_box.configure(state="normal"); self.detail_box.delete("0.0","end")
-            self.detail_box.insert("0.0", self._details_text_for_row(row_dict)); self.detail_box.configure(state="disabled")
+            self.detail_box.insert("0.0", payload["details"]); self.detail_box.configure(state="disabled")
 
-            if hasattr(self, "populate_ledger_table") and hasattr(self, "ledger_tree"):
-                self.populate_ledger_table(self, inv_val)
+            if getattr(self, "gl_view", None) is not None and hasattr(self, "ledger_tree"):
+                from .ledger import fill_ledger_table
+                fill_ledger_table(self, payload["ledger"])
             else:
                 if hasattr(self, "ledger_tree"):
-                    for item in self.ledger_tree.get_children():
-                        self.ledger_tree.delete(item)
+                    from .ledger import clear_ledger_table
+                    clear_ledger_table(self)
                 if hasattr(self, "ledger_sum"):
                     msg = (
                         "Last gjerne også inn en hovedbok for å se bilagslinjene."
@@ -861,8 +1034,8 @@ class App:
             self._update_status_label(None, placeholder="–")
             self.detail_box.configure(state="normal"); self.detail_box.delete("0.0","end"); self.detail_box.insert("0.0","Velg Excel-fil og lag et utvalg."); self.detail_box.configure(state="disabled")
             if hasattr(self, "ledger_tree"):
-                for item in self.ledger_tree.get_children():
-                    self.ledger_tree.delete(item)
+                from .ledger import clear_ledger_table
+                clear_ledger_table(self)
             if hasattr(self, "ledger_sum"):
                 msg = (
                     "Last gjerne også inn en hovedbok for å se bilagslinjene."
@@ -1,4 +1,3 @@
-import threading
 from tkinter import TclError
 
 from helpers import logger
@@ -6,15 +5,18 @@ from . import _ctk
 from .style import PADDING_X, PADDING_Y
 
 
-def run_in_thread(func, *args):
-    """Start ``func`` i en bakgrunnstråd og returner trådobjektet."""
-    thread = threading.Thread(target=func, args=args, daemon=True)
-    thread.start()
-    return thread
+def show_busy(app, message: str):
+    """Vis en modal ventedialog med en spinner og tekst.
 
+    Er dialogen allerede åpen for en annen jobb, gjenbrukes den med ny
+    tekst. Den lukkes når :func:`hide_busy` er kalt like mange ganger.
+    """
+    win = getattr(app, "_busy_win", None)
+    if win is not None:
+        app._busy_count += 1
+        app._busy_label.configure(text=message)
+        return win
 
-def show_busy(app, message: str):
-    """Vis en modal ventedialog med en spinner og tekst."""
     ctk = _ctk()
     win = ctk.CTkToplevel(app)
     win.title("")
@@ -25,9 +27,11 @@ def show_busy(app, message: str):
     progress = ctk.CTkProgressBar(win, mode="indeterminate")
     progress.pack(padx=PADDING_X * 2, pady=(PADDING_Y * 2, PADDING_Y), fill="x")
     progress.start()
-    ctk.CTkLabel(win, text=message).pack(padx=PADDING_X * 2, pady=(0, PADDING_Y * 2))
+    app._busy_label = ctk.CTkLabel(win, text=message)
+    app._busy_label.pack(padx=PADDING_X * 2, pady=(0, PADDING_Y * 2))
 
     app._busy_win = win
+    app._busy_count = 1
     win.update_idletasks()
     x = app.winfo_x() + app.winfo_width() // 2 - win.winfo_width() // 2
     y = app.winfo_y() + app.winfo_height() // 2 - win.winfo_height() // 2
@@ -39,6 +43,9 @@ def hide_busy(app):
     """Lukk ventedialogen hvis den er åpen."""
     win = getattr(app, "_busy_win", None)
     if win is not None:
+        app._busy_count -= 1
+        if app._busy_count > 0:
+            return
         try:
             win.grab_release()
         except TclError:
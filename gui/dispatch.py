@@ -0,0 +1,83 @@
+"""Kø for GUI-oppdateringer fra bakgrunnstråder.
+
+Tk-widgeter skal bare røres fra hovedtråden. Bakgrunnsjobber legger derfor
+kall i :class:`UiDispatcher` med :meth:`UiDispatcher.post`, og hovedløkken
+tømmer køen i porsjoner via ``after()``. Kall med samme ``key`` slås sammen
+slik at bare det siste utføres, noe som holder for eksempel statuslinjen
+oppdatert uten et kall per bilag.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+from collections import OrderedDict
+
+from helpers import logger
+
+# Hvor ofte køen tømmes (millisekunder) og maks antall kall per runde
+UI_FRAME_MS = 16
+UI_BATCH = 200
+
+
+class UiDispatcher:
+    def __init__(self, batch: int = UI_BATCH):
+        self._lock = threading.Lock()
+        self._pending: OrderedDict = OrderedDict()
+        self._seq = itertools.count()
+        self._widget = None
+        self._job = None
+        self.batch = batch
+
+    def post(self, func, *args, key=None, **kwargs) -> None:
+        """Legg ``func(*args, **kwargs)`` i køen. Kan kalles fra alle tråder.
+
+        Med ``key`` erstattes et tidligere kall med samme nøkkel som ennå
+        ikke er utført, og kallet flyttes bakerst i køen.
+        """
+        slot = ("key", key) if key is not None else ("seq", next(self._seq))
+        with self._lock:
+            self._pending.pop(slot, None)
+            self._pending[slot] = (func, args, kwargs)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self, limit: int | None = None) -> int:
+        """Utfør ventende kall i rekkefølge. Skal kalles fra hovedtråden."""
+        with self._lock:
+            n = len(self._pending) if limit is None else min(limit, len(self._pending))
+            calls = [self._pending.popitem(last=False)[1] for _ in range(n)]
+        for func, args, kwargs in calls:
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("Feil i GUI-oppdatering")
+        return n
+
+    def attach(self, widget, interval_ms: int = UI_FRAME_MS) -> None:
+        """Tøm køen fra ``widget`` sin hovedløkke hvert ``interval_ms``."""
+        self._widget = widget
+
+        def tick():
+            self.drain(self.batch)
+            self._job = widget.after(interval_ms, tick)
+
+        self._job = widget.after(interval_ms, tick)
+
+    def detach(self) -> None:
+        if self._widget is not None and self._job is not None:
+            self._widget.after_cancel(self._job)
+        self._widget = self._job = None
+
+
+def post_ui(app, func, *args, key=None, **kwargs) -> None:
+    """Kjør ``func`` i hovedtråden via ``app.ui``.
+
+    Uten dispatcher (for eksempel i tester) kalles ``func`` direkte.
+    """
+    ui = getattr(app, "ui", None)
+    if ui is None:
+        func(*args, **kwargs)
+    else:
+        ui.post(func, *args, key=key, **kwargs)
@@ -1,6 +1,6 @@
-LEDGER_COLS = ["Kontonr", "Konto", "Beskrivelse", "MVA", "MVA-beløp", "Beløp", "Postert av"]
-
-from decimal import Decimal
+from data_utils import LEDGER_COLS
+# Oppslagene i hovedboken ligger i ``session`` og brukes også uten GUI
+from session import ledger_hits, ledger_rows, ledger_total  # noqa: F401
 
 
 def apply_treeview_theme(app):
@@ -55,22 +55,26 @@ def update_treeview_stripes(app):
     app.ledger_tree.tag_configure("even", background=even)
 
 
-def sort_treeview(tree, col, reverse, app):
-    """Sorter rader i ``tree`` etter valgt kolonne."""
+def _sort_key(cell):
     from helpers import parse_amount
 
-    data = []
-    for iid in tree.get_children(""):
-        cell = tree.set(iid, col)
-        num = parse_amount(cell)
-        sort_val = num if num is not None else str(cell).lower()
-        data.append((sort_val, iid))
-    data.sort(reverse=reverse)
-    for idx, (_, iid) in enumerate(data):
-        tree.move(iid, "", idx)
-    for idx, iid in enumerate(tree.get_children("")):
-        tag = "even" if idx % 2 == 0 else "odd"
-        tree.item(iid, tags=(tag,))
+    num = parse_amount(cell)
+    return (0, num, "") if num is not None else (1, 0, str(cell).lower())
+
+
+def sort_treeview(tree, col, reverse, app):
+    """Sorter rader i ``tree`` etter valgt kolonne."""
+    grid = getattr(app, "ledger_grid", None)
+    if grid is not None and grid.tree is tree:
+        grid.sort(col, reverse)
+    else:
+        data = [(_sort_key(tree.set(iid, col)), iid) for iid in tree.get_children("")]
+        data.sort(reverse=reverse)
+        for idx, (_, iid) in enumerate(data):
+            tree.move(iid, "", idx)
+        for idx, iid in enumerate(tree.get_children("")):
+            tag = "even" if idx % 2 == 0 else "odd"
+            tree.item(iid, tags=(tag,))
     arrow = "↓" if reverse else "↑"
     for c in LEDGER_COLS:
         if c == col:
@@ -86,64 +90,125 @@ def sort_treeview(tree, col, reverse, app):
     update_treeview_stripes(app)
 
 
-def ledger_rows(app, invoice_value: str):
-    """Hent bilagslinjer for gitt bilagsnummer uten å endre ``gl_df``."""
-    import re
-    from helpers import to_str, only_digits, parse_amount, fmt_money
-
-    if app.gl_df is None or not hasattr(app, "gl_index"):
-        return []
-    key = only_digits(invoice_value)
-    if not key:
-        return []
-    idxs = app.gl_index.get(key)
-    if idxs is None or len(idxs) == 0:
-        return []
-    # ``groupby().indices`` returnerer numpy-arrays; ``len`` fungerer for å
-    # sjekke tomme treff uten å utløse "ambiguous truth value".
-    hits = app.gl_df.loc[idxs]
-    rows = []
-    for _, r in hits.iterrows():
-        konto_nr = to_str(r.get(app.gl_accountno_col, ""))
-        if not konto_nr:
-            cand = to_str(r.get(app.gl_accountname_col, ""))
-            m = re.match(r"^\s*(\d{3,6})\b", cand)
-            if m:
-                konto_nr = m.group(1)
-        konto_navn = to_str(r.get(app.gl_accountname_col, ""))
-        if not konto_navn:
-            combo = to_str(r.get(app.gl_accountno_col, ""))
-            m = re.match(r"^\s*(\d{3,6})\s*[-–:]?\s*(.+)$", combo)
-            if m:
-                if not konto_nr:
-                    konto_nr = m.group(1)
-                konto_navn = m.group(2)
-        beskr = to_str(r.get(app.gl_desc_col, "")) or to_str(r.get(app.gl_text_col, ""))
-        mva_code = to_str(r.get(app.gl_vatcode_col, ""))
-        mva_belop = fmt_money(r.get(app.gl_vatamount_col, ""))
-        deb = parse_amount(r.get(app.gl_debit_col)) if app.gl_debit_col else None
-        kre = parse_amount(r.get(app.gl_credit_col)) if app.gl_credit_col else None
-        belop = parse_amount(r.get(app.gl_amount_col)) if app.gl_amount_col else None
-        if belop is None and (deb is not None or kre is not None):
-            belop = (
-                (deb if deb is not None else Decimal("0"))
-                - (kre if kre is not None else Decimal("0"))
-            )
-        belop_str = fmt_money(belop)
-        postert_av = to_str(r.get(app.gl_postedby_col, ""))
-        rows.append({
-            "Kontonr": konto_nr,
-            "Konto": konto_navn,
-            "Beskrivelse": beskr,
-            "MVA": mva_code,
-            "MVA-beløp": mva_belop,
-            "Beløp": belop_str,
-            "Postert av": postert_av,
-        })
-    return rows
-
-
-def autofit_tree_columns(tree, cols, total_width=None):
+class VirtualTreeview:
+    """Viser bare de synlige radene av en lang liste i en ``ttk.Treeview``.
+
+    Alle rader ligger i ``rows``, mens treet kun har så mange elementer som
+    får plass i høyden. Ved rulling gjenbrukes elementene og får nye
+    verdier, slik at bilag med tusenvis av linjer vises like raskt som
+    bilag med noen få.
+    """
+
+    WHEEL_STEP = 3
+
+    def __init__(self, tree, scrollbar=None, rowheight: int = 24):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rowheight = rowheight
+        self.rows: list = []
+        self.start = 0
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(seq, self._on_wheel, add="+")
+        tree.bind("<Configure>", lambda e: self.refresh(), add="+")
+
+    def visible_rows(self) -> int:
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget("height"))
+        # Én rad går med til kolonneoverskriftene.
+        return max(1, height // self.rowheight - 1)
+
+    def set_rows(self, rows) -> None:
+        self.rows = list(rows)
+        self.start = 0
+        self.refresh()
+
+    def sort(self, col, reverse: bool = False) -> None:
+        i = list(self.tree["columns"]).index(col)
+        self.rows.sort(key=lambda r: _sort_key(r[i]), reverse=reverse)
+        self.start = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        visible = self.visible_rows()
+        self.start = max(0, min(self.start, len(self.rows) - visible))
+        window = self.rows[self.start : self.start + visible]
+        items = self.tree.get_children("")
+        for i, values in enumerate(window):
+            tag = "even" if (self.start + i) % 2 == 0 else "odd"
+            if i < len(items):
+                self.tree.item(items[i], values=list(values), tags=(tag,))
+            else:
+                self.tree.insert("", "end", values=list(values), tags=(tag,))
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+        if self.scrollbar is not None:
+            if self.rows:
+                n = len(self.rows)
+                self.scrollbar.set(self.start / n, min(1.0, (self.start + visible) / n))
+            else:
+                self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args) -> None:
+        """Kommando for rullefeltet, med samme argumenter som ``Treeview.yview``."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.start = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if str(args[2]).startswith("page") else 1
+            self.start += int(args[1]) * step
+        self.refresh()
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            units = -1
+        elif getattr(event, "num", None) == 5:
+            units = 1
+        else:
+            units = -1 if event.delta > 0 else 1
+        self.start += units * self.WHEEL_STEP
+        self.refresh()
+        return "break"
+
+
+def clear_ledger_table(app):
+    """Fjern alle rader fra hovedboktabellen."""
+    grid = getattr(app, "ledger_grid", None)
+    if grid is not None:
+        grid.set_rows([])
+        return
+    for item in app.ledger_tree.get_children():
+        app.ledger_tree.delete(item)
+
+
+# Antall celler per kolonne som måles ved autotilpasning av bredder
+AUTOFIT_SAMPLE = 25
+_MEASURE_CACHE: dict = {}
+_MEASURE_CACHE_MAX = 20_000
+
+
+def _measure(font, font_key, text: str) -> int:
+    key = (font_key, text)
+    px = _MEASURE_CACHE.get(key)
+    if px is None:
+        if len(_MEASURE_CACHE) >= _MEASURE_CACHE_MAX:
+            _MEASURE_CACHE.clear()
+        px = _MEASURE_CACHE[key] = font.measure(text)
+    return px
+
+
+def autofit_tree_columns(tree, cols, total_width=None, rows=None):
+    """Tilpass kolonnebreddene i ``tree`` til innholdet.
+
+    ``rows`` er alle radene som tabellen viser (også de som ikke er synlige
+    i en :class:`VirtualTreeview`). Uten ``rows`` brukes elementene i treet.
+    Bare de ``AUTOFIT_SAMPLE`` lengste tekstene i hver kolonne måles, og
+    målingene mellomlagres per skrifttype.
+    """
+    import heapq
     import tkinter.font as tkfont
     from tkinter import ttk
     from .style import PADDING_X
@@ -157,14 +222,18 @@ def autofit_tree_columns(tree, cols, total_width=None):
     body_font = tkfont.nametofont(font_name)
     head_font_name = ttk_style.lookup(f"{tree.cget('style')}.Heading", "font")
     head_font = tkfont.nametofont(head_font_name) if head_font_name else body_font
+    body_key = str(body_font.actual())
+
+    if rows is None:
+        rows = [tuple(tree.set(iid, c) for c in cols) for iid in tree.get_children("")]
 
     widths: list[int] = []
     MIN_COL_WIDTH = PADDING_X * 4
-    for col in cols:
+    for ci, col in enumerate(cols):
         max_px = head_font.measure(col)
-        for iid in tree.get_children(""):
-            txt = str(tree.set(iid, col))
-            px = body_font.measure(txt)
+        texts = {str(r[ci]) for r in rows}
+        for txt in heapq.nlargest(AUTOFIT_SAMPLE, texts, key=len):
+            px = _measure(body_font, body_key, txt)
             if px > max_px:
                 max_px = px
         max_px += PADDING_X * 4
@@ -184,21 +253,43 @@ def autofit_tree_columns(tree, cols, total_width=None):
         tree.column(col, width=w, minwidth=w)
 
 
-def populate_ledger_table(app, invoice_value: str):
-    from helpers import parse_amount, fmt_money
+def ledger_payload(app, invoice_value: str):
+    """Klargjør radene og summen som vises i hovedboktabellen.
 
-    for item in app.ledger_tree.get_children():
-        app.ledger_tree.delete(item)
-    rows = ledger_rows(app, invoice_value)
-    if not rows:
+    Returnerer ``None`` hvis det ikke finnes linjer for bilaget. Funksjonen
+    berører ingen widgets og kan derfor kjøres i en bakgrunnstråd.
+    """
+    hits = ledger_hits(app, invoice_value)
+    if hits is None:
+        return None
+    return {
+        "rows": list(hits[LEDGER_COLS].itertuples(index=False, name=None)),
+        "total": ledger_total(hits),
+    }
+
+
+def fill_ledger_table(app, payload):
+    """Vis et ferdig resultat fra :func:`ledger_payload` i tabellen."""
+    from helpers import fmt_money
+
+    rows = payload["rows"] if payload is not None else []
+    grid = getattr(app, "ledger_grid", None)
+    if grid is not None:
+        grid.set_rows(rows)
+    else:
+        clear_ledger_table(app)
+        for i, values in enumerate(rows):
+            tags = ["even" if i % 2 == 0 else "odd"]
+            app.ledger_tree.insert("", "end", values=list(values), tags=tags)
+    if payload is None:
         msg = "Ingen hovedbok lastet." if app.gl_df is None else "Ingen bilagslinjer for dette bilagsnummeret."
         app.ledger_sum.configure(text=msg)
         return
-    total = Decimal("0")
-    for i, r in enumerate(rows):
-        tags = ["even" if i % 2 == 0 else "odd"]
-        v = parse_amount(r["Beløp"])
-        total += (v if v is not None else Decimal("0"))
-        app.ledger_tree.insert("", "end", values=[r[c] for c in app.ledger_cols], tags=tags)
-    autofit_tree_columns(app.ledger_tree, app.ledger_cols)
-    app.ledger_sum.configure(text=f"Sum beløp: {fmt_money(total)}   •   Linjer: {len(rows)}")
+    autofit_tree_columns(app.ledger_tree, app.ledger_cols, rows=rows)
+    app.ledger_sum.configure(
+        text=f"Sum beløp: {fmt_money(payload['total'])}   •   Linjer: {len(rows)}"
+    )
+
+
+def populate_ledger_table(app, invoice_value: str):
+    fill_ledger_table(app, ledger_payload(app, invoice_value))
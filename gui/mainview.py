@@ -156,27 +156,8 @@ def build_bottom(app):
     bottom.grid_columnconfigure(1, weight=1)
     app.bottom_frame = bottom
 
-    def _export_pdf():
-        from report import export_pdf
-        from .busy import show_busy, hide_busy, run_in_thread
-
-        show_busy(app, "Eksporterer rapport...")
-
-        def finalize():
-            app._finish_progress()
-            hide_busy(app)
-
-        def worker():
-            app.after(0, lambda: app._start_progress("Eksporterer rapport..."))
-            try:
-                export_pdf(app)
-            finally:
-                app.after(0, finalize)
-
-        run_in_thread(worker)
-
     export_btn = create_button(
-        bottom, text="📄 Eksporter PDF rapport", command=_export_pdf
+        bottom, text="📄 Eksporter PDF rapport", command=app._export_pdf
     )
     export_btn.grid(
         row=0,
@@ -241,10 +222,14 @@ def resize_ledger_columns(app):
         return
 
     app._prev_ledger_width = width
+    grid = getattr(app, "ledger_grid", None)
     app.after(
         100,
         lambda: ledger.autofit_tree_columns(
-            app.ledger_tree, app.ledger_cols, width
+            app.ledger_tree,
+            app.ledger_cols,
+            width,
+            rows=grid.rows if grid is not None else None,
         ),
     )
 
@@ -259,6 +244,7 @@ def build_ledger_widgets(app):
         apply_treeview_theme,
         update_treeview_stripes,
         sort_treeview,
+        VirtualTreeview,
     )
 
     right = app.right_frame
@@ -282,9 +268,9 @@ def build_ledger_widgets(app):
         )
         app.ledger_tree.column(col, width=w, minwidth=60, anchor=anchor, stretch=True)
 
-    yscroll = ctk.CTkScrollbar(right, orientation="vertical", command=app.ledger_tree.yview)
+    yscroll = ctk.CTkScrollbar(right, orientation="vertical")
     xscroll = ctk.CTkScrollbar(right, orientation="horizontal", command=app.ledger_tree.xview)
-    app.ledger_tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+    app.ledger_tree.configure(xscrollcommand=xscroll.set)
     app.ledger_tree.grid(row=1, column=0, sticky="nsew")
     yscroll.grid(row=1, column=1, sticky="ns")
     xscroll.grid(row=2, column=0, sticky="ew")
@@ -293,6 +279,9 @@ def build_ledger_widgets(app):
     app._ledger_configure_id = app.ledger_tree.bind(
         "<Configure>", lambda e: resize_ledger_columns(app)
     )
+    # Rullefeltet styres av den virtuelle visningen, som bare legger de
+    # synlige radene inn i treet.
+    app.ledger_grid = VirtualTreeview(app.ledger_tree, yscroll)
 
     apply_treeview_theme(app)
     update_treeview_stripes(app)
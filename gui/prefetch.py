@@ -0,0 +1,125 @@
+"""Forhåndsberegning av visningsdata for nabobilag.
+
+Når brukeren blar med Neste/Forrige bygges detaljtekst og bilagslinjer for
+bilagene rundt det aktive i en bakgrunnstråd. ``render()`` kan da hente et
+ferdig resultat og bare fylle widgetene.
+"""
+from collections import OrderedDict
+
+from helpers import logger
+from jobs import IndexWorker
+
+# Antall bilag som forhåndsberegnes i hver retning
+PREFETCH_RADIUS = 3
+# Maksimalt antall ferdige resultater som holdes i minnet
+PREFETCH_CACHE_SIZE = 16
+
+
+def build_render_payload(app, idx: int, row_dict: dict) -> dict:
+    """Bygg alt ``render()`` trenger for bilag ``idx`` uten å røre widgets."""
+    from helpers import to_str
+    from .ledger import ledger_payload
+
+    inv_val = to_str(app.sample_df.iloc[idx].get(app.invoice_col, ""))
+    ledger = None
+    if getattr(app, "gl_view", None) is not None:
+        ledger = ledger_payload(app, inv_val)
+    return {
+        "invoice": inv_val,
+        "details": app._details_text_for_row(row_dict),
+        "ledger": ledger,
+    }
+
+
+def current_payload(app) -> dict:
+    """Hent visningsdata for aktivt bilag og be om forhåndsberegning rundt det.
+
+    Bruker ferdig resultat fra ``app._prefetcher`` hvis det finnes, ellers
+    bygges dataene med en gang.
+    """
+    prefetcher = getattr(app, "_prefetcher", None)
+    payload = prefetcher.get(app.idx) if prefetcher is not None else None
+    if payload is None:
+        payload = build_render_payload(app, app.idx, app._current_row_dict())
+        if prefetcher is not None:
+            prefetcher.put(app.idx, payload)
+    if prefetcher is not None:
+        prefetcher.schedule(app.idx, len(app.sample_df))
+    return payload
+
+
+class RenderPrefetcher:
+    """Bygger visningsdata for nabobilag i en bakgrunnstråd.
+
+    Resultatene lagres i en begrenset LRU-buffer. ``clear`` kalles når
+    utvalget eller hovedboken endres; jobber som er startet før dette
+    forkastes.
+    """
+
+    def __init__(self, build, radius: int = PREFETCH_RADIUS, maxsize: int = PREFETCH_CACHE_SIZE):
+        self._build = build
+        self.radius = radius
+        self.maxsize = maxsize
+        self._cache: OrderedDict = OrderedDict()
+        self._pending: set = set()
+        self._worker = IndexWorker(self._process, "render-prefetch")
+        self._lock = self._worker.lock
+
+    def get(self, idx: int):
+        """Returner ferdig resultat for ``idx`` eller ``None``."""
+        with self._lock:
+            payload = self._cache.get(idx)
+            if payload is not None:
+                self._cache.move_to_end(idx)
+            return payload
+
+    def put(self, idx: int, payload) -> None:
+        with self._lock:
+            self._store(idx, payload)
+
+    def _store(self, idx, payload):
+        self._cache[idx] = payload
+        self._cache.move_to_end(idx)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forkast alle resultater, f.eks. etter nytt utvalg."""
+        with self._lock:
+            self._worker.reset()
+            self._cache.clear()
+            self._pending.clear()
+
+    def schedule(self, center: int, total: int) -> None:
+        """Be om forhåndsberegning av bilagene rundt ``center``."""
+        wanted = []
+        for step in range(1, self.radius + 1):
+            for idx in (center + step, center - step):
+                if 0 <= idx < total:
+                    wanted.append(idx)
+        with self._lock:
+            for idx in wanted:
+                if idx in self._cache or idx in self._pending:
+                    continue
+                self._pending.add(idx)
+                self._worker.put(idx)
+        if wanted:
+            self._worker.start()
+
+    def wait(self) -> None:
+        """Vent til alle bestilte forhåndsberegninger er ferdige."""
+        self._worker.wait()
+
+    def _process(self, gen, idx):
+        with self._lock:
+            if gen != self._worker.generation:
+                return
+        try:
+            payload = self._build(idx)
+        except Exception:
+            logger.exception(f"Forhåndsberegning av bilag {idx + 1} feilet")
+            payload = None
+        with self._lock:
+            self._pending.discard(idx)
+            if payload is not None and gen == self._worker.generation:
+                self._store(idx, payload)
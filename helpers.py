@@ -3,7 +3,7 @@ import os
 import re
 import sys
 import logging
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 
 
 def setup_logger(log_path: str = "logs/bilagskontroll.log") -> logging.Logger:
@@ -65,6 +65,8 @@ _RE_DIGITS = re.compile(r"\D+")
 _RE_FLOAT_SUFFIX = re.compile(r"\d+\.0")
 _RE_NUMBER = re.compile(r"-?\d+(?:[.,]\d+)?")
 _INVOICE_PATS = None
+# Fjerner mellomrom/NBSP og gjør komma om til punktum i beløp
+_AMOUNT_TRANS = str.maketrans({" ": None, "\xa0": None, ",": "."})
 
 # Forhåndskompiler mønstre for å finne nettobeløp
 NET_AMOUNT_PATS = [
@@ -107,10 +109,14 @@ def parse_amount(x):
     Decimal | None
         Tallverdi om mulig, ellers ``None``.
     """
-    s = to_str(x).replace(" ", "").replace("\xa0", "")
+    return _parse_amount_text(to_str(x))
+
+
+def _parse_amount_text(s: str):
+    """Tolk tekst som allerede er normalisert med ``to_str``."""
+    s = s.translate(_AMOUNT_TRANS)
     if not s or s.lower() == "nan":
         return None
-    s = s.replace(",", ".")
     if s.startswith("(") and s.endswith(")"):
         inner = s[1:-1]
         if inner.replace(".", "", 1).isdigit():
@@ -123,6 +129,147 @@ def parse_amount(x):
         return None
 
 
+def _parse_uniques(values):
+    """Faktoriser ``values`` og tolk hver unike verdi som beløp.
+
+    Returnerer serien, kodene fra ``pandas.factorize`` (``-1`` for manglende
+    verdier) og en liste med tolkede beløp for hver unike verdi.
+    """
+    pd = _pd()
+    import numpy as np
+
+    ser = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(ser)
+    parsed = []
+    for u in np.asarray(uniques, dtype=object):
+        if isinstance(u, str):
+            u = u.strip()
+            if _RE_FLOAT_SUFFIX.fullmatch(u):
+                u = u[:-2]
+        else:
+            u = to_str(u)
+        parsed.append(_parse_amount_text(u))
+    return ser, codes, parsed
+
+
+def parse_amount_series(values):
+    """Tolk en hel kolonne som beløp.
+
+    Gir samme resultat som å kalle :func:`parse_amount` på hver verdi, men
+    kolonnen faktoriseres først slik at hver unike tekst bare tolkes én gang.
+    Resultatet fordeles tilbake til radene med en vektorisert oppslagstabell.
+
+    Parametere
+    ----------
+    values : pandas.Series | sekvens
+        Verdier som skal tolkes.
+
+    Returnerer
+    ----------
+    pandas.Series
+        Objektkolonne med ``Decimal`` eller ``None``, med samme indeks.
+    """
+    pd = _pd()
+    import numpy as np
+
+    ser, codes, parsed = _parse_uniques(values)
+    table = np.empty(len(parsed) + 1, dtype=object)
+    table[:-1] = parsed
+    # ``factorize`` gir -1 for manglende verdier, som peker på siste (None).
+    table[-1] = None
+    return pd.Series(table[codes], index=ser.index, dtype=object)
+
+
+def map_unique(values, func, na_value=None):
+    """Bruk ``func`` på hver unike verdi i ``values``.
+
+    Kolonnen faktoriseres slik at ``func`` bare kalles én gang per unike
+    verdi, og resultatet fordeles tilbake til radene med en oppslagstabell.
+
+    Parametere
+    ----------
+    values : pandas.Series | sekvens
+        Verdier som skal konverteres.
+    func : callable
+        Funksjon som kalles med hver unike verdi.
+    na_value : enhver, optional
+        Verdi som brukes for manglende celler.
+
+    Returnerer
+    ----------
+    pandas.Series
+        Objektkolonne med samme indeks som ``values``.
+    """
+    pd = _pd()
+    import numpy as np
+
+    ser = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(ser)
+    table = np.empty(len(uniques) + 1, dtype=object)
+    for i, u in enumerate(np.asarray(uniques, dtype=object)):
+        table[i] = func(u)
+    table[-1] = na_value
+    return pd.Series(table[codes], index=ser.index, dtype=object)
+
+
+def to_ore(v):
+    """Konverter et ``Decimal``-beløp til hele øre.
+
+    Parametere
+    ----------
+    v : Decimal | None
+        Beløp i kroner.
+
+    Returnerer
+    ----------
+    int | None
+        Beløpet i øre, avrundet halvt opp, eller ``None`` hvis beløpet mangler
+        eller ikke får plass i 64 bit.
+    """
+    if v is None or not v.is_finite():
+        return None
+    ore = int((v * 100).to_integral_value(rounding=ROUND_HALF_UP))
+    if not -(2**63) <= ore < 2**63:
+        return None
+    return ore
+
+
+def ore_to_decimal(n) -> Decimal:
+    """Konverter heltall øre tilbake til et eksakt ``Decimal``-beløp i kroner."""
+    return Decimal(int(n)).scaleb(-2)
+
+
+def parse_ore_series(values):
+    """Tolk en hel kolonne som beløp i øre.
+
+    Som :func:`parse_amount_series`, men resultatet lagres kompakt som
+    ``Int64`` (heltall øre) med ``<NA>`` der beløp mangler.
+
+    Parametere
+    ----------
+    values : pandas.Series | sekvens
+        Verdier som skal tolkes.
+
+    Returnerer
+    ----------
+    pandas.Series
+        ``Int64``-kolonne med samme indeks.
+    """
+    pd = _pd()
+    import numpy as np
+
+    ser, codes, parsed = _parse_uniques(values)
+    table = np.zeros(len(parsed) + 1, dtype=np.int64)
+    valid = np.zeros(len(parsed) + 1, dtype=bool)
+    for i, v in enumerate(parsed):
+        ore = to_ore(v)
+        if ore is not None:
+            table[i] = ore
+            valid[i] = True
+    arr = pd.arrays.IntegerArray(table[codes], ~valid[codes])
+    return pd.Series(arr, index=ser.index)
+
+
 def fmt_money(x):
     """Formater ``x`` som pengebeløp.
 
@@ -142,6 +289,24 @@ def fmt_money(x):
     return f"{v:,.2f}".replace(",", " ").replace(".", ",")
 
 
+def fmt_ore(n):
+    """Formater et beløp i øre som kroner.
+
+    Parametere
+    ----------
+    n : int | None
+        Beløp i øre, eventuelt manglende (``None``/``<NA>``).
+
+    Returnerer
+    ----------
+    str
+        Formatert beløp som i :func:`fmt_money`, eller tom streng.
+    """
+    if n is None or _pd().isna(n):
+        return ""
+    return fmt_money(ore_to_decimal(n))
+
+
 def format_number_with_thousands(s):
     """Legg til tusenskilletegn i et tall.
 
@@ -1,8 +1,14 @@
 import os
 import sys
+from pathlib import Path
+
+
+if os.name == "nt":
+    CONFIG_DIR = Path(os.getenv("APPDATA") or Path.home()) / "Bilagskontroll"
+else:
+    CONFIG_DIR = Path.home() / ".bilagskontroll"
 
 
 def resource_path(relpath: str) -> str:
     base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
     return os.path.join(base, relpath)
-
@@ -0,0 +1,297 @@
+"""Bakgrunnsjobber med navngitte plasser, prioritet og avbrudd.
+
+:class:`JobScheduler` eier et fast antall arbeidertråder. Hver jobb sendes
+inn til en navngitt plass (for eksempel ``"hovedbok"``). En ny jobb på en
+opptatt plass avbryter den forrige, og en jobb kan vente på at andre
+plasser blir ledige før den starter. Avbrudd er samarbeidende: jobben får
+et :class:`CancelToken` og må selv kalle :meth:`CancelToken.check` mellom
+porsjoner av arbeidet.
+
+:class:`IndexWorker` er en enklere variant for forhåndsberegning per bilag:
+én tråd som behandler indekser i rekkefølge, der eldre bestillinger
+forkastes når eieren nullstiller.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from helpers import logger
+
+# Antall arbeidertråder. To gjør at fakturaliste og hovedbok kan leses samtidig.
+WORKER_THREADS = 2
+
+
+class JobCancelled(Exception):
+    """Kastes av :meth:`CancelToken.check` når jobben er avbrutt."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class Job:
+    __slots__ = (
+        "slot", "func", "priority", "after", "token",
+        "on_done", "on_error", "on_cancel", "submitted", "started", "finished",
+    )
+
+    def __init__(self, slot, func, priority, after, on_done, on_error, on_cancel):
+        self.slot = slot
+        self.func = func
+        self.priority = priority
+        self.after = tuple(after)
+        self.token = CancelToken()
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.submitted = time.perf_counter()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def cancel(self) -> None:
+        self.token.cancel()
+
+
+class IndexWorker:
+    """Behandler bestilte indekser i én bakgrunnstråd som startes ved behov.
+
+    ``handle(generation, idx)`` kalles i tråden for hver bestilling, merket
+    med generasjonen da den ble lagt i kø. :meth:`reset` starter en ny
+    generasjon; ``handle`` sammenligner med :attr:`generation` for å
+    forkaste eldre bestillinger. Eieren deler :attr:`lock` og må holde den
+    når :meth:`put`, :meth:`reset` og :attr:`generation` brukes.
+    """
+
+    def __init__(self, handle: Callable[[int, int], None], name: str):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self._handle = handle
+        self._name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, idx: int) -> None:
+        """Bestill behandling av ``idx`` i gjeldende generasjon."""
+        self._queue.put((self.generation, idx))
+
+    def reset(self) -> None:
+        """Start en ny generasjon, slik at bestillinger i kø forkastes."""
+        self.generation += 1
+
+    def start(self) -> None:
+        """Start tråden hvis den ikke allerede kjører."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Antall bestillinger som ikke er ferdig behandlet."""
+        return self._queue.unfinished_tasks
+
+    def wait(self) -> None:
+        """Vent til alle bestillinger er behandlet."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            gen, idx = self._queue.get()
+            try:
+                self._handle(gen, idx)
+            finally:
+                self._queue.task_done()
+
+
+class JobScheduler:
+    """Kjør jobber i et fast antall arbeidertråder.
+
+    ``dispatch`` brukes til å kalle tilbakekallene til jobbene, typisk
+    ``app.ui.post`` slik at tilbakekallene kjører i hovedtråden. Uten
+    ``dispatch`` kalles de direkte i arbeidertråden.
+    """
+
+    def __init__(self, workers: int = WORKER_THREADS, dispatch: Optional[Callable] = None):
+        self._cond = threading.Condition()
+        self._queue: list = []
+        self._seq = itertools.count()
+        # Siste jobb per plass, og alle jobber som ikke er avsluttet
+        self._slots: dict[str, Job] = {}
+        self._active: set[Job] = set()
+        self._dispatch = dispatch
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"jobb-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(
+        self,
+        slot: str,
+        func: Callable[[CancelToken], object],
+        *,
+        priority: int = 0,
+        after: Iterable[str] = (),
+        on_done: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        on_cancel: Optional[Callable] = None,
+    ) -> Job:
+        """Legg ``func(token)`` i kø på plassen ``slot``.
+
+        En tidligere jobb på samme plass avbrytes. Jobber med høyest
+        ``priority`` starter først. Jobben starter ikke før plassene i
+        ``after`` er ledige. Nøyaktig ett av ``on_done(result)``,
+        ``on_error(exc)`` og ``on_cancel()`` kalles når jobben er over,
+        også når den avbrytes før den har startet.
+        """
+        job = Job(slot, func, priority, after, on_done, on_error, on_cancel)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Jobbkøen er stengt")
+            old = self._slots.get(slot)
+            if old is not None:
+                logger.info(f"Avbryter jobb {slot}: erstattet av ny jobb")
+                old.cancel()
+            self._slots[slot] = job
+            self._active.add(job)
+            heapq.heappush(self._queue, (-priority, next(self._seq), job))
+            self._cond.notify_all()
+        return job
+
+    def cancel(self, slot: str) -> None:
+        with self._cond:
+            job = self._slots.get(slot)
+            if job is not None:
+                job.cancel()
+                self._cond.notify_all()
+
+    def _busy(self, slots) -> bool:
+        return any(j.slot in slots for j in self._active)
+
+    def busy(self, slot: str) -> bool:
+        """Om en jobb på ``slot`` venter eller kjører, også en avbrutt en."""
+        with self._cond:
+            return self._busy((slot,))
+
+    def wait(self, slot: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Vent til ``slot`` (eller alle plasser) er ledig og tilbakekall er sendt."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._active if slot is None else not self._busy((slot,)),
+                timeout,
+            )
+
+    def shutdown(self, cancel: bool = True) -> None:
+        with self._cond:
+            self._closed = True
+            if cancel:
+                for job in self._slots.values():
+                    job.cancel()
+            self._cond.notify_all()
+
+    # Intern logikk
+    def _blocked(self, job: Job) -> bool:
+        return any(j is not job and j.slot in job.after for j in self._active)
+
+    def _next_job(self, dropped: list) -> Optional[Job]:
+        """Hent neste kjørbare jobb. Kalles med låsen holdt.
+
+        Avbrutte jobber som ikke har startet legges i ``dropped``.
+        """
+        deferred = []
+        found = None
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            job = item[2]
+            if job.token.cancelled:
+                dropped.append(job)
+                continue
+            if self._blocked(job):
+                deferred.append(item)
+                continue
+            found = job
+            break
+        for item in deferred:
+            heapq.heappush(self._queue, item)
+        return found
+
+    def _release(self, job: Job) -> None:
+        with self._cond:
+            if self._slots.get(job.slot) is job:
+                del self._slots[job.slot]
+            self._active.discard(job)
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            dropped: list = []
+            with self._cond:
+                job = None
+                while not self._closed or self._queue:
+                    job = self._next_job(dropped)
+                    if job is not None or dropped or self._closed:
+                        break
+                    self._cond.wait()
+            for d in dropped:
+                logger.info(f"Jobb {d.slot} avbrutt før start")
+                self._callback(d.on_cancel)
+                self._release(d)
+            if job is not None:
+                self._execute(job)
+            elif not dropped:
+                return
+
+    def _callback(self, func, *args) -> None:
+        if func is None:
+            return
+        if self._dispatch is not None:
+            self._dispatch(func, *args)
+        else:
+            func(*args)
+
+    def _execute(self, job: Job) -> None:
+        job.started = time.perf_counter()
+        waited = job.started - job.submitted
+        callback = args = None
+        try:
+            job.token.check()
+            result = job.func(job.token)
+            job.token.check()
+        except JobCancelled:
+            status = "avbrutt"
+            callback, args = job.on_cancel, ()
+        except Exception as e:
+            status = "feilet"
+            logger.exception(f"Jobb {job.slot} feilet")
+            callback, args = job.on_error, (e,)
+        else:
+            status = "ferdig"
+            callback, args = job.on_done, (result,)
+        job.finished = time.perf_counter()
+        logger.info(
+            f"Jobb {job.slot} {status} på {job.finished - job.started:.2f} s "
+            f"(ventet {waited:.2f} s)"
+        )
+        if job.token.cancelled and status != "avbrutt":
+            # Avbrutt etter at arbeidet var ferdig; resultatet forkastes.
+            callback, args = job.on_cancel, ()
+        self._callback(callback, *args)
+        self._release(job)
@@ -0,0 +1,90 @@
+"""Framdriftsrapportering fra bakgrunnsarbeid.
+
+Innlesere og PDF-eksport tar imot en valgfri ``progress``-funksjon med
+signaturen ``progress(done, total=None, message=None)``. ``done`` og
+``total`` er i arbeidets egen enhet (rader, seksjoner, elementer), og
+``total`` er ``None`` når omfanget ikke er kjent på forhånd.
+
+:class:`ProgressChannel` er en slik funksjon som kan kalles fra hvilken som
+helst tråd. Den tar bare vare på siste tilstand, slik at GUI-et kan hente
+den med fast bildefrekvens uten å oversvømmes av oppdateringer.
+
+Rapporteringen er også stedet der innleserne avbrytes: ``progress`` kan
+kaste ``jobs.JobCancelled``, og innleserne lukker da filen og gir opp.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+ProgressCallback = Callable[..., None]
+
+# ETA vises først når så mye av jobben er gjort og så lang tid har gått
+_ETA_MIN_FRACTION = 0.02
+_ETA_MIN_SECONDS = 0.5
+
+
+class ProgressState(NamedTuple):
+    message: str
+    done: int
+    total: Optional[int]
+    fraction: Optional[float]
+    eta: Optional[float]
+
+
+class ProgressChannel:
+    """Trådsikker mottaker av framdrift med siste-verdi-semantikk."""
+
+    def __init__(
+        self,
+        message: str = "",
+        clock: Callable[[], float] = time.monotonic,
+        token=None,
+    ):
+        # ``token`` er et ``jobs.CancelToken``; avbrutte jobber stoppes ved
+        # neste rapportering.
+        self.token = token
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._message = message
+        self._done = 0
+        self._total: Optional[int] = None
+        self._phase_start = clock()
+        self._dirty = True
+
+    def __call__(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        if self.token is not None:
+            self.token.check()
+        with self._lock:
+            if message is not None and message != self._message:
+                # Ny fase: ETA beregnes fra starten av fasen.
+                self._message = message
+                self._phase_start = self._clock()
+            self._done = done
+            self._total = total
+            self._dirty = True
+
+    def snapshot(self, force: bool = False) -> Optional[ProgressState]:
+        """Hent siste tilstand, eller ``None`` hvis ingenting er endret."""
+        with self._lock:
+            if not (self._dirty or force):
+                return None
+            self._dirty = False
+            message, done, total = self._message, self._done, self._total
+            elapsed = self._clock() - self._phase_start
+        fraction = eta = None
+        if total:
+            fraction = max(0.0, min(1.0, done / total))
+            if fraction >= _ETA_MIN_FRACTION and elapsed >= _ETA_MIN_SECONDS:
+                eta = elapsed * (1 - fraction) / fraction
+        return ProgressState(message, done, total, fraction, eta)
+
+
+def fmt_eta(seconds: Optional[float]) -> str:
+    """Formater gjenstående tid kort, f.eks. ``ca. 12 s`` eller ``ca. 3 min``."""
+    if seconds is None:
+        return ""
+    if seconds < 60:
+        return f"ca. {max(1, round(seconds))} s"
+    return f"ca. {round(seconds / 60)} min"
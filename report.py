@@ -1,47 +1,61 @@
 # -*- coding: utf-8 -*-
 import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from tkinter import filedialog, TclError
 import webbrowser
 from decimal import Decimal
 
 from helpers import (
     to_str,
     fmt_money,
+    fmt_ore,
     fmt_pct,
     format_number_with_thousands,
     logger,
 )
 
-from data_utils import calc_sum_kontrollert, calc_sum_net_all
-from report_utils import build_ledger_table
+from data_utils import ReviewStats, calc_sum_net_all
+from jobs import JobCancelled
+from report_render import (
+    PdfReader,
+    SECTION_CHUNK,
+    build,
+    make_styles,
+    merge_parts,
+    page_break,
+    render_part,
+    section_flowables,
+)
+from report_utils import build_ledger_table, ledger_snapshot
+
+try:
+    from settings import PDF_WORKERS
+except ImportError:  # pragma: no cover - valgfri innstilling
+    PDF_WORKERS = None
+
+# Mindre utvalg skrives i GUI-prosessen; oppstart av prosesser lønner seg ikke
+PARALLEL_MIN_SECTIONS = 200
+# Hvor ofte framdrift og avbrudd sjekkes mens prosessene arbeider (sekunder)
+_POLL_SECONDS = 0.1
 
 try:  # pragma: no cover - valgfri avhengighet
-    from reportlab.lib.pagesizes import A4
     from reportlab.platypus import (
         SimpleDocTemplate,
         Paragraph,
         Spacer,
         Table,
         TableStyle,
-        PageBreak,
     )
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib import colors
 except ImportError:  # pragma: no cover
-    A4 = SimpleDocTemplate = Paragraph = Spacer = Table = TableStyle = PageBreak = None
-    getSampleStyleSheet = ParagraphStyle = colors = None
+    SimpleDocTemplate = Paragraph = Spacer = Table = TableStyle = colors = None
 
 
-def create_info_table(app, now):
+def create_info_table(session, now):
     info_rows = []
-    try:
-        kunde = to_str(app.kunde_var.get()) if hasattr(app, "kunde_var") else ""
-        utfort = to_str(app.utfort_av_var.get()) if hasattr(app, "utfort_av_var") else ""
-    except TclError:
-        logger.exception("Klarte ikke hente kundedata")
-        kunde = utfort = ""
+    kunde = to_str(session.kunde)
+    utfort = to_str(session.utfort_av)
     if kunde:
         info_rows.append(["Kunde", kunde])
     if utfort:
@@ -66,29 +80,23 @@ def create_info_table(app, now):
     return flow
 
 
-def create_status_table(app, body):
-    total_bilag = len(app.sample_df.index)
-    approved = sum(1 for d in app.decisions if d == "Godkjent")
-    rejected = sum(1 for d in app.decisions if d == "Ikke godkjent")
-    remaining = sum(1 for d in app.decisions if d is None)
-    sum_k = calc_sum_kontrollert(app.sample_df, app.decisions)
-    sum_a = calc_sum_net_all(app.df)
+def create_status_table(session, body):
+    total_bilag = len(session.sample_df.index)
+    review = getattr(session, "review", None)
+    if review is None:
+        review = ReviewStats.from_sample(session.sample_df, session.decisions)
+    approved = review.count("Godkjent")
+    rejected = review.count("Ikke godkjent")
+    remaining = review.count(None)
+    sum_k = review.sum_kontrollert
+    sum_a = getattr(session, "sum_net_all", None)
+    if sum_a is None:
+        sum_a = calc_sum_net_all(session.df)
     pct = (sum_k / sum_a * Decimal("100")) if sum_a else Decimal("0")
 
-    import pandas as pd
-    dec_ser = pd.Series(app.decisions).reindex(app.sample_df.index)
-
-    def _sum_for_decision(dec_value):
-        if dec_value is None:
-            mask = dec_ser.isna()
-        else:
-            mask = dec_ser == dec_value
-        vals = app.sample_df.loc[mask, "_netto_float"].dropna().tolist()
-        return sum(vals, Decimal("0"))
-
-    sum_approved = _sum_for_decision("Godkjent")
-    sum_rejected = _sum_for_decision("Ikke godkjent")
-    sum_remaining = _sum_for_decision(None)
+    sum_approved = review.sum_for("Godkjent")
+    sum_rejected = review.sum_for("Ikke godkjent")
+    sum_remaining = review.sum_for(None)
 
     flow = [
         Paragraph(
@@ -130,16 +138,15 @@ def create_status_table(app, body):
     return flow
 
 
-def create_rejected_table(app, styles):
+def create_rejected_table(session, styles):
     rejected_rows = []
-    for i, d in enumerate(app.decisions):
+    for i, d in enumerate(session.decisions):
         if d != "Ikke godkjent":
             continue
-        row = app.sample_df.iloc[i]
-        inv = to_str(row.get(app.invoice_col, ""))
-        val = row.get("_netto_float")
-        belop = fmt_money(val) if val is not None else ""
-        com = app.comments[i].strip() if i < len(app.comments) else ""
+        row = session.sample_df.iloc[i]
+        inv = to_str(row.get(session.invoice_col, ""))
+        belop = fmt_ore(row.get("_netto_ore"))
+        com = session.comments[i].strip() if i < len(session.comments) else ""
         rejected_rows.append([inv, belop, com])
 
     flow = []
@@ -167,66 +174,83 @@ def create_rejected_table(app, styles):
     return flow
 
 
-def create_invoice_section(app, styles, small):
+def bilag_section(session, i: int, total: int, ledger: bool = True) -> dict:
+    """Beskriv bilag ``i`` i utvalget som rene data for ``report_render``.
+
+    Felt, beslutning, kommentar og bilagslinjer hentes ut som tekst, slik at
+    resultatet kan legges ut uten tilgang til ``session``.
+    """
+    r = session.sample_df.iloc[i]
+    inv = to_str(r.get(session.invoice_col, ""))
+    fields = []
+    for c in session.sample_df.columns:
+        key = str(c)
+        if key.startswith("_"):
+            continue
+        val = to_str(r[c])
+        if not val:
+            continue
+        disp = (
+            val
+            if (key.lower().startswith("faktura") and "nr" in key.lower())
+            else format_number_with_thousands(val)
+        )
+        fields.append([key, disp])
+    return {
+        "index": i,
+        "total": total,
+        "invoice": inv,
+        "fields": fields,
+        "decision": (session.decisions[i] if i < len(session.decisions) else "") or "",
+        "comment": session.comments[i].strip() if i < len(session.comments) else "",
+        "ledger": ledger_snapshot(session, inv) if ledger else None,
+    }
+
+
+def add_ledger(session, section: dict) -> dict:
+    """``section`` fra :func:`bilag_section` med bilagslinjene hentet fra ``session``."""
+    return {**section, "ledger": ledger_snapshot(session, section["invoice"])}
+
+
+def create_invoice_section(session, styles, small, progress=None):
     flow = []
-    total = len(app.sample_df)
+    total = len(session.sample_df)
     for i in range(total):
-        r = app.sample_df.iloc[i]
-        inv = to_str(r.get(app.invoice_col, ""))
-        dec = app.decisions[i] if i < len(app.decisions) else ""
-        com = app.comments[i].strip() if i < len(app.comments) else ""
-        rows = [["Felt", "Verdi"]]
-        cols = [c for c in app.sample_df.columns if not str(c).startswith("_")]
-        row_dict = {str(c): to_str(r[c]) for c in cols}
-        for k in cols:
-            key = str(k)
-            val = to_str(row_dict.get(key, ""))
-            if not val:
-                continue
-            disp = (
-                val
-                if (key.lower().startswith("faktura") and "nr" in key.lower())
-                else format_number_with_thousands(val)
-            )
-            rows.append([key, disp])
-        rows += [["Beslutning", dec or ""], ["Kommentar", com or ""]]
-        det_tbl = Table(rows, colWidths=[160, 360])
-        det_tbl.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ]
-            )
-        )
-        flow.append(
-            Paragraph(
-                f"Bilag {i+1}/{total} – Fakturanr: <b>{inv}</b>",
-                styles["Heading3"],
-            )
-        )
-        flow.append(det_tbl)
-        flow.append(Spacer(1, 6))
-        flow.append(build_ledger_table(app, inv, small))
-        app._set_status("Eksporterer PDF...", (i / total) * 100)
+        section = bilag_section(session, i, total, ledger=False)
+        ledger = build_ledger_table(session, section["invoice"], small)
+        flow += section_flowables(section, styles, small, ledger)
+        if progress is not None:
+            progress(i + 1, total, "Klargjør bilag...")
         if i < total - 1:
-            flow.append(Spacer(1, 10))
-            flow.append(PageBreak())
+            flow += page_break()
     return flow
 
 
-def export_pdf(app):
+def create_summary(session, now, styles, body):
+    """Tittel, info, status og ikke godkjente bilag øverst i rapporten."""
+    flow = [Paragraph("Bilagskontroll – Rapport", styles["Title"]), Spacer(1, 4)]
+    flow += create_info_table(session, now)
+    flow += create_status_table(session, body)
+    flow += create_rejected_table(session, styles)
+    return flow
+
+
+def ask_pdf_path(app):
+    """Spør brukeren hvor rapporten skal lagres.
+
+    Kalles fra hovedtråden før eksporten starter. Returnerer ``None`` hvis
+    det ikke finnes noe å eksportere eller brukeren avbryter.
+    """
+    from tkinter import filedialog
+
     if app.sample_df is None:
         app._show_inline("Lag et utvalg først", ok=False)
-        return
+        return None
     if SimpleDocTemplate is None:
         app._show_inline(
             "Manglende modul: reportlab (py -m pip install reportlab)", ok=False
         )
-        return
+        return None
 
     now = datetime.now()
     save = filedialog.asksaveasfilename(
@@ -238,42 +262,181 @@ def export_pdf(app):
     if not save:
         logger.info("PDF-eksport avbrutt")
         app._show_inline("Avbrutt", ok=False)
-        return
-
-    app._set_status("Eksporterer PDF...", 0)
-
-    styles = getSampleStyleSheet()
-    title = styles["Title"]
-    body = styles["BodyText"]
-    body.fontSize = 9
-    body.leading = 11
-    small = ParagraphStyle("small", parent=body, fontSize=8, leading=10)
-
-    flow = [Paragraph("Bilagskontroll – Rapport", title), Spacer(1, 4)]
-    flow += create_info_table(app, now)
-    flow += create_status_table(app, body)
-    flow += create_rejected_table(app, styles)
-    flow += create_invoice_section(app, styles, small)
-
-    doc = SimpleDocTemplate(
-        save,
-        pagesize=A4,
-        leftMargin=36,
-        rightMargin=36,
-        topMargin=36,
-        bottomMargin=36,
-    )
-    try:
-        doc.build(flow)
-        app._set_status("Eksporterer PDF...", 100)
-        logger.info(f"PDF-rapport lagret til {save}")
-        app._show_inline(f"Lagret PDF: {os.path.basename(save)}", ok=True)
+        return None
+    return save
+
+
+def write_report(session, save, progress=None, fragments=None, now=None) -> int:
+    """Skriv rapporten for ``session`` til ``save`` og returner antall sider.
+
+    ``session`` er en ``session.Session``; funksjonen trenger ikke GUI-et.
+    Oppsummeringen og hver porsjon på ``SECTION_CHUNK`` bilag skrives til
+    egne filer i en midlertidig katalog og slås sammen til slutt, slik at
+    bare én porsjon ligger i minnet. Bilag som allerede er lagt ut i
+    bakgrunnen hentes fra ``fragments`` (``report_cache.FragmentCache``).
+    Med flere kjerner legges porsjonene ut i egne prosesser
+    (``PDF_WORKERS``). Uten ``pypdf`` bygges alt i ett stykke.
+    """
+    now = now or datetime.now()
+    styles, body, small = make_styles()
+    total = len(session.sample_df)
+    summary = create_summary(session, now, styles, body)
+
+    if PdfReader is None:
+        logger.warning("pypdf mangler; PDF-rapporten bygges i ett stykke")
+        flow = summary + create_invoice_section(session, styles, small, progress)
+        step = None
+        if progress is not None:
+            step = lambda done, n: progress(done, n, "Skriver PDF...")
+        return build(save, flow, step)
+
+    with tempfile.TemporaryDirectory(prefix="bilagsrapport-") as tmp:
+        parts = [os.path.join(tmp, "00000.pdf")]
+        build(parts[0], summary)
+        del summary
+        chunks = _plan_parts(session, total, tmp, parts, fragments, progress)
+        missing = sum(stop - start for start, stop, _ in chunks)
+        workers = _render_workers(len(chunks)) if missing >= PARALLEL_MIN_SECTIONS else 1
+        if workers > 1:
+            _render_in_processes(session, chunks, total, workers, progress)
+        else:
+            _render_here(session, chunks, total, progress)
+        if progress is not None:
+            progress(total, total, "Slår sammen PDF...")
+        return merge_parts(parts, save)
+
+
+def _plan_parts(session, total, tmp, parts, fragments=None, progress=None) -> list:
+    """Fyll ``parts`` med PDF-deler for bilagene i rekkefølge.
+
+    Bilag med oppdatert fragment i ``fragments`` (se :mod:`report_cache`)
+    kopieres inn som egne deler. Resten samles i porsjoner på høyst
+    ``SECTION_CHUNK`` bilag, som returneres som ``(start, stop, sti)`` og må
+    legges ut.
+    """
+    chunks = []
+    begin = 0
+
+    def add_chunks(stop):
+        for start in range(begin, stop, SECTION_CHUNK):
+            end = min(start + SECTION_CHUNK, stop)
+            path = os.path.join(tmp, f"{end:05d}.pdf")
+            chunks.append((start, end, path))
+            parts.append(path)
+
+    if fragments is not None and len(fragments):
+        for i in range(total):
+            path = os.path.join(tmp, f"{i + 1:05d}-ferdig.pdf")
+            if not fragments.fetch(bilag_section(session, i, total, ledger=False), path):
+                continue
+            add_chunks(i)
+            parts.append(path)
+            begin = i + 1
+            if progress is not None:
+                progress(i + 1, total, "Henter ferdige bilag...")
+        logger.info(f"Bruker {len(parts) - len(chunks) - 1} ferdige bilag i PDF-rapporten")
+    add_chunks(total)
+    return chunks
+
+
+def _render_workers(chunks: int) -> int:
+    """Antall prosesser for ``chunks`` porsjoner, se ``PDF_WORKERS``."""
+    workers = PDF_WORKERS or os.cpu_count() or 1
+    return max(1, min(workers, chunks))
+
+
+def _render_here(session, chunks, total, progress=None) -> None:
+    """Legg ut porsjonene én etter én i denne prosessen."""
+    for start, stop, path in chunks:
+        sections = [bilag_section(session, i, total) for i in range(start, stop)]
+        step = None
+        if progress is not None:
+            progress(start, total, "Skriver bilag...")
+            # Framdrift innen delen regnes om til antall bilag
+            step = lambda done, n, start=start, k=stop - start: progress(
+                start + min(k, k * done // max(n, 1)), total, "Skriver bilag..."
+            )
+        render_part(path, sections, step)
+
+
+def _render_in_processes(session, chunks, total, workers: int, progress=None) -> None:
+    """Legg ut porsjonene parallelt i ``workers`` egne prosesser.
+
+    Bilagene hentes ut som rene data her og sendes til prosessene, som
+    skriver hver sin del til disk. Høyst to porsjoner per prosess er sendt
+    av gårde om gangen, så minnebruken holdes nede også for store utvalg.
+    Avbrytes jobben, startes ingen nye porsjoner, og de som pågår fullføres
+    før unntaket slippes videre.
+    """
+    import multiprocessing as mp
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    logger.info(f"Skriver {len(chunks)} PDF-deler i {workers} prosesser")
+    todo = list(reversed(chunks))
+    running: dict = {}
+    done = 0
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
         try:
-            webbrowser.open(Path(save).resolve().as_uri())
-        except (webbrowser.Error, OSError) as e:  # pragma: no cover - OS-avhengig
-            logger.error(f"Kunne ikke åpne PDF: {e}")
+            while todo or running:
+                while todo and len(running) < 2 * workers:
+                    start, stop, path = todo.pop()
+                    sections = [bilag_section(session, i, total) for i in range(start, stop)]
+                    running[pool.submit(render_part, path, sections)] = stop - start
+                finished, _ = wait(running, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    fut.result()
+                    done += running.pop(fut)
+                if progress is not None:
+                    progress(done, total, "Skriver bilag...")
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+
+def export_pdf(app, save=None, progress=None, open_file=True):
+    """Lag PDF-rapport for utvalget og lagre den til ``save``.
+
+    Dataene hentes fra ``app.session``, og selve rapporten skrives med
+    :func:`write_report`. Uten ``save`` spørres brukeren med
+    :func:`ask_pdf_path`. Funksjonen kan kjøres i en bakgrunnstråd;
+    meldinger til GUI-et sendes da via ``app.ui``. ``progress`` får
+    framdrift i antall skrevne bilag, se :mod:`progress`. Med ``open_file``
+    åpnes rapporten i standardprogrammet etterpå.
+    """
+    from gui.dispatch import post_ui
+
+    if save is None:
+        save = ask_pdf_path(app)
+        if not save:
+            return
+
+    try:
+        pages = write_report(
+            app.session, save, progress, fragments=getattr(app, "_fragments", None)
+        )
+        logger.info(f"PDF-rapport lagret til {save} ({pages} sider)")
+        post_ui(
+            app,
+            app._show_inline,
+            f"Lagret PDF: {os.path.basename(save)}",
+            ok=True,
+            key="inline",
+        )
+        if open_file:
+            try:
+                webbrowser.open(Path(save).resolve().as_uri())
+            except (webbrowser.Error, OSError) as e:  # pragma: no cover - OS-avhengig
+                logger.error(f"Kunne ikke åpne PDF: {e}")
+    except JobCancelled:
+        logger.info("PDF-eksport avbrutt")
+        Path(save).unlink(missing_ok=True)
+        raise
     except Exception as e:  # pragma: no cover - direkte feil fra reportlab
         logger.exception("Feil ved PDF-generering")
-        app._show_inline(f"Feil ved PDF-generering: {e}", ok=False)
-    finally:
-        app._set_status("")
+        post_ui(
+            app,
+            app._show_inline,
+            f"Feil ved PDF-generering: {e}",
+            ok=False,
+            key="inline",
+        )
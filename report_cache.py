@@ -0,0 +1,142 @@
+"""Ferdig utlagte bilag for PDF-rapporten.
+
+Mens brukeren går gjennom utvalget legges hvert bilag ut i bakgrunnen så
+snart en beslutning eller kommentar er registrert. Resultatet er en liten
+PDF per bilag (et fragment) i en midlertidig katalog, merket med en nøkkel
+laget av bilagsdataene fra ``report.bilag_section``. Ved eksport brukes
+fragmentet hvis nøkkelen fortsatt stemmer; endrede bilag legges ut på nytt.
+Mellomlageret må tømmes med :meth:`FragmentCache.clear` når utvalget eller
+hovedboken endres.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from helpers import logger
+from jobs import IndexWorker
+
+
+def section_key(section: dict) -> str:
+    """Nøkkel for raden, beslutningen og kommentaren i ``section``.
+
+    Bilagslinjene er ikke med: de endres bare når hovedboken lastes på nytt,
+    og da tømmes hele mellomlageret. Ved eksport kan nøkkelen dermed lages
+    uten å slå opp i hovedboken.
+    """
+    data = sorted((k, v) for k, v in section.items() if k != "ledger")
+    return hashlib.sha1(repr(data).encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    """Legger ut enkeltbilag i en bakgrunnstråd og tar vare på resultatet.
+
+    ``submit`` kalles fra GUI-tråden med bilagsdata uten bilagslinjer og
+    gjør ingenting hvis bilaget allerede er lagt ut med samme nøkkel.
+    ``prepare(section)`` kjøres i bakgrunnstråden før utlegg og kan hente
+    bilagslinjene der. Kommer det nye data for et bilag før det forrige er
+    lagt ut, legges bare de siste ut. ``clear`` kalles når utvalget eller
+    hovedboken endres; utlegg som er startet før dette forkastes.
+    """
+
+    def __init__(self, render=None, prepare=None):
+        if render is None:
+            from report_render import render_part as render
+        self._render = render
+        self._prepare = prepare
+        self._dir: Optional[str] = None
+        self._fragments: dict = {}  # indeks -> (nøkkel, sti)
+        self._latest: dict = {}  # indeks -> bilagsdata som venter
+        self._worker = IndexWorker(self._process, "pdf-fragmenter")
+        self._lock = self._worker.lock
+
+    def submit(self, section: dict) -> None:
+        """Be om utlegg av ``section`` hvis det ikke allerede er gjort."""
+        idx = section["index"]
+        key = section_key(section)
+        with self._lock:
+            queued = idx in self._latest
+            if not queued:
+                hit = self._fragments.get(idx)
+                if hit is not None and hit[0] == key:
+                    return
+            self._latest[idx] = section
+            if not queued:
+                self._worker.put(idx)
+        self._worker.start()
+
+    def fetch(self, section: dict, dest: str) -> bool:
+        """Kopier fragmentet for ``section`` til ``dest`` hvis det er oppdatert."""
+        key = section_key(section)
+        with self._lock:
+            hit = self._fragments.get(section["index"])
+            if hit is None or hit[0] != key:
+                return False
+            shutil.copyfile(hit[1], dest)
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._fragments)
+
+    def wait(self) -> None:
+        """Vent til alle bestilte fragmenter er lagt ut."""
+        self._worker.wait()
+
+    def clear(self) -> None:
+        """Forkast alle fragmenter, f.eks. etter nytt utvalg."""
+        with self._lock:
+            self._worker.reset()
+            self._latest.clear()
+            for _, path in self._fragments.values():
+                _remove(path)
+            self._fragments.clear()
+
+    def close(self) -> None:
+        """Forkast fragmentene og slett katalogen."""
+        self.clear()
+        with self._lock:
+            if self._dir is not None:
+                shutil.rmtree(self._dir, ignore_errors=True)
+                self._dir = None
+
+    def _process(self, gen, idx):
+        with self._lock:
+            if gen != self._worker.generation:
+                return
+            section = self._latest.pop(idx, None)
+            if section is None:
+                return
+            key = section_key(section)
+            hit = self._fragments.get(idx)
+            if hit is not None and hit[0] == key:
+                return
+            if self._dir is None:
+                self._dir = tempfile.mkdtemp(prefix="bilagsfragmenter-")
+            path = os.path.join(self._dir, f"{idx:05d}-{key[:12]}.pdf")
+        try:
+            if self._prepare is not None:
+                section = self._prepare(section)
+            self._render(path, [section])
+        except Exception:
+            logger.exception(f"Utlegg av bilag {idx + 1} for PDF-rapporten feilet")
+            _remove(path)
+            return
+        with self._lock:
+            if gen != self._worker.generation:
+                _remove(path)
+                return
+            old = self._fragments.get(idx)
+            self._fragments[idx] = (key, path)
+        if old is not None and old[1] != path:
+            _remove(old[1])
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
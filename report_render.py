@@ -0,0 +1,267 @@
+"""Utlegg av PDF-rapporten fra rene data.
+
+Hvert bilag beskrives av en ordbok fra ``report.bilag_section`` med bare
+tekst og tall, uten referanser til GUI-et eller ``DataFrame``-er. Bilagene
+legges ut i porsjoner på :data:`SECTION_CHUNK` og skrives til egne
+PDF-deler på disk med :func:`render_part`, og delene slås til slutt sammen
+med :func:`merge_parts`. Da holdes bare én porsjon med tabeller i minnet om
+gangen, uansett hvor stort utvalget er.
+
+Sammenslåingen krever ``pypdf``. Uten den bygges rapporten i ett stykke.
+"""
+from __future__ import annotations
+
+import gc
+import os
+from typing import Callable, Iterable, Optional
+
+from helpers import logger
+
+try:  # pragma: no cover - valgfri avhengighet
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import (
+        SimpleDocTemplate,
+        Paragraph,
+        Spacer,
+        Table,
+        TableStyle,
+        PageBreak,
+    )
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+except ImportError:  # pragma: no cover
+    A4 = SimpleDocTemplate = Paragraph = Spacer = Table = TableStyle = PageBreak = None
+    getSampleStyleSheet = ParagraphStyle = colors = None
+
+try:  # pragma: no cover - valgfri avhengighet
+    from pypdf import PdfReader
+except ImportError:  # pragma: no cover
+    PdfReader = None
+
+# Antall bilag per PDF-del
+SECTION_CHUNK = 50
+
+# Lest PDF-størrelse mellom hver opprydding i :func:`merge_parts`
+_MERGE_GC_BYTES = 256 * 1024
+
+LEDGER_COLUMNS = ["Kontonr", "Konto", "MVA", "MVA-beløp", "Beløp", "Postert av"]
+
+
+def make_styles():
+    """Returner ``(styles, body, small)`` slik rapporten bruker dem."""
+    styles = getSampleStyleSheet()
+    body = styles["BodyText"]
+    body.fontSize = 9
+    body.leading = 11
+    small = ParagraphStyle("small", parent=body, fontSize=8, leading=10)
+    return styles, body, small
+
+
+def new_doc(path: str):
+    return SimpleDocTemplate(
+        path,
+        pagesize=A4,
+        leftMargin=36,
+        rightMargin=36,
+        topMargin=36,
+        bottomMargin=36,
+    )
+
+
+def ledger_table(ledger, style_small):
+    """Tabell over bilagslinjene i ``ledger = (rader, sum)``, se ``report_utils``."""
+    if ledger is None:
+        return Paragraph("Ingen bokføringslinjer for dette fakturanummeret.", style_small)
+    rows, total = ledger
+    data = [LEDGER_COLUMNS]
+    data.extend(list(r) for r in rows)
+    data.append(["", "", "", "Sum:", total, ""])
+    colw = [60, 200, 35, 70, 70, 88]
+    tbl = Table(data, colWidths=colw, repeatRows=1, hAlign="LEFT")
+    tbl.setStyle(
+        TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("ALIGN", (4, 1), (5, -2), "RIGHT"),
+            ("ALIGN", (4, -1), (5, -1), "RIGHT"),
+            ("SPAN", (0, -1), (3, -1)),
+            ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+            ("BACKGROUND", (0, 2), (-1, 2), colors.white),
+        ])
+    )
+    return tbl
+
+
+def section_flowables(section: dict, styles, small, ledger=None) -> list:
+    """Overskrift, detaljtabell og bilagslinjer for ett bilag.
+
+    ``ledger`` er et ferdig element for bilagslinjene; uten det lages
+    tabellen fra ``section["ledger"]``.
+    """
+    rows = [["Felt", "Verdi"], *section["fields"]]
+    rows += [["Beslutning", section["decision"]], ["Kommentar", section["comment"]]]
+    det_tbl = Table(rows, colWidths=[160, 360])
+    det_tbl.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, -1), 8),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ]
+        )
+    )
+    if ledger is None:
+        ledger = ledger_table(section["ledger"], small)
+    return [
+        Paragraph(
+            f"Bilag {section['index'] + 1}/{section['total']} – Fakturanr: <b>{section['invoice']}</b>",
+            styles["Heading3"],
+        ),
+        det_tbl,
+        Spacer(1, 6),
+        ledger,
+    ]
+
+
+def page_break() -> list:
+    return [Spacer(1, 10), PageBreak()]
+
+
+def build(path: str, flow: list, progress: Optional[Callable] = None) -> int:
+    """Skriv ``flow`` til ``path`` og returner antall sider.
+
+    ``progress(done, total)`` får antall flowables som er lagt ut.
+    """
+    doc = new_doc(path)
+    if progress is not None:
+
+        def on_build(kind, value):
+            # reportlab melder antall flowables som er lagt ut så langt
+            if kind == "SIZE_EST":
+                on_build.total = value
+                progress(0, value)
+            elif kind == "PROGRESS":
+                progress(value, on_build.total)
+
+        on_build.total = len(flow)
+        doc.setProgressCallBack(on_build)
+    doc.build(flow)
+    return doc.page
+
+
+def render_part(path: str, sections: Iterable[dict], progress: Optional[Callable] = None) -> int:
+    """Legg ut ``sections`` med sideskift mellom og skriv dem til ``path``."""
+    styles, _, small = make_styles()
+    flow: list = []
+    for section in sections:
+        if flow:
+            flow += page_break()
+        flow += section_flowables(section, styles, small)
+    return build(path, flow, progress)
+
+
+def merge_parts(parts: list, out: str) -> int:
+    """Slå sammen PDF-filene i ``parts`` til ``out`` og returner antall sider.
+
+    Delene leses én om gangen, og objektene deres skrives rett til ``out``
+    med nye objektnumre. Bare posisjonene til objektene holdes i minnet, så
+    minnebruken vokser ikke med antall deler. ``PdfWriter.append`` holder
+    derimot hele dokumentet i minnet til det skrives.
+    """
+    from pypdf.generic import (
+        ArrayObject,
+        DictionaryObject,
+        IndirectObject,
+        NameObject,
+        NumberObject,
+        TextStringObject,
+    )
+
+    offsets = [0, 0, 0]  # objekt 0 er ubrukt; 1 er sidetreet, 2 katalogen
+    pages_ref = IndirectObject(1, 0, None)
+    kids = []
+    unreleased = 0
+
+    with open(out, "wb") as fh:
+        fh.write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+
+        def write_obj(num, obj):
+            offsets[num] = fh.tell()
+            fh.write(f"{num} 0 obj\n".encode())
+            obj.write_to_stream(fh)
+            fh.write(b"\nendobj\n")
+
+        for part in parts:
+            reader = PdfReader(part)
+            mapping: dict = {}
+            pending: list = []
+
+            def new_ref(ref):
+                num = mapping.get(ref.idnum)
+                if num is None:
+                    num = mapping[ref.idnum] = len(offsets)
+                    offsets.append(0)
+                    pending.append((num, ref))
+                return IndirectObject(num, 0, None)
+
+            def remap(obj):
+                if isinstance(obj, IndirectObject):
+                    # Referanser uten leser er lagt inn her og peker allerede riktig
+                    return obj if obj.pdf is None else new_ref(obj)
+                if isinstance(obj, DictionaryObject):
+                    for key, value in list(obj.items()):
+                        obj[key] = remap(value)
+                elif isinstance(obj, ArrayObject):
+                    for i, value in enumerate(obj):
+                        obj[i] = remap(value)
+                return obj
+
+            for page in reader.pages:
+                kids.append(new_ref(page.indirect_reference))
+            while pending:
+                num, ref = pending.pop()
+                obj = ref.get_object()
+                if obj.get("/Type") == "/Page":
+                    obj[NameObject("/Parent")] = pages_ref
+                write_obj(num, remap(obj))
+            # Leseren har sykliske referanser via sidene og frigjøres bare av
+            # ``gc``. En full runde koster mer enn en liten del, så den kjøres
+            # først når delene som er lest siden forrige runde er store nok.
+            del reader
+            unreleased += os.path.getsize(part)
+            if unreleased >= _MERGE_GC_BYTES:
+                gc.collect()
+                unreleased = 0
+
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(kids),
+            NameObject("/Count"): NumberObject(len(kids)),
+        })
+        write_obj(1, pages)
+        write_obj(2, DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): pages_ref,
+        }))
+        info = len(offsets)
+        offsets.append(0)
+        write_obj(info, DictionaryObject({
+            NameObject("/Producer"): TextStringObject("Bilagskontroll"),
+        }))
+
+        xref = fh.tell()
+        fh.write(f"xref\n0 {len(offsets)}\n".encode())
+        fh.write(b"0000000000 65535 f \n")
+        for offset in offsets[1:]:
+            fh.write(f"{offset:010d} 00000 n \n".encode())
+        fh.write(
+            f"trailer\n<< /Size {len(offsets)} /Root 2 0 R /Info {info} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode()
+        )
+    logger.info(f"Slo sammen {len(parts)} PDF-deler til {len(kids)} sider")
+    return len(kids)
@@ -0,0 +1,177 @@
+"""Tilstanden i én bilagskontroll, uavhengig av GUI-et.
+
+:class:`Session` eier fakturalisten, hovedboken med kolonneoppsett og
+indeks, utvalget og beslutningene. ``gui.App`` er et tynt lag over en
+``Session``: dataattributtene på ``App`` (``df``, ``sample_df``,
+``decisions`` osv.) leses og skrives i ``App.session``. ``report`` og
+``batch`` bruker ``Session`` direkte, slik at innlesing, utvalg og
+rapporter kan kjøres, måles og fordeles på prosesser uten Tk.
+
+Modulen importerer ikke ``pandas`` før data faktisk leses.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+
+from helpers import logger
+from progress import ProgressCallback
+
+
+class Session:
+    """Data, utvalg og beslutninger for én kontroll."""
+
+    def __init__(self):
+        self.kunde = ""
+        self.utfort_av = ""
+        # Fakturaliste, se ``data_utils.load_invoice_data``
+        self.df = None
+        self.invoice_col: Optional[str] = None
+        self.net_amount_col: Optional[str] = None
+        # Summen av alle bilag beregnes én gang ved innlasting
+        self.sum_net_all = Decimal("0")
+        # Hovedbok, se ``data_utils.load_gl_data``
+        self.gl_df = None
+        # Hvilken kolonne i hovedboken som er fakturanr., konto osv., se
+        # ``data_utils.guess_gl_columns``
+        self.gl_cols: dict = {}
+        self.gl_index = None
+        # Visningsklar tabell over bilagslinjer, se ``build_ledger_view``
+        self.gl_view = None
+        # Utvalg og beslutninger
+        self.sample_df = None
+        self.decisions: list = []
+        self.comments: list = []
+        # Løpende statistikk over beslutningene i utvalget
+        self.review = None
+
+    @classmethod
+    def from_files(
+        cls,
+        invoice_path: str,
+        gl_path: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        use_cache: bool = True,
+    ) -> "Session":
+        """Les fakturaliste og eventuelt hovedbok, se :meth:`load_invoices`."""
+        session = cls()
+        session.load_invoices(invoice_path, progress, use_cache)
+        if gl_path:
+            session.load_gl(gl_path, progress, use_cache)
+        return session
+
+    def load_invoices(
+        self, path: str, progress: Optional[ProgressCallback] = None, use_cache: bool = True
+    ) -> None:
+        """Les fakturalisten slik GUI-et gjør og ta den i bruk.
+
+        Med ``use_cache`` brukes samme mellomlager som GUI-et, se
+        :mod:`data_cache`.
+        """
+        from data_utils import load_invoice_data
+
+        build = lambda: load_invoice_data(path, progress=progress)
+        self.set_invoice_data(_load("fakturaliste", path, build, use_cache, header_idx=4))
+
+    def load_gl(
+        self, path: str, progress: Optional[ProgressCallback] = None, use_cache: bool = True
+    ) -> None:
+        """Les hovedboken slik GUI-et gjør og ta den i bruk."""
+        from data_utils import load_gl_data
+
+        build = lambda: load_gl_data(path, progress=progress)
+        self.set_gl_data(_load("hovedbok", path, build, use_cache, nrows=10))
+
+    def set_invoice_data(self, data: dict) -> None:
+        """Ta i bruk en innlest fakturaliste. Et eventuelt utvalg forkastes.
+
+        Kundenavnet hentes fra listen og er tomt hvis listen ikke har det.
+        """
+        self.df = data["df"]
+        self.kunde = data.get("kunde") or ""
+        self.invoice_col = data["invoice_col"]
+        self.net_amount_col = data["net_amount_col"]
+        self.sum_net_all = data["sum_net_all"]
+        self.sample_df = None
+        self.decisions, self.comments = [], []
+        self.review = None
+
+    def set_gl_data(self, data: dict) -> None:
+        """Ta i bruk en innlest hovedbok."""
+        self.gl_df = data["df"]
+        self.gl_cols = dict(data["cols"])
+        self.gl_index = data["gl_index"]
+        self.gl_view = data["view"]
+
+    @property
+    def has_invoices(self) -> bool:
+        return self.df is not None and not self.df.dropna(how="all").empty
+
+    def make_sample(self, n: int, year: int):
+        """Trekk ``n`` bilag med ``year`` som frø og nullstill beslutningene."""
+        from data_utils import ReviewStats, draw_sample
+
+        self.sample_df = draw_sample(self.df, n, year)
+        self.decisions = [None] * len(self.sample_df)
+        self.comments = [""] * len(self.sample_df)
+        self.review = ReviewStats.from_sample(self.sample_df)
+        logger.info(f"Trakk utvalg på {len(self.sample_df)} bilag for år {year}")
+        return self.sample_df
+
+    def record(self, idx: int, decision) -> None:
+        """Registrer ``decision`` for bilag ``idx`` og oppdater statistikken."""
+        self.decisions[idx] = decision
+        if self.review is not None:
+            self.review.record(idx, decision)
+
+    def ledger_hits(self, invoice_value: str):
+        return ledger_hits(self, invoice_value)
+
+
+def _load(kind: str, path: str, build, use_cache: bool, **params) -> dict:
+    if not use_cache:
+        return build()
+    from data_cache import cached_load
+
+    return cached_load(kind, path, build, **params)
+
+
+def ledger_hits(state, invoice_value: str):
+    """Hent utsnittet av ``state.gl_view`` for gitt bilagsnummer.
+
+    ``state`` er en :class:`Session` eller et annet objekt med de samme
+    attributtene for hovedboken. Returnerer ``None`` hvis hovedbok mangler
+    eller ingen linjer finnes.
+    """
+    from helpers import only_digits
+
+    if state.gl_df is None or getattr(state, "gl_view", None) is None:
+        return None
+    if getattr(state, "gl_index", None) is None:
+        return None
+    key = only_digits(invoice_value)
+    if not key:
+        return None
+    idxs = state.gl_index.get(key)
+    # ``LedgerIndex.get`` returnerer numpy-arrays; ``len`` fungerer for å
+    # sjekke tomme treff uten å utløse "ambiguous truth value".
+    if idxs is None or len(idxs) == 0:
+        return None
+    return state.gl_view.iloc[idxs]
+
+
+def ledger_rows(state, invoice_value: str):
+    """Hent bilagslinjer for gitt bilagsnummer uten å endre ``gl_df``."""
+    from data_utils import LEDGER_COLS
+
+    hits = ledger_hits(state, invoice_value)
+    if hits is None:
+        return []
+    return hits[LEDGER_COLS].to_dict("records")
+
+
+def ledger_total(hits):
+    """Summer ``Beløp`` for et utsnitt fra :func:`ledger_hits`."""
+    from helpers import ore_to_decimal
+
+    return ore_to_decimal(hits["_belop_ore"].sum())
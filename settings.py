@@ -3,3 +3,24 @@
 
 # Skaleringsfaktor for GUI. Sett til ``None`` for automatisk deteksjon.
 UI_SCALING = None
+
+# Mellomlager for innleste Excel-filer (under ``~/.bilagskontroll/cache``).
+CACHE_ENABLED = True
+# Maksimal størrelse på mellomlageret i megabyte. Eldste filer slettes først.
+CACHE_MAX_MB = 1024
+
+# Tolk store Excel-filer (over 5 MB) i egne prosesser, slik at GUI-et ikke
+# hakker og fakturaliste og hovedbok kan leses parallelt.
+PARSE_IN_PROCESS = True
+
+# Antall prosesser som legger ut PDF-rapporten. ``None`` bruker alle kjerner,
+# 1 skriver rapporten i GUI-prosessen.
+PDF_WORKERS = None
+
+# Legg ut bilag for PDF-rapporten i bakgrunnen så snart de er vurdert, slik
+# at eksporten bare må skrive bilag som er endret siden.
+PDF_PRERENDER = True
+
+# Importer pandas, openpyxl og reportlab i bakgrunnen rett etter at vinduet
+# er vist, slik at første innlesing og eksport går raskere.
+STARTUP_WARMUP = True
@@ -0,0 +1,174 @@
+"""Oppstartsløp: vis vinduet først, varm opp tunge moduler etterpå.
+
+``gui.App`` importerer verken ``pandas``, ``openpyxl`` eller ``reportlab``
+før de trengs, slik at vinduet kommer raskt opp. Uten oppvarming betaler
+første innlesing og første eksport for importene. :func:`start_warmup`
+importerer dem i en egen tråd med lav prioritet mens brukeren velger filer.
+
+Med ``--profile-startup`` måler :class:`ImportProfiler` hver import som
+gjøres første gang, og skriver tidene til loggen.
+"""
+from __future__ import annotations
+
+import builtins
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+from helpers import logger
+
+# Modulene som varmes opp, i rekkefølgen de trengs
+WARMUP_MODULES = (
+    "pandas",
+    "openpyxl",
+    "openpyxl.worksheet._reader",
+    "data_utils",
+    "data_cache",
+    "reportlab.platypus",
+    "report",
+)
+
+# Pause mellom modulene, slik at hovedtråden får GIL-en innimellom
+_WARMUP_PAUSE = 0.02
+
+# Importer som går raskere enn dette (sekunder) tas ikke med i rapporten
+PROFILE_MIN_SECONDS = 0.005
+
+
+class ImportProfiler:
+    """Mål tiden for hver import som gjøres første gang.
+
+    Tidene er inkludert underimporter. ``mark`` registrerer milepæler i
+    oppstarten, målt fra profilereren ble opprettet.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._orig_import = None
+        self.imports: list[tuple[str, float, int]] = []
+        self.marks: list[tuple[str, float]] = []
+        self._depth = threading.local()
+
+    def install(self) -> None:
+        if self._orig_import is not None:
+            return
+        self._orig_import = orig = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return orig(name, globals, locals, fromlist, level)
+            depth = getattr(self._depth, "value", 0)
+            self._depth.value = depth + 1
+            t0 = self._clock()
+            try:
+                return orig(name, globals, locals, fromlist, level)
+            finally:
+                self._depth.value = depth
+                elapsed = self._clock() - t0
+                with self._lock:
+                    self.imports.append((name, elapsed, depth))
+
+        builtins.__import__ = timed_import
+
+    def uninstall(self) -> None:
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    def mark(self, label: str) -> float:
+        elapsed = self._clock() - self._start
+        with self._lock:
+            self.marks.append((label, elapsed))
+        return elapsed
+
+    def report(self, min_seconds: float = PROFILE_MIN_SECONDS) -> None:
+        """Skriv milepæler og de tregeste importene til loggen."""
+        with self._lock:
+            marks = list(self.marks)
+            imports = sorted(self.imports, key=lambda i: i[1], reverse=True)
+        for label, elapsed in marks:
+            logger.info(f"Oppstart: {label} etter {elapsed:.3f} s")
+        for name, elapsed, depth in imports:
+            if elapsed < min_seconds:
+                break
+            logger.info(f"Import {name}: {elapsed * 1000:.1f} ms (nivå {depth})")
+
+
+def _lower_thread_priority() -> None:
+    """Senk prioriteten til tråden som kaller, der plattformen tillater det."""
+    try:
+        if os.name == "nt":
+            import ctypes
+
+            THREAD_PRIORITY_BELOW_NORMAL = -1
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(
+                kernel32.GetCurrentThread(), THREAD_PRIORITY_BELOW_NORMAL
+            )
+        elif hasattr(os, "setpriority"):
+            # På Linux gjelder PRIO_PROCESS med tråd-ID bare denne tråden
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except Exception as e:  # pragma: no cover - avhenger av plattform
+        logger.debug(f"Kunne ikke senke trådprioritet: {e}")
+
+
+def warm_up(modules=WARMUP_MODULES, token=None) -> dict[str, float]:
+    """Importer ``modules`` og returner tiden hver import tok.
+
+    Moduler som mangler hoppes over. ``token`` er et ``jobs.CancelToken``;
+    oppvarmingen stopper mellom modulene når det er avbrutt.
+    """
+    timings: dict[str, float] = {}
+    for name in modules:
+        if token is not None and token.cancelled:
+            logger.info("Oppvarming avbrutt")
+            break
+        t0 = time.perf_counter()
+        try:
+            # ``__import__`` i stedet for ``importlib`` slik at
+            # ``ImportProfiler`` også ser disse importene
+            __import__(name)
+        except Exception as e:
+            logger.warning(f"Oppvarming av {name} feilet: {e}")
+            continue
+        timings[name] = time.perf_counter() - t0
+        time.sleep(_WARMUP_PAUSE)
+    total = sum(timings.values())
+    details = ", ".join(f"{n} {t:.2f} s" for n, t in timings.items())
+    logger.info(f"Oppvarming ferdig på {total:.2f} s ({details})")
+    return timings
+
+
+def start_warmup(
+    modules=WARMUP_MODULES, token=None, on_done=None
+) -> threading.Thread:
+    """Start :func:`warm_up` i en bakgrunnstråd med lav prioritet.
+
+    ``on_done(timings)`` kalles i bakgrunnstråden når oppvarmingen er ferdig.
+    """
+
+    def run():
+        _lower_thread_priority()
+        timings = warm_up(modules, token)
+        if on_done is not None:
+            on_done(timings)
+
+    thread = threading.Thread(target=run, name="oppvarming", daemon=True)
+    thread.start()
+    return thread
+
+
+def parse_args(argv: Optional[list] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bilagskontroll")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Logg tidsbruk for oppstart og hver import",
+    )
+    return parser.parse_args(argv)
@@ -0,0 +1,78 @@
+"""Sammenlign ``LedgerIndex`` med ordboken fra ``groupby().indices``.
+
+Måler byggetid, oppslagstid og minnebruk (via ``tracemalloc``). Kjøres
+manuelt, f.eks.::
+
+    python tests/benchmarks/bench_ledger_index.py --rows 1000000 --invoices 300000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import pandas as pd
+
+from data_utils import LedgerIndex
+
+
+def _measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    index = build()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, elapsed, current
+
+
+def _lookup_us(index, keys):
+    samples = []
+    for key in keys:
+        t0 = time.perf_counter()
+        index.get(key)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--invoices", type=int, default=300_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(0)
+    inv = pd.Series(
+        [str(100_000 + rnd.randrange(args.invoices)) for _ in range(args.rows)],
+        name="_inv_norm",
+    )
+    gl = inv.to_frame()
+    keys = [str(100_000 + rnd.randrange(args.invoices * 2)) for _ in range(args.lookups)]
+
+    old, t_old, mem_old = _measure(lambda: gl.groupby("_inv_norm").indices)
+    new, t_new, mem_new = _measure(lambda: LedgerIndex.build(gl["_inv_norm"]))
+
+    same = all(
+        (old.get(k) is None and new.get(k) is None)
+        or (old.get(k) is not None and list(old[k]) == list(new.get(k)))
+        for k in keys
+    )
+    p50_old, p95_old = _lookup_us(old, keys)
+    p50_new, p95_new = _lookup_us(new, keys)
+
+    print(f"Rader: {args.rows}  Fakturanummer: {len(new)}")
+    print(f"{'':14}{'bygg (s)':>10}{'minne (MB)':>12}{'p50 (µs)':>10}{'p95 (µs)':>10}")
+    print(f"{'dict':14}{t_old:10.2f}{mem_old / 1e6:12.1f}{p50_old:10.2f}{p95_old:10.2f}")
+    print(f"{'LedgerIndex':14}{t_new:10.2f}{mem_new / 1e6:12.1f}{p50_new:10.2f}{p95_new:10.2f}")
+    print(f"Likt resultat: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
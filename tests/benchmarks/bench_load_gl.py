@@ -0,0 +1,85 @@
+"""Sammenlign innlesing av hovedbok: ett gjennomløp mot dobbel åpning.
+
+Måler også innlesing med kolonneutvalg (``usecols=gl_usecols``) på et ark
+med ``--extra-cols`` ubrukte kolonner. Kjøres manuelt, f.eks.::
+
+    python tests/benchmarks/bench_load_gl.py --rows 200000 --extra-cols 30
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from data_utils import load_gl_df, gl_usecols
+from synthetic import write_ledger
+
+
+def _load_gl_df_legacy(path: str, nrows: int = 10):
+    """Tidligere variant: ``openpyxl`` for header og deretter ``read_excel``."""
+    import openpyxl
+    import pandas as pd
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    ws = wb.active
+    header_idx = 0
+    for i, row in enumerate(ws.iter_rows(min_row=1, max_row=nrows, values_only=True)):
+        if not row:
+            continue
+        non_empty = sum(1 for c in row if c not in (None, ""))
+        if non_empty > len(row) / 2:
+            header_idx = i
+            break
+    wb.close()
+    return pd.read_excel(
+        path,
+        engine="openpyxl",
+        header=header_idx,
+        dtype=str,
+        engine_kwargs={"read_only": True},
+    )
+
+
+def _time(func, path, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(path)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--extra-cols", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "hovedbok.xlsx")
+        write_ledger(path, args.rows, extra_cols=args.extra_cols)
+        size_mb = Path(path).stat().st_size / 1024 / 1024
+        t_old, df_old = _time(_load_gl_df_legacy, path, args.repeat)
+        t_new, df_new = _time(load_gl_df, path, args.repeat)
+        t_cols, df_cols = _time(
+            lambda p: load_gl_df(p, usecols=gl_usecols), path, args.repeat
+        )
+
+    same = df_old.astype(object).equals(df_new.astype(object))
+    same_cols = df_new[df_cols.columns].astype(object).equals(df_cols.astype(object))
+    mb = lambda df: df.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"Rader: {args.rows}  Kolonner: {df_new.shape[1]}  Filstørrelse: {size_mb:.1f} MB")
+    print(f"Dobbel åpning (read_excel): {t_old:.2f} s")
+    print(f"Ett gjennomløp (load_gl_df): {t_new:.2f} s  {mb(df_new):.1f} MB")
+    print(f"Med kolonneutvalg ({df_cols.shape[1]} kolonner): {t_cols:.2f} s  {mb(df_cols):.1f} MB")
+    print(f"Forbedring: {t_old / t_new:.2f}x / {t_old / t_cols:.2f}x  Likt resultat: {same and same_cols}")
+    same = same and same_cols
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Mikrobenchmarker for hjelpefunksjonene og innleserne.
+
+Måler gjennomstrømning (rader/s) og toppminne (``tracemalloc``) for
+``to_str``, ``parse_amount``, ``only_digits``, ``fmt_money``,
+``format_number_with_thousands``, ``calc_sum_net_all``, ``load_invoice_df``
+og ``load_gl_df`` på syntetiske filer i flere størrelser (se
+``synthetic.py``). Inndata til hjelpefunksjonene hentes fra de innleste
+filene, slik at de får samme verdier som i produksjon.
+
+Resultatet kan lagres som baseline og senere sammenlignes med den. Målinger
+som er mer enn ``--threshold`` tregere, eller bruker så mye mer minne,
+flagges, og skriptet avslutter da med kode 1. Kjøres manuelt, f.eks.::
+
+    python tests/benchmarks/bench_micro.py --sizes 1000,10000 --save baseline.json
+    python tests/benchmarks/bench_micro.py --sizes 1000,10000 --baseline baseline.json
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from synthetic import write_invoice_list, write_ledger
+
+from data_utils import (
+    calc_sum_net_all,
+    load_gl_df,
+    load_invoice_df,
+    prepare_invoice_df,
+)
+from helpers import (
+    format_number_with_thousands,
+    fmt_money,
+    only_digits,
+    parse_amount,
+    to_str,
+)
+
+DEFAULT_SIZES = "1000,10000,100000"
+# Tillatt forverring før en måling flagges (0.2 = 20 %)
+DEFAULT_THRESHOLD = 0.2
+# Raske målinger gjentas til hver runde tar minst så lenge (sekunder)
+MIN_ROUND_SECONDS = 0.2
+
+
+def _each(func):
+    def run(values):
+        for v in values:
+            func(v)
+
+    return run
+
+
+def make_cases(tmp: Path, size: int) -> dict:
+    """Lag filer og inndata for ``size`` rader. Returnerer ``navn -> (func, arg, rader)``."""
+    invoice_path = str(tmp / f"fakturaliste_{size}.xlsx")
+    gl_path = str(tmp / f"hovedbok_{size}.xlsx")
+    write_invoice_list(invoice_path, size)
+    write_ledger(gl_path, size)
+
+    df, _ = load_invoice_df(invoice_path)
+    gl = load_gl_df(gl_path)
+    net_col = "Beløp eks. mva"
+    cells = [v for col in df.columns for v in df[col].tolist()]
+    amounts = df[net_col].tolist()
+    refs = gl["Fakturanr"].tolist()
+    decimals = [parse_amount(v) for v in amounts]
+    plain = [str(d) for d in decimals if d is not None]
+    prepared = df.copy()
+    prepare_invoice_df(prepared)
+
+    return {
+        "to_str": (_each(to_str), cells, len(cells)),
+        "parse_amount": (_each(parse_amount), amounts, len(amounts)),
+        "only_digits": (_each(only_digits), refs, len(refs)),
+        "fmt_money": (_each(fmt_money), decimals, len(decimals)),
+        "format_number_with_thousands": (_each(format_number_with_thousands), plain, len(plain)),
+        "calc_sum_net_all": (calc_sum_net_all, prepared, len(prepared)),
+        "load_invoice_df": (load_invoice_df, invoice_path, len(df)),
+        "load_gl_df": (load_gl_df, gl_path, len(gl)),
+    }
+
+
+def measure(func, arg, rows: int, repeat: int) -> dict:
+    # Antall kall per runde bestemmes som i ``timeit.Timer.autorange``
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func(arg)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_ROUND_SECONDS:
+            break
+        loops *= 10 if elapsed < MIN_ROUND_SECONDS / 10 else 2
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func(arg)
+        best = min(best, (time.perf_counter() - t0) / loops)
+    # Egen kjøring for minne, siden ``tracemalloc`` gjør koden tregere
+    tracemalloc.start()
+    func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": rows,
+        "seconds": round(best, 6),
+        "rows_per_s": round(rows / best, 1) if best else None,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """Sammenlign med baseline. Returnerer ``nøkkel -> (fart, minne, flagg)``."""
+    out = {}
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b or not b.get("rows_per_s") or not r.get("rows_per_s"):
+            continue
+        speed = r["rows_per_s"] / b["rows_per_s"]
+        mem = r["peak_kb"] / b["peak_kb"] if b.get("peak_kb") else 1.0
+        flags = []
+        if speed < 1 - threshold:
+            flags.append("TREGERE")
+        if mem > 1 + threshold and r["peak_kb"] - b["peak_kb"] > 64:
+            flags.append("MER MINNE")
+        out[key] = (speed, mem, flags)
+    return out
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", default=DEFAULT_SIZES, help="Kommaseparerte antall rader")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--only", help="Kommaseparerte navn på målinger som skal kjøres")
+    p.add_argument("--save", help="Lagre resultatet som JSON (baseline)")
+    p.add_argument("--baseline", help="Sammenlign med lagret JSON")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = p.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            for name, (func, arg, rows) in make_cases(Path(tmp), size).items():
+                if only and name not in only:
+                    continue
+                results[f"{name}[{size}]"] = measure(func, arg, rows, args.repeat)
+
+    baseline = {}
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    diff = compare(results, baseline, args.threshold)
+
+    print(f"{'Måling':<38} {'rader':>8} {'rader/s':>12} {'topp KB':>10}  mot baseline")
+    for key, r in results.items():
+        line = f"{key:<38} {r['rows']:>8} {r['rows_per_s']:>12,.0f} {r['peak_kb']:>10,.0f}"
+        if key in diff:
+            speed, mem, flags = diff[key]
+            line += f"  fart {speed:.2f}x, minne {mem:.2f}x {' '.join(flags)}"
+        print(line)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({
+            "env": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "params": {"sizes": sizes, "repeat": args.repeat},
+            "results": results,
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultat lagret i {args.save}")
+
+    regressions = [k for k, (_, _, flags) in diff.items() if flags]
+    if regressions:
+        print(f"{len(regressions)} målinger er forverret mer enn {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
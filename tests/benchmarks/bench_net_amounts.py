@@ -0,0 +1,79 @@
+"""Sammenlign radvis beregning av nettobeløp med kolonnevis ``_netto_ore``.
+
+Kjøres manuelt, f.eks.::
+
+    python tests/benchmarks/bench_net_amounts.py --rows 200000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import pandas as pd
+
+from data_utils import FALLBACK_NET_COLUMNS, calc_net_amounts
+from helpers import parse_amount, to_ore
+
+
+def _net_amount_from_row(row, net_amount_col):
+    """Tidligere variant som ble brukt med ``DataFrame.apply(axis=1)``."""
+    cols = []
+    if net_amount_col:
+        cols.append(net_amount_col)
+    cols.extend(c for c in FALLBACK_NET_COLUMNS if c != net_amount_col)
+    for col in cols:
+        if col in row:
+            val = parse_amount(row.get(col))
+            if val is not None:
+                return val
+    return None
+
+
+def make_invoice_df(rows: int, seed: int = 0) -> pd.DataFrame:
+    rnd = random.Random(seed)
+
+    def amount():
+        v = f"{rnd.uniform(1, 100_000):,.2f}".replace(",", "\xa0").replace(".", ",")
+        r = rnd.random()
+        if r < 0.05:
+            return f"({v})"
+        if r < 0.1:
+            return f"{v}-"
+        if r < 0.15:
+            return None
+        return v
+
+    return pd.DataFrame({
+        "Fakturanr": [str(100_000 + i) for i in range(rows)],
+        "Leverandør": [rnd.choice(["Elkjøp AS", "Telenor ASA", "Posten"]) for _ in range(rows)],
+        "Nettobeløp": [amount() for _ in range(rows)],
+        "Beløp": [amount() for _ in range(rows)],
+    }, dtype=str)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    df = make_invoice_df(args.rows)
+    t0 = time.perf_counter()
+    old = df.apply(_net_amount_from_row, axis=1, args=("Nettobeløp",))
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = calc_net_amounts(df, "Nettobeløp")
+    t_new = time.perf_counter() - t0
+
+    same = [to_ore(v) for v in old] == [None if v is pd.NA else v for v in new]
+    print(f"Rader: {args.rows}")
+    print(f"Radvis (apply):    {t_old * 1000:.0f} ms")
+    print(f"Kolonnevis:        {t_new * 1000:.0f} ms")
+    print(f"Forbedring: {t_old / t_new:.1f}x  Likt resultat: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
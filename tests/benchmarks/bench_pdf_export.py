@@ -0,0 +1,94 @@
+"""Mål PDF-eksporten: tid og toppminne for et utvalg med hovedbok.
+
+Bygger fakturaliste og hovedbok med ``synthetic.py``, leser dem med de
+vanlige innleserne i en ``Session``, trekker et utvalg og kaller
+``report.write_report`` uten GUI. Kjøres manuelt, f.eks.::
+
+    python tests/benchmarks/bench_pdf_export.py --sample 1500 --lines 8
+    python tests/benchmarks/bench_pdf_export.py --sample 1000 --workers 4
+    python tests/benchmarks/bench_pdf_export.py --sample 1000 --prerendered 0.9
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from synthetic import write_invoice_list, write_ledger
+
+import report
+from data_utils import ReviewStats
+from session import Session
+
+
+def make_session(invoice_path: str, gl_path: str, sample: int, seed: int = 2024) -> Session:
+    """Les filene og trekk et utvalg med blandede beslutninger, slik GUI-et gjør."""
+    session = Session.from_files(invoice_path, gl_path, use_cache=False)
+    session.kunde = session.kunde or "Eksempel AS"
+    session.make_sample(sample, seed)
+    n = len(session.sample_df)
+    session.decisions = ["Godkjent" if i % 7 else "Ikke godkjent" for i in range(n)]
+    session.comments = ["" if i % 5 else f"Kommentar til bilag {i + 1}" for i in range(n)]
+    session.review = ReviewStats.from_sample(session.sample_df, session.decisions)
+    return session
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sample", type=int, default=500, help="Antall bilag i utvalget")
+    p.add_argument("--lines", type=int, default=6, help="Hovedbokslinjer per faktura")
+    p.add_argument("--workers", type=int, help="Antall prosesser (standard: PDF_WORKERS)")
+    p.add_argument(
+        "--prerendered", type=float, default=0.0,
+        help="Andel bilag som er lagt ut i bakgrunnen før eksport (0-1)",
+    )
+    p.add_argument("--no-memory", action="store_true", help="Ikke mål minne (raskere)")
+    args = p.parse_args(argv)
+
+    if args.workers:
+        report.PDF_WORKERS = args.workers
+    with tempfile.TemporaryDirectory() as tmp:
+        invoice_path = str(Path(tmp) / "fakturaliste.xlsx")
+        gl_path = str(Path(tmp) / "hovedbok.xlsx")
+        invoices = args.sample * 2
+        write_invoice_list(invoice_path, invoices)
+        write_ledger(gl_path, invoices * args.lines, invoices=invoices)
+        session = make_session(invoice_path, gl_path, args.sample)
+
+        if args.prerendered:
+            from report_cache import FragmentCache
+
+            fragments = FragmentCache()
+            n = len(session.sample_df)
+            t0 = time.perf_counter()
+            for i in range(int(n * args.prerendered)):
+                fragments.submit(report.bilag_section(session, i, n))
+            fragments.wait()
+            print(f"Utlegg i bakgrunnen: {time.perf_counter() - t0:.2f} s")
+
+        else:
+            fragments = None
+
+        out = str(Path(tmp) / "rapport.pdf")
+        if not args.no_memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        report.write_report(session, out, fragments=fragments)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] if not args.no_memory else 0
+        tracemalloc.stop()
+        size = Path(out).stat().st_size
+        if fragments is not None:
+            fragments.close()
+
+    print(f"Bilag: {len(session.sample_df)}  Tid: {elapsed:.2f} s  PDF: {size / 1024 / 1024:.1f} MB")
+    if peak:
+        print(f"Toppminne under eksport: {peak / 1024 / 1024:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
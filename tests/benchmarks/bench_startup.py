@@ -0,0 +1,212 @@
+"""Mål oppstart og navigering i GUI-et uten skjerm.
+
+Starter ``gui.App`` under Xvfb (hvis ``DISPLAY`` ikke er satt), laster en
+syntetisk fakturaliste og hovedbok via de vanlige innleserne og blar
+gjennom et utvalg. Måler:
+
+- tid til første visning av vinduet og til GUI-et er bygd
+- tid til hovedboken er lest og ``_build_ledger_widgets`` er ferdig
+- p50/p95 for ``render()`` og for et helt steg (``next()``/``prev()`` pluss
+  ventende tegneoppgaver)
+
+Resultatet skrives som JSON slik at kjøringer kan sammenlignes. Kjøres
+manuelt, f.eks.::
+
+    python tests/benchmarks/bench_startup.py --invoices 5000 --out startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from synthetic import write_invoice_list, write_ledger
+
+
+def start_xvfb(screen: str = "1920x1080x24") -> subprocess.Popen:
+    """Start Xvfb på en ledig skjerm og sett ``DISPLAY``."""
+    if shutil.which("Xvfb") is None:
+        sys.exit("Fant ikke Xvfb; installer den eller sett DISPLAY")
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", screen, "-nolisten", "tcp"],
+        pass_fds=(write_fd,),
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as fh:
+        display = fh.readline().strip()
+    if not display:
+        proc.kill()
+        sys.exit("Xvfb startet ikke")
+    os.environ["DISPLAY"] = f":{display}"
+    return proc
+
+
+def pump(app, until, errors, timeout: float = 120.0) -> None:
+    """Kjør Tk-løkken til ``until()`` er sann."""
+    deadline = time.perf_counter() + timeout
+    while not until():
+        if errors:
+            raise RuntimeError(errors[0])
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Tidsavbrudd i benchmark")
+        app.update()
+        time.sleep(0.002)
+
+
+def summarize(samples: list) -> dict:
+    ms = [s * 1000 for s in samples]
+    if len(ms) < 2:
+        return {"n": len(ms), "p50_ms": ms[0] if ms else None, "p95_ms": ms[0] if ms else None}
+    q = statistics.quantiles(ms, n=100, method="inclusive")
+    return {
+        "n": len(ms),
+        "p50_ms": round(q[49], 3),
+        "p95_ms": round(q[94], 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+
+def run(args, invoice_path: str, gl_path: str) -> dict:
+    from startup import ImportProfiler
+
+    # Milepælene registreres av ``App`` selv, se ``App._mark_startup``
+    profiler = ImportProfiler()
+    if args.profile_imports:
+        profiler.install()
+
+    import data_cache
+    import gui
+    from tkinter import messagebox
+
+    data_cache.CACHE_ENABLED = args.cache
+    gui.STARTUP_WARMUP = not args.no_warmup
+    errors: list = []
+    for name in ("showerror", "showwarning", "showinfo"):
+        setattr(messagebox, name, lambda title, msg, **kw: errors.append(msg))
+
+    app = gui.App(profiler=profiler)
+    marks = lambda: dict(profiler.marks)
+    pump(app, lambda: "vindu tegnet" in marks(), errors)
+
+    app.file_path_var.set(invoice_path)
+    t0 = time.perf_counter()
+    app._load_excel()
+    pump(app, lambda: app.df is not None and not app.jobs.busy("fakturaliste"), errors)
+    invoice_load = time.perf_counter() - t0
+
+    app.gl_path_var.set(gl_path)
+    t0 = time.perf_counter()
+    app._load_gl_excel()
+    pump(app, lambda: "bilagslinjer klare" in marks() and not app.jobs.busy("hovedbok"), errors)
+    gl_load = time.perf_counter() - t0
+
+    app.sample_size_var.set(str(args.sample))
+    app.year_var.set("2024")
+    app.make_sample()
+    app.update()
+
+    render_times: list = []
+    orig_render = app.render
+
+    def timed_render():
+        t = time.perf_counter()
+        orig_render()
+        render_times.append(time.perf_counter() - t)
+
+    app.render = timed_render
+    step_times: list = []
+    forward = True
+    last = len(app.sample_df) - 1
+    for _ in range(args.steps):
+        if app.idx >= last:
+            forward = False
+        elif app.idx <= 0:
+            forward = True
+        t = time.perf_counter()
+        app.next() if forward else app.prev()
+        app.update_idletasks()
+        step_times.append(time.perf_counter() - t)
+        if not args.no_think:
+            # Som en bruker som leser bilaget: nabobilagene rekker å bli klare
+            app._prefetcher.wait()
+        app.update()
+    app.render = orig_render
+    startup = marks()
+    # Ikke overskriv vindusstørrelsen brukeren har lagret
+    app._save_window_size = lambda: None
+    app.destroy()
+    if args.profile_imports:
+        profiler.uninstall()
+
+    return {
+        "startup_s": {k: round(v, 4) for k, v in startup.items()},
+        "time_to_first_paint_s": round(startup["vindu tegnet"], 4),
+        "ledger_widgets_ready_s": round(startup["bilagslinjer klare"], 4),
+        "load_s": {"fakturaliste": round(invoice_load, 4), "hovedbok": round(gl_load, 4)},
+        "render": summarize(render_times),
+        "step": summarize(step_times),
+        "imports_ms": {
+            name: round(t * 1000, 2)
+            for name, t, depth in sorted(profiler.imports, key=lambda i: -i[1])
+            if depth == 0 and t >= 0.005
+        },
+    }
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--invoices", type=int, default=2000, help="Antall fakturaer")
+    p.add_argument("--lines", type=int, default=3, help="Hovedbokslinjer per faktura")
+    p.add_argument("--sample", type=int, default=100, help="Størrelse på utvalget")
+    p.add_argument("--steps", type=int, default=200, help="Antall steg fram/tilbake")
+    p.add_argument("--out", default="bench_startup.json", help="JSON-fil for resultatet")
+    p.add_argument("--cache", action="store_true", help="Bruk mellomlageret på disk")
+    p.add_argument("--no-warmup", action="store_true", help="Slå av oppvarming av moduler")
+    p.add_argument("--no-think", action="store_true", help="Ikke vent på forhåndsberegning mellom steg")
+    p.add_argument("--profile-imports", action="store_true", help="Mål også importene")
+    args = p.parse_args(argv)
+
+    xvfb = None
+    if not os.environ.get("DISPLAY") and os.name != "nt":
+        xvfb = start_xvfb()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            invoice_path = str(Path(tmp) / "fakturaliste.xlsx")
+            gl_path = str(Path(tmp) / "hovedbok.xlsx")
+            write_invoice_list(invoice_path, args.invoices)
+            write_ledger(gl_path, args.invoices * args.lines, invoices=args.invoices)
+            result = run(args, invoice_path, gl_path)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    result["params"] = {
+        k: getattr(args, k) for k in ("invoices", "lines", "sample", "steps", "cache", "no_warmup", "no_think")
+    }
+    result["env"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    Path(args.out).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(
+        f"Første visning: {result['time_to_first_paint_s']:.3f} s, "
+        f"bilagslinjer klare: {result['ledger_widgets_ready_s']:.3f} s, "
+        f"render p50/p95: {result['render']['p50_ms']}/{result['render']['p95_ms']} ms"
+    )
+    print(f"Resultat skrevet til {args.out}")
+
+
+if __name__ == "__main__":
+    main()
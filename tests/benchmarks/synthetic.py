@@ -0,0 +1,352 @@
+"""Syntetiske fakturalister og hovedbøker i samme form som PowerOffice-eksporter.
+
+Filene har fire rader innledning med «Kunde: …» på rad 2, overskrift på
+rad 5 (``header_idx=4``), avsluttende «Sum»-rader, beløp som tekst i norsk
+format (``12 345,67``) eller som tall, og hovedbok med enten Debet/Kredit
+eller én Beløp-kolonne. Fakturanumrene i hovedboken matcher fakturalisten,
+slik at oppslag og visning av bilagslinjer kan måles på realistiske data.
+
+Brukes fra de andre benchmarkene, eller direkte::
+
+    python tests/benchmarks/synthetic.py --invoices 100000 --ledger-lines 1000000 --out-dir data
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+INVOICE_HEADER = [
+    "Fakturanr", "Bilagsnr", "Leverandørnr", "Leverandør", "Fakturadato",
+    "Forfallsdato", "Beløp eks. mva", "MVA", "Beløp inkl. mva", "Valuta",
+]
+LEDGER_HEADER = [
+    "Bilagsnr", "Bilagsdato", "Kontonr", "Kontonavn", "Fakturanr", "Tekst",
+    "Beskrivelse", "MVA-kode", "MVA-beløp",
+]
+LEDGER_TAIL = ["Postert av"]
+
+SUPPLIERS = [
+    "Kontorrekvisita AS", "Nordic Consulting AS", "Strøm & Nett AS",
+    "Bygg og Anlegg Vest AS", "IT-Drift Norge AS", "Kantinedrift AS",
+    "Reisebyrået Fjord AS", "Renhold Øst AS", "Advokatfirma Berg DA",
+    "Telenor Norge AS",
+]
+COST_ACCOUNTS = [
+    (4300, "Varekjøp"), (6300, "Leie lokaler"), (6340, "Lys og varme"),
+    (6540, "Inventar"), (6800, "Kontorrekvisita"), (6900, "Telefon"),
+    (7140, "Reisekostnader"), (6700, "Revisjon og regnskap"),
+]
+VAT_CODES = [("1", 0.25), ("11", 0.15), ("13", 0.12), ("0", 0.0)]
+USERS = ["MK", "AB", "ola.nordmann", "kari.nordmann", "Import"]
+
+# Fakturanumre i hovedboken som skrives med prefiks, som i enkelte eksporter
+PREFIXED_SHARE = 0.1
+
+
+def fmt_no(x: float, nbsp: bool = False) -> str:
+    """Formater beløp på norsk: ``-12 345,67`` (eventuelt med NBSP)."""
+    return f"{x:,.2f}".replace(",", "\xa0" if nbsp else " ").replace(".", ",")
+
+
+def _col_letter(n: int) -> str:
+    s = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\
+<Default Extension="xml" ContentType="application/xml"/>\
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>\
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>\
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>\
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>\
+</Types>"""
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>\
+</Relationships>"""
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" \
+xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">\
+<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets></workbook>"""
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>\
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>\
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>\
+</Relationships>"""
+# Stil 1 er dato (dd.mm.yyyy), stil 2 er beløp med tusenskille og to desimaler
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">\
+<numFmts count="1"><numFmt numFmtId="164" formatCode="dd.mm.yyyy"/></numFmts>\
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>\
+<fills count="1"><fill><patternFill patternType="none"/></fill></fills>\
+<borders count="1"><border/></borders>\
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>\
+<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>\
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>\
+<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>\
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>\
+</styleSheet>"""
+_EPOCH = date(1899, 12, 30)
+
+
+def _write_sheet(path, rows, nrows: int, ncols: int, title: str) -> None:
+    """Skriv ``rows`` strømmende som en ``.xlsx`` med ett ark.
+
+    Skriver SpreadsheetML direkte i stedet for via ``openpyxl``, som klarer
+    bare noen tusen rader i sekundet og gjør millioner av linjer upraktisk.
+    Som i eksporter fra regnskapssystemet brukes delte strenger, arket har
+    dimensjon, datoer er serienumre med datoformat og tall har tallformat.
+    """
+    import zipfile
+    from itertools import islice
+    from xml.sax.saxutils import escape
+
+    letters = [_col_letter(i + 1) for i in range(ncols)]
+    strings: dict = {}
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(title=escape(title)))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _STYLES)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as raw:
+            out = []
+            out.append(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<dimension ref="A1:{letters[-1]}{nrows}"/><sheetData>'
+            )
+            for r, row in enumerate(rows, 1):
+                cells = []
+                for letter, v in zip(letters, row):
+                    if v is None:
+                        continue
+                    if isinstance(v, str):
+                        idx = strings.setdefault(v, len(strings))
+                        cells.append(f'<c r="{letter}{r}" t="s"><v>{idx}</v></c>')
+                    elif isinstance(v, date):
+                        cells.append(f'<c r="{letter}{r}" s="1"><v>{(v - _EPOCH).days}</v></c>')
+                    elif isinstance(v, float):
+                        cells.append(f'<c r="{letter}{r}" s="2"><v>{v!r}</v></c>')
+                    else:
+                        cells.append(f'<c r="{letter}{r}"><v>{v}</v></c>')
+                out.append(f'<row r="{r}">{"".join(cells)}</row>')
+                if len(out) >= 1000:
+                    raw.write("".join(out).encode())
+                    out.clear()
+            out.append("</sheetData></worksheet>")
+            raw.write("".join(out).encode())
+        with zf.open("xl/sharedStrings.xml", "w", force_zip64=True) as raw:
+            raw.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                f'uniqueCount="{len(strings)}">'.encode()
+            )
+            items = iter(strings)
+            while chunk := list(islice(items, 10_000)):
+                raw.write("".join(
+                    f'<si><t xml:space="preserve">{escape(s)}</t></si>' for s in chunk
+                ).encode())
+            raw.write(b"</sst>")
+
+
+def _preamble(title: str, customer: str, year: int) -> list:
+    return [
+        [title],
+        [f"Kunde: {customer}"],
+        [f"Periode: 01.01.{year} - 31.12.{year}"],
+        [f"Utskrevet {date(year + 1, 1, 15):%d.%m.%Y}"],
+    ]
+
+
+def invoice_numbers(invoices: int, start: int = 100_000) -> range:
+    return range(start, start + invoices)
+
+
+def write_invoice_list(
+    path,
+    invoices: int,
+    *,
+    seed: int = 0,
+    year: int = 2024,
+    customer: str = "Eksempel Regnskap AS",
+    amounts: str = "text",
+    subtotals: bool = False,
+) -> int:
+    """Skriv en fakturaliste med ``invoices`` fakturaer til ``path``.
+
+    ``amounts`` er ``"text"`` (norsk format som tekst) eller ``"number"``.
+    Med ``subtotals`` får hver leverandør en «Sum»-rad, ellers kommer bare
+    totalsummen til slutt. Returnerer antall skrevne rader.
+    """
+    rnd = random.Random(seed)
+    fmt = (lambda x: fmt_no(x, nbsp=rnd.random() < 0.5)) if amounts == "text" else (lambda x: x)
+    start = date(year, 1, 1)
+
+    def rows():
+        yield from _preamble("Inngående fakturaer", customer, year)
+        yield INVOICE_HEADER
+        total = [0.0, 0.0, 0.0]
+        numbers = list(invoice_numbers(invoices))
+        groups: dict = {}
+        for no in numbers:
+            groups.setdefault(rnd.randrange(len(SUPPLIERS)), []).append(no)
+        for supplier in sorted(groups):
+            sub = [0.0, 0.0, 0.0]
+            for no in groups[supplier]:
+                net = round(rnd.lognormvariate(8, 1.2), 2)
+                if rnd.random() < 0.03:
+                    net = -net  # kreditnota
+                vat = round(net * rnd.choice(VAT_CODES)[1], 2)
+                gross = round(net + vat, 2)
+                invoice_date = start + timedelta(days=rnd.randrange(365))
+                for acc in (sub, total):
+                    acc[0] += net
+                    acc[1] += vat
+                    acc[2] += gross
+                yield [
+                    str(no), str(no + 400_000), str(20_000 + supplier),
+                    SUPPLIERS[supplier], f"{invoice_date:%d.%m.%Y}",
+                    f"{invoice_date + timedelta(days=30):%d.%m.%Y}",
+                    fmt(net), fmt(vat), fmt(gross), "NOK",
+                ]
+            if subtotals:
+                yield ["Sum", None, None, SUPPLIERS[supplier], None, None,
+                       *map(fmt, (round(s, 2) for s in sub)), None]
+        yield ["Sum", None, None, None, None, None,
+               *map(fmt, (round(t, 2) for t in total)), None]
+
+    nrows = 4 + 1 + invoices + 1 + (len(SUPPLIERS) if subtotals else 0)
+    _write_sheet(path, rows(), nrows, len(INVOICE_HEADER), "Fakturaliste")
+    return nrows
+
+
+def write_ledger(
+    path,
+    lines: int,
+    *,
+    invoices: Optional[int] = None,
+    seed: int = 0,
+    year: int = 2024,
+    customer: str = "Eksempel Regnskap AS",
+    layout: str = "debit_credit",
+    amounts: str = "number",
+    extra_cols: int = 0,
+) -> int:
+    """Skriv en hovedbok med omtrent ``lines`` posteringslinjer til ``path``.
+
+    Linjene fordeles på ``invoices`` bilag (standard ``lines // 4``) med
+    samme fakturanumre som :func:`write_invoice_list`. Hvert bilag har én
+    linje mot leverandørgjeld og resten mot kostnadskontoer, og går i null.
+    ``layout`` er ``"debit_credit"`` (Debet og Kredit) eller ``"amount"``
+    (én Beløp-kolonne med fortegn). ``extra_cols`` legger til ubrukte
+    kolonner, som i brede eksporter. Returnerer antall skrevne rader.
+    """
+    rnd = random.Random(seed)
+    invoices = invoices or max(1, lines // 4)
+    fmt = fmt_no if amounts == "text" else (lambda x: x)
+    split = layout == "debit_credit"
+    amount_cols = ["Debet", "Kredit"] if split else ["Beløp"]
+    extra = [f"Dimensjon {j + 1}" for j in range(extra_cols)]
+    header = LEDGER_HEADER + amount_cols + LEDGER_TAIL + extra
+    numbers = invoice_numbers(invoices)
+
+    def amount_cells(x):
+        if not split:
+            return [fmt(x)]
+        return [fmt(x), None] if x >= 0 else [None, fmt(-x)]
+
+    def rows():
+        yield from _preamble("Hovedbok", customer, year)
+        yield header
+        written = total_debit = total_credit = 0
+        for i, no in enumerate(numbers):
+            # Fordel gjenstående linjer jevnt; minst to linjer per bilag
+            n = max(2, round((lines - written) / (invoices - i)))
+            voucher = no + 400_000
+            ref = f"F-{no}" if rnd.random() < PREFIXED_SHARE else str(no)
+            posted = date(year, 1, 1) + timedelta(days=rnd.randrange(365))
+            supplier = SUPPLIERS[rnd.randrange(len(SUPPLIERS))]
+            user = rnd.choice(USERS)
+            costs = [round(rnd.lognormvariate(7, 1.2), 2) for _ in range(n - 1)]
+            text = f"{supplier} faktura {no}"
+            for j, cost in enumerate([-round(sum(costs), 2), *costs]):
+                if j == 0:
+                    accountno, accountname, vatcode, vat = 2400, "Leverandørgjeld", None, None
+                else:
+                    accountno, accountname = rnd.choice(COST_ACCOUNTS)
+                    vatcode, rate = rnd.choice(VAT_CODES)
+                    vat = fmt(round(cost * rate, 2))
+                if cost >= 0:
+                    total_debit += cost
+                else:
+                    total_credit -= cost
+                yield [
+                    voucher, posted, accountno, accountname, ref, text,
+                    None if rnd.random() < 0.7 else f"Periode {posted:%m.%Y}",
+                    vatcode, vat, *amount_cells(cost), user,
+                    *(f"verdi {rnd.randrange(100)}" for _ in range(extra_cols)),
+                ]
+            written += n
+        if split:
+            totals = [fmt(round(total_debit, 2)), fmt(round(total_credit, 2))]
+        else:
+            totals = [fmt(round(total_debit - total_credit, 2))]
+        yield ["Sum", None, None, None, None, None, None, None, None, *totals, None]
+
+    nrows = 4 + 1 + _ledger_lines(lines, invoices) + 1
+    _write_sheet(path, rows(), nrows, len(header), "Hovedbok")
+    return nrows
+
+
+def _ledger_lines(lines: int, invoices: int) -> int:
+    written = 0
+    for i in range(invoices):
+        written += max(2, round((lines - written) / (invoices - i)))
+    return written
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--invoices", type=int, default=10_000, help="Antall fakturaer")
+    p.add_argument("--ledger-lines", type=int, default=50_000, help="Antall hovedbokslinjer")
+    p.add_argument("--layout", choices=("debit_credit", "amount"), default="debit_credit")
+    p.add_argument("--amounts", choices=("text", "number"), default="text",
+                   help="Beløpsformat i fakturalisten")
+    p.add_argument("--subtotals", action="store_true", help="Sum-rad per leverandør")
+    p.add_argument("--extra-cols", type=int, default=0, help="Ubrukte kolonner i hovedboken")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--year", type=int, default=2024)
+    p.add_argument("--out-dir", default=".")
+    args = p.parse_args(argv)
+
+    out = Path(args.out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    inv = out / "fakturaliste.xlsx"
+    n = write_invoice_list(
+        inv, args.invoices, seed=args.seed, year=args.year,
+        amounts=args.amounts, subtotals=args.subtotals,
+    )
+    print(f"{inv}: {n} rader på {time.perf_counter() - t0:.1f} s")
+    t0 = time.perf_counter()
+    gl = out / "hovedbok.xlsx"
+    n = write_ledger(
+        gl, args.ledger_lines, invoices=args.invoices, seed=args.seed,
+        year=args.year, layout=args.layout, extra_cols=args.extra_cols,
+    )
+    print(f"{gl}: {n} rader på {time.perf_counter() - t0:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import csv
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent / "benchmarks"))
+
+from synthetic import write_invoice_list, write_ledger
+
+import batch
+from data_utils import load_invoice_df
+
+
+def _clients(root: Path) -> Path:
+    (root / "Klient A").mkdir(parents=True)
+    write_invoice_list(root / "Klient A" / "fakturaliste.xlsx", 30, seed=1)
+    write_ledger(root / "Klient A" / "hovedbok.xlsx", 60, invoices=30, seed=1)
+    write_invoice_list(root / "Klient B fakturaliste.xlsx", 20, seed=2)
+    write_ledger(root / "Klient B hovedbok.xlsx", 40, invoices=20, seed=2)
+    (root / "Klient C fakturaliste.xlsx").write_bytes(b"ikke en Excel-fil")
+    return root
+
+
+def test_find_clients(tmp_path):
+    clients = {c.name: c for c in batch.find_clients(_clients(tmp_path))}
+    assert sorted(clients) == ["Klient A", "Klient B", "Klient C"]
+    assert clients["Klient B"].gl_path.endswith("Klient B hovedbok.xlsx")
+    assert clients["Klient C"].gl_path is None
+
+
+def test_like_klientnavn_far_lopenummer(tmp_path):
+    (tmp_path / "Kunde AS").mkdir()
+    write_invoice_list(tmp_path / "Kunde AS" / "fakturaliste.xlsx", 5, seed=1)
+    write_invoice_list(tmp_path / "Kunde AS fakturaliste.xlsx", 5, seed=2)
+    write_invoice_list(tmp_path / "Fakturaservice AS fakturaliste.xlsx", 5, seed=3)
+    write_ledger(tmp_path / "Fakturaservice AS hovedbok.xlsx", 10, invoices=5, seed=3)
+
+    clients = {c.name: c for c in batch.find_clients(tmp_path)}
+    assert sorted(clients) == ["Fakturaservice AS", "Kunde AS", "Kunde AS (2)"]
+    assert clients["Kunde AS (2)"].invoice_path.endswith("Kunde AS fakturaliste.xlsx")
+    assert clients["Fakturaservice AS"].gl_path.endswith("Fakturaservice AS hovedbok.xlsx")
+
+
+def test_batch_skriver_rapporter_og_tidsbruk(tmp_path):
+    src = _clients(tmp_path / "inn")
+    out = tmp_path / "ut"
+
+    code = batch.main([str(src), "--sample", "5", "--year", "2024", "--out", str(out), "--workers", "1", "--no-cache"])
+
+    assert code == 1  # Klient C feiler
+    with open(out / batch.SUMMARY_FILE, encoding="utf-8-sig") as fh:
+        rows = {r["klient"]: r for r in csv.DictReader(fh, delimiter=";")}
+    assert rows["Klient A"]["status"] == "ok" and rows["Klient A"]["utvalg"] == "5"
+    assert rows["Klient C"]["status"] == "feil (fakturaliste)"
+    assert (out / "Klient A" / "bilagskontroll_Klient A_2024.pdf").stat().st_size > 0
+
+    # Utvalget er det samme som GUI-et trekker for samme år
+    df, _ = load_invoice_df(str(src / "Klient B fakturaliste.xlsx"))
+    expected = df.sample(n=5, random_state=2024)["Fakturanr"].tolist()
+    sample = pd.read_excel(out / "Klient B" / "bilagskontroll_Klient B_2024_utvalg.xlsx", dtype=str)
+    assert sample["Fakturanr"].tolist() == expected
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from data_utils import calc_net_amounts
+
+
+def test_calc_net_amounts_bruker_prioritert_kolonne_og_reserve():
+    df = pd.DataFrame({
+        "Netto": ["100,50", None, "abc", None],
+        "Beløp": ["1", "(200)", "300-", None],
+        "Total": ["9", "9", "9", "1 000"],
+    })
+    res = calc_net_amounts(df, "Netto")
+    assert str(res.dtype) == "Int64"
+    assert res.tolist() == [10050, -20000, -30000, 100000]
+
+
+def test_calc_net_amounts_uten_beloepskolonner():
+    df = pd.DataFrame({"Tekst": ["a", "b"]})
+    assert calc_net_amounts(df, None).isna().all()
+
+
+def test_calc_net_amounts_runder_til_ore():
+    df = pd.DataFrame({"Beløp": ["0,005", "-0,005", "1,999", "Infinity"]})
+    assert calc_net_amounts(df, None).tolist()[:3] == [1, -1, 200]
+    assert calc_net_amounts(df, None).isna().tolist()[3]
@@ -1,6 +1,11 @@
 import pandas as pd
 from decimal import Decimal
 from data_utils import calc_sum_net_all
+from helpers import to_ore
+
+
+def _ore(values):
+    return pd.array([to_ore(v) for v in values], dtype="Int64")
 
 
 def test_calc_sum_net_all_uten_summeringsrad():
@@ -8,7 +13,7 @@ def test_calc_sum_net_all_uten_summeringsrad():
         'tekst': ['rad1', 'rad2', None],
         'netto': [Decimal('100'), Decimal('200'), Decimal('0')]
     })
-    df['_netto_float'] = df['netto']
+    df['_netto_ore'] = _ore(df['netto'])
     assert calc_sum_net_all(df) == Decimal('300')
 
 
@@ -17,7 +22,7 @@ def test_calc_sum_net_all_med_summeringsrader():
         'tekst': ['rad1', 'Sum', 'rad2', 'SUM'],
         'netto': [Decimal('100'), Decimal('999'), Decimal('200'), Decimal('300')]
     })
-    df['_netto_float'] = df['netto']
+    df['_netto_ore'] = _ore(df['netto'])
     assert calc_sum_net_all(df) == Decimal('300')
 
 
@@ -26,7 +31,7 @@ def test_calc_sum_net_all_kun_summeringsrad():
         'tekst': ['Sum'],
         'netto': [Decimal('123')]
     })
-    df['_netto_float'] = df['netto']
+    df['_netto_ore'] = _ore(df['netto'])
     assert calc_sum_net_all(df) == Decimal('0')
 
 
@@ -35,7 +40,7 @@ def test_calc_sum_net_all_beholder_siste_rad_uten_sum():
         'tekst': ['rad1', 'rad2', 'rad3'],
         'netto': [Decimal('100'), Decimal('200'), Decimal('300')]
     })
-    df['_netto_float'] = df['netto']
+    df['_netto_ore'] = _ore(df['netto'])
     assert calc_sum_net_all(df) == Decimal('600')
 
 
@@ -45,5 +50,21 @@ def test_calc_sum_net_all_med_sum_i_annen_kolonne():
         'kommentar': ['ok', 'sum her'],
         'netto': [Decimal('100'), Decimal('200')]
     })
-    df['_netto_float'] = df['netto']
+    df['_netto_ore'] = _ore(df['netto'])
     assert calc_sum_net_all(df) == Decimal('100')
+
+
+def test_find_sum_rows_og_forhandsberegnet_maske():
+    from data_utils import find_sum_rows
+
+    df = pd.DataFrame({
+        'tekst': ['rad1', 'Summert', 'Sum leverandør', None],
+        'kommentar': [None, None, None, 'sum'],
+        'netto': [Decimal('100'), Decimal('200'), Decimal('300'), Decimal('400')]
+    })
+    df['_netto_ore'] = _ore(df['netto'])
+    assert find_sum_rows(df).tolist() == [False, False, True, True]
+
+    # Forhåndsberegnet maske brukes i stedet for å skanne cellene på nytt
+    df['_sum_row'] = [False, True, False, False]
+    assert calc_sum_net_all(df) == Decimal('800')
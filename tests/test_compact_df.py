@@ -0,0 +1,54 @@
+import pandas as pd
+
+from data_utils import build_ledger_view, compact_df, prepare_gl_df
+from gui.ledger import ledger_payload
+
+
+def test_compact_df_velger_dtype_uten_tap():
+    df = pd.DataFrame({
+        "Bilag": ["1", "2", None, "3"] * 25,
+        "Kontonr": ["4300", "2400", "4300", "2710"] * 25,
+        "Beløp": ["1.5", "2", None, "-3"] * 25,
+        "Konto": ["0123", "1", "2", "3"] * 25,
+        "Tekst": [f"tekst {i}" for i in range(100)],
+    }, dtype=str)
+    original = df.copy()
+    report = compact_df(df, "test")
+
+    assert str(df["Bilag"].dtype) == "Int8"
+    assert str(df["Kontonr"].dtype) == "int16"
+    assert str(df["Beløp"].dtype) == "float64"
+    # Ledende null kan ikke gjenskapes fra et tall og blir kategori
+    assert str(df["Konto"].dtype) == "category"
+    assert pd.api.types.is_string_dtype(df["Tekst"].dtype)
+
+    assert df["Bilag"].isna().sum() == 25
+    assert df["Bilag"].dropna().astype(int).astype(str).tolist() == original["Bilag"].dropna().tolist()
+    assert df["Konto"].astype(str).tolist() == original["Konto"].tolist()
+    by_col = {r[0]: r for r in report}
+    assert by_col["Kontonr"][4] < by_col["Kontonr"][3]
+
+
+def test_komprimert_visning_gir_samme_bilagslinjer():
+    gl = pd.DataFrame({
+        "Fakturanr": [str(100 + i % 5) for i in range(50)],
+        "Kontonr": ["4300", "2400"] * 25,
+        "Tekst": [f"linje {i}" for i in range(50)],
+        "Debet": ["1 000,50", None] * 25,
+        "Kredit": [None, "250"] * 25,
+        "Postert av": ["MK"] * 50,
+    }, dtype=str)
+
+    class App:
+        pass
+
+    app = App()
+    cols, app.gl_index = prepare_gl_df(gl)
+    app.gl_df = gl
+    app.gl_view = build_ledger_view(gl, cols)
+    expected = ledger_payload(app, "102")
+
+    compact_df(gl, "hovedbok")
+    compact_df(app.gl_view, "bilagslinjer", numeric=False)
+    assert str(app.gl_view["Kontonr"].dtype) == "category"
+    assert ledger_payload(app, "102") == expected
@@ -0,0 +1,55 @@
+import os
+
+import data_cache
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(data_cache, "CACHE_ENABLED", True)
+    src = tmp_path / "fil.xlsx"
+    src.write_bytes(b"innhold")
+    return src
+
+
+def test_cached_load_gjenbruker_data(tmp_path, monkeypatch):
+    src = _setup(tmp_path, monkeypatch)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"df": [1, 2, 3]}
+
+    first = data_cache.cached_load("hovedbok", str(src), build)
+    second = data_cache.cached_load("hovedbok", str(src), build)
+    assert first == second == {"df": [1, 2, 3]}
+    assert len(calls) == 1
+
+    # Annen type eller parametre gir egen nøkkel
+    data_cache.cached_load("hovedbok", str(src), build, nrows=5)
+    assert len(calls) == 2
+
+
+def test_cached_load_leser_endret_fil_pa_nytt(tmp_path, monkeypatch):
+    src = _setup(tmp_path, monkeypatch)
+    data_cache.cached_load("fakturaliste", str(src), lambda: {"v": 1})
+    src.write_bytes(b"nytt innhold")
+    assert data_cache.cached_load("fakturaliste", str(src), lambda: {"v": 2}) == {"v": 2}
+
+
+def test_evict_sletter_minst_nylig_brukte(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    for i, key in enumerate(["a", "b", "c"]):
+        data_cache.store_entry(key, {"data": b"x" * 1000})
+        os.utime(data_cache._entry_path(key), ns=(i * 10**9, i * 10**9))
+    data_cache.load_entry("a")  # "a" blir nylig brukt
+    data_cache.evict(2500)
+    remaining = sorted(p.stem for p in data_cache.CACHE_DIR.glob("*.pkl"))
+    assert remaining == ["a", "c"]
+
+
+def test_ugyldig_fil_ignoreres(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    data_cache.CACHE_DIR.mkdir()
+    data_cache._entry_path("k").write_bytes(b"ikke pickle")
+    assert data_cache.load_entry("k") is None
+    assert not data_cache._entry_path("k").exists()
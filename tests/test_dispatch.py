@@ -0,0 +1,50 @@
+import threading
+
+from gui.dispatch import UiDispatcher, post_ui
+
+
+def test_dispatcher_utforer_i_rekkefolge_og_slar_sammen():
+    ui = UiDispatcher()
+    calls = []
+    ui.post(calls.append, "a")
+    ui.post(calls.append, "status 1", key="status")
+    ui.post(calls.append, "b")
+    ui.post(calls.append, "status 2", key="status")
+    assert len(ui) == 3
+    assert ui.drain() == 3
+    assert calls == ["a", "b", "status 2"]
+    assert ui.drain() == 0
+
+
+def test_dispatcher_tommer_i_porsjoner():
+    ui = UiDispatcher()
+    calls = []
+    threads = [
+        threading.Thread(target=lambda: [ui.post(calls.append, i) for i in range(50)])
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert ui.drain(limit=120) == 120
+    assert ui.drain() == 80
+    assert len(calls) == 200
+
+
+def test_dispatcher_fortsetter_etter_feil():
+    ui = UiDispatcher()
+    calls = []
+    ui.post(lambda: 1 / 0)
+    ui.post(calls.append, "ok")
+    ui.drain()
+    assert calls == ["ok"]
+
+
+def test_post_ui_uten_dispatcher_kaller_direkte():
+    class FakeApp:
+        pass
+
+    calls = []
+    post_ui(FakeApp(), calls.append, "x", key="status")
+    assert calls == ["x"]
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+from openpyxl import Workbook
+
+from data_utils import load_gl_df, load_invoice_df
+from excel_process import pack_columns, read_sheet_in_process, unpack_columns
+
+
+def test_pack_og_unpack_kolonner():
+    columns = [["a", None, "a", "b"], [None, None, None, None], ["1", "2", "3", "4"]]
+    packed = pack_columns(columns, 3)
+    assert packed[0][1] == ["a"]
+    assert [list(c) for c in unpack_columns(packed)] == [
+        ["a", None, "a"],
+        [None, None, None],
+        ["1", "2", "3"],
+    ]
+
+
+def _write(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Fakturaliste"])
+    ws.append(["Kunde: Eksempel AS"])
+    ws.append([])
+    ws.append([])
+    ws.append(["Bilag", "Konto", None, "Beløp"])
+    for i in range(50):
+        ws.append([1000 + i % 7, "4300", None, i * 1.25])
+    ws.append([None, None, "x"])
+    wb.save(path)
+
+
+def test_innlesing_i_egen_prosess_gir_samme_resultat(tmp_path):
+    path = tmp_path / "fil.xlsx"
+    _write(path)
+
+    calls = []
+    gl = load_gl_df(str(path), progress=lambda *a: calls.append(a), in_process=True)
+    assert gl.equals(load_gl_df(str(path)))
+    assert calls[-1][0] == calls[-1][1]
+
+    df, kunde = load_invoice_df(str(path), in_process=True)
+    expected, _ = load_invoice_df(str(path))
+    assert kunde == "Eksempel AS"
+    assert df.equals(expected)
+
+
+def test_feil_i_prosessen_sendes_videre(tmp_path):
+    with pytest.raises(OSError):
+        load_gl_df(str(tmp_path / "finnes_ikke.xlsx"), in_process=True)
+
+
+def test_siste_melding_hentes_etter_at_prosessen_er_ferdig(monkeypatch):
+    import queue
+
+    import excel_process
+
+    class FakeQueue:
+        def __init__(self):
+            self.calls = 0
+
+        def get(self, timeout):
+            # Første venting går ut, og prosessen er ferdig før vi sjekker
+            self.calls += 1
+            if self.calls == 1:
+                raise queue.Empty
+            return "done", (["A"], pack_columns([["x"]], 1), 1)
+
+    class FakeProcess:
+        exitcode = 0
+
+        def __init__(self, **kwargs):
+            pass
+
+        def start(self):
+            pass
+
+        def is_alive(self):
+            return False
+
+        def join(self):
+            pass
+
+    class FakeContext:
+        Queue = FakeQueue
+        Process = FakeProcess
+
+    monkeypatch.setattr(excel_process.mp, "get_context", lambda method: FakeContext)
+    header, columns, n = excel_process.read_sheet_in_process("fil.xlsx")
+    assert header == ["A"] and n == 1
+    assert list(columns[0]) == ["x"]
+
+
+class _Unpicklable(Exception):
+    def __init__(self):
+        super().__init__("kan ikke sendes")
+        self.lock = threading.Lock()
+
+
+def _failing_usecols(names):
+    raise _Unpicklable()
+
+
+def test_feil_som_ikke_kan_pickles_sendes_videre_som_tekst(tmp_path):
+    path = tmp_path / "fil.xlsx"
+    _write(path)
+    with pytest.raises(RuntimeError, match="kan ikke sendes"):
+        read_sheet_in_process(str(path), nrows=5, usecols=_failing_usecols)
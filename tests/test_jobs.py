@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from jobs import CancelToken, JobCancelled, JobScheduler
+
+
+def test_ny_jobb_paa_samme_plass_avbryter_den_forrige():
+    started, release = threading.Event(), threading.Event()
+    events = []
+
+    def slow(token):
+        started.set()
+        release.wait(5)
+        token.check()
+        return "gammel"
+
+    jobs = JobScheduler(workers=2)
+    jobs.submit(
+        "hovedbok", slow,
+        on_done=lambda r: events.append(r),
+        on_cancel=lambda: events.append("avbrutt"),
+    )
+    assert started.wait(5)
+    jobs.submit("hovedbok", lambda token: "ny", on_done=lambda r: events.append(r))
+    release.set()
+    assert jobs.wait(timeout=5)
+    jobs.shutdown()
+    assert sorted(events) == ["avbrutt", "ny"]
+
+
+def test_eksport_venter_paa_innlesing():
+    release = threading.Event()
+    order = []
+
+    def load(token):
+        release.wait(5)
+        order.append("last")
+
+    jobs = JobScheduler(workers=2)
+    jobs.submit("hovedbok", load, priority=10)
+    jobs.submit("eksport", lambda token: order.append("eksport"), after=("hovedbok",))
+    assert not jobs.wait("eksport", timeout=0.1)
+    release.set()
+    assert jobs.wait(timeout=5)
+    jobs.shutdown()
+    assert order == ["last", "eksport"]
+
+
+def test_prioritet_og_avbrudd_for_start():
+    gate = threading.Event()
+    order, cancelled = [], []
+    jobs = JobScheduler(workers=1)
+    jobs.submit("blokk", lambda token: gate.wait(5))
+    jobs.submit("lav", lambda token: order.append("lav"), priority=0)
+    jobs.submit("hoy", lambda token: order.append("hoy"), priority=10)
+    jobs.submit("borte", lambda token: order.append("borte"), on_cancel=lambda: cancelled.append(1))
+    jobs.cancel("borte")
+    gate.set()
+    assert jobs.wait(timeout=5)
+    jobs.shutdown()
+    assert order == ["hoy", "lav"]
+    assert cancelled == [1]
+
+
+def test_feil_sendes_til_on_error_via_dispatch():
+    posted = []
+    jobs = JobScheduler(workers=1, dispatch=lambda f, *a: posted.append((f, a)))
+    errors = []
+    jobs.submit("fakturaliste", lambda token: 1 / 0, on_error=errors.append)
+    assert jobs.wait(timeout=5)
+    jobs.shutdown()
+    assert errors == []
+    func, args = posted[0]
+    func(*args)
+    assert isinstance(errors[0], ZeroDivisionError)
+
+
+def test_cancel_token():
+    token = CancelToken()
+    token.check()
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(JobCancelled):
+        token.check()
+
+
+def test_index_worker_forkaster_eldre_generasjon():
+    from jobs import IndexWorker
+
+    handled = []
+
+    def handle(gen, idx):
+        with worker.lock:
+            if gen == worker.generation:
+                handled.append(idx)
+
+    worker = IndexWorker(handle, "test-indekser")
+    with worker.lock:
+        worker.put(1)
+        worker.reset()
+        worker.put(2)
+    worker.start()
+    worker.wait()
+    assert handled == [2]
+    assert worker.pending == 0
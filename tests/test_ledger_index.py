@@ -0,0 +1,23 @@
+import pandas as pd
+
+from data_utils import LedgerIndex, prepare_gl_df
+
+
+def test_ledger_index_samme_som_groupby_indices():
+    values = ["10", "2", "10", "", "2", "10", "7"]
+    index = LedgerIndex.build(values)
+    expected = pd.Series(values).to_frame("k").groupby("k").indices
+    assert len(index) == len(expected)
+    for key, rows in expected.items():
+        assert key in index
+        assert list(index.get(key)) == list(rows)
+    assert index.get("999") is None
+    assert "999" not in index
+
+
+def test_prepare_gl_df_bygger_ledger_index():
+    gl = pd.DataFrame({"Fakturanr": ["F-100", "100", "200"], "Beløp": ["1", "2", "3"]})
+    cols, index = prepare_gl_df(gl)
+    assert cols["invoice"] == "Fakturanr"
+    assert list(index.get("100")) == [0, 1]
+    assert list(index.get("200")) == [2]
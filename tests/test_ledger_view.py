@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+import pandas as pd
+
+from data_utils import build_ledger_view, prepare_gl_df
+from gui.ledger import ledger_hits, ledger_rows, ledger_total
+
+
+class DummyApp:
+    def __init__(self, gl):
+        cols, self.gl_index = prepare_gl_df(gl)
+        self.gl_df = gl
+        self.gl_view = build_ledger_view(gl, cols)
+
+
+def _gl():
+    return pd.DataFrame({
+        "Fakturanr": ["100", "100", "200"],
+        "Kontonr": ["4300", "", "2400 - Leverandørgjeld"],
+        "Kontonavn": ["Varekjøp", "2710 Inngående mva", None],
+        "Tekst": ["tekst", "tekst 2", "tekst 3"],
+        "Beskrivelse": [None, "beskrivelse", None],
+        "MVA-kode": ["1", "11", None],
+        "MVA-beløp": ["25", None, None],
+        "Debet": ["1 000,50", None, None],
+        "Kredit": [None, "250", "750,50"],
+        "Postert av": ["MK", "MK", None],
+    }, dtype=str)
+
+
+def test_ledger_rows_fra_forhandsberegnet_tabell():
+    app = DummyApp(_gl())
+    assert ledger_rows(app, "F-100") == [
+        {"Kontonr": "4300", "Konto": "Varekjøp", "Beskrivelse": "tekst", "MVA": "1",
+         "MVA-beløp": "25,00", "Beløp": "1 000,50", "Postert av": "MK"},
+        {"Kontonr": "2710", "Konto": "2710 Inngående mva", "Beskrivelse": "beskrivelse", "MVA": "11",
+         "MVA-beløp": "", "Beløp": "-250,00", "Postert av": "MK"},
+    ]
+    rows = ledger_rows(app, "200")
+    assert rows[0]["Kontonr"] == "2400 - Leverandørgjeld"
+    assert rows[0]["Konto"] == "Leverandørgjeld"
+    assert ledger_total(ledger_hits(app, "100")) == Decimal("750.50")
+    assert ledger_rows(app, "999") == []
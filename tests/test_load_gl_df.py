@@ -25,3 +25,136 @@ def test_load_gl_df_detects_header(tmp_path):
     _write_gl(path2, header_row=5)
     df2 = load_gl_df(str(path2))
     assert list(df2.columns) == ["A", "B"]
+
+
+def test_load_gl_df_samme_resultat_som_read_excel(tmp_path):
+    import datetime
+    import pandas as pd
+    from openpyxl import Workbook
+
+    path = tmp_path / "gl.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Hovedbok"])
+    ws.append([])
+    ws.append(["Bilag", "Konto", None, "Beløp", "Beløp", "Dato"])
+    ws.append([1001, "4300 Varekjøp", None, 100.0, 1.5, datetime.datetime(2024, 1, 2)])
+    ws.append([])
+    ws.append(["1002", None, "x", -3, "1 234,50", True, None, "ekstra"])
+    ws.append([])
+    wb.save(path)
+
+    df = load_gl_df(str(path))
+    expected = pd.read_excel(path, engine="openpyxl", header=2, dtype=str)
+    assert list(df.columns) == list(expected.columns)
+    assert df.astype(object).equals(expected.astype(object))
+
+
+def test_load_gl_df_rapporterer_framdrift(tmp_path, monkeypatch):
+    import data_utils
+
+    monkeypatch.setattr(data_utils, "PROGRESS_EVERY", 2)
+    path = tmp_path / "gl.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["A", "B"])
+    for i in range(5):
+        ws.append([i, i])
+    wb.save(path)
+
+    calls = []
+    load_gl_df(str(path), progress=lambda done, total=None: calls.append((done, total)))
+    assert calls == [(3, 6), (5, 6), (6, 6)]
+
+
+def test_load_invoice_df_samme_resultat_som_read_excel(tmp_path):
+    import datetime
+    import pandas as pd
+    from data_utils import load_invoice_df
+
+    path = tmp_path / "faktura.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Fakturaliste"])
+    ws.append(["Kunde: Eksempel AS"])
+    ws.append([])
+    ws.append([None, "periode"])
+    ws.append(["Fakturanr", "Dato", "Netto", None, "Netto"])
+    ws.append([1001, datetime.datetime(2024, 1, 2), 100.0, None, "1 234,50"])
+    ws.append([])
+    ws.append(["1002", None, -3.25, None, None, None, "x"])
+    ws.append(["Sum", None, 97])
+    ws.append([])
+    wb.save(path)
+
+    df, kunde = load_invoice_df(str(path), header_idx=4)
+    raw = pd.read_excel(path, engine="openpyxl", header=None, dtype=str)
+    expected = raw.iloc[5:].reset_index(drop=True)
+    expected.columns = raw.iloc[4]
+    assert kunde == "Eksempel AS"
+    assert list(map(str, df.columns)) == list(map(str, expected.columns))
+    assert df.astype(object).equals(expected.astype(object))
+
+
+def _write_wide_gl(path):
+    import datetime
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Hovedbok", None, None, None, None, None, None, None])
+    ws.append(["Bilag", "Fakturanr", "Ubrukt", "Kontonr", "Kontonavn", "Fakturadato", "Beløp", "Ubrukt"])
+    ws.append([1, "1001", "x", 4300, "Varekjøp", datetime.datetime(2024, 1, 2), 100.5, "y"])
+    ws.append([2, None, "x", 2400, None, None, -100.5, None])
+    ws.append([])
+    ws.append([3, "1002", None, None, None, None, 1.0, "z"])
+    ws.append([None, None, "bare ubrukt", None, None, None, None, None])
+    wb.save(path)
+
+
+def test_load_gl_df_med_kolonneutvalg(tmp_path, monkeypatch):
+    import data_utils
+    from data_utils import gl_usecols, prepare_gl_df
+
+    path = tmp_path / "gl.xlsx"
+    _write_wide_gl(path)
+    full = load_gl_df(str(path))
+    df = load_gl_df(str(path), usecols=gl_usecols)
+    assert list(df.columns) == ["Bilag", "Fakturanr", "Kontonr", "Kontonavn", "Fakturadato", "Beløp"]
+    # Rader med innhold bare i ubrukte kolonner tas ikke med på slutten
+    expected = full[df.columns].iloc[:4]
+    assert df.astype(object).equals(expected.astype(object))
+    assert prepare_gl_df(df.copy())[0] == prepare_gl_df(full)[0]
+
+    # Uten den interne parseren gir reserveløsningen samme resultat
+    def missing():
+        raise ImportError("ingen parser")
+
+    monkeypatch.setattr(data_utils, "_projected_parser_cls", missing)
+    assert load_gl_df(str(path), usecols=gl_usecols).equals(df)
+    assert load_gl_df(str(path), usecols=gl_usecols, in_process=True).equals(df)
+
+
+def test_kolonneutvalg_faller_tilbake_nar_parseren_gir_feil(tmp_path, monkeypatch):
+    import data_utils
+    from data_utils import gl_usecols
+
+    path = tmp_path / "gl.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Bilag", "Fakturanr", "Ubrukt", "Kontonr", "Beløp"])
+    for i in range(30):
+        ws.append([i, str(1000 + i), "x", 4300, i + 0.5])
+    wb.save(path)
+    expected = load_gl_df(str(path), usecols=gl_usecols)
+
+    # En annen openpyxl-versjon kan tolke cellene annerledes
+    real = data_utils._projected_parser_cls()
+
+    class Changed(real):
+        def parse_cell(self, element):
+            return {"value": "feil"}
+
+    monkeypatch.setattr(data_utils, "_projected_parser_cls", lambda: Changed)
+    df = load_gl_df(str(path), usecols=gl_usecols)
+    assert df.equals(expected)
+    assert "feil" not in set(df["Fakturanr"])
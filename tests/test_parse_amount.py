@@ -5,3 +5,26 @@ from helpers import parse_amount
 def test_parse_amount_parenteser():
     assert parse_amount("(123)") == Decimal("-123")
     assert parse_amount("(123,45)") == Decimal("-123.45")
+
+
+def test_parse_amount_series_samme_som_parse_amount():
+    import pandas as pd
+    from helpers import parse_amount_series
+
+    vals = [
+        "100", "100.0", " 1 234,50 ", "1\xa0234,5", "(123)", "(123,45)",
+        "123-", "12.5-", "abc", "", "nan", None, "1e3", "+5", ".5", "(.5)",
+        "1.000,00", "-", 12.5, 7,
+    ]
+    got = parse_amount_series(pd.Series(vals, dtype=object)).tolist()
+    assert got == [parse_amount(v) for v in vals]
+
+
+def test_ore_til_decimal_er_eksakt():
+    from helpers import ore_to_decimal, to_ore, fmt_ore
+
+    assert ore_to_decimal(123456) == Decimal("1234.56")
+    assert ore_to_decimal(-5) == Decimal("-0.05")
+    assert to_ore(Decimal("1234.56")) == 123456
+    assert fmt_ore(123456) == "1 234,56"
+    assert fmt_ore(None) == ""
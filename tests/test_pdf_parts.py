@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+import report
+from session import Session
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _session(n):
+    session = Session()
+    session.kunde = "Eksempel AS"
+    session.sample_df = pd.DataFrame(
+        {"Fakturanr": [str(100000 + i) for i in range(n)], "Beløp": ["1 000,00"] * n}
+    )
+    session.df = session.sample_df
+    session.invoice_col = "Fakturanr"
+    session.decisions = ["Godkjent"] * (n - 1) + ["Ikke godkjent"]
+    session.comments = [""] * (n - 1) + ["Mangler vedlegg"]
+    return session
+
+
+class FakeApp:
+    def __init__(self, n):
+        self.session = _session(n)
+        self.messages = []
+
+    def _show_inline(self, msg, ok=True):
+        self.messages.append((msg, ok))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pdf_skrives_i_deler_og_slas_sammen(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(report, "SECTION_CHUNK", 3)
+    monkeypatch.setattr(report, "PDF_WORKERS", workers)
+    monkeypatch.setattr(report, "PARALLEL_MIN_SECTIONS", 0)
+    monkeypatch.setattr(report.webbrowser, "open", lambda *a, **k: None)
+    app = FakeApp(7)
+    seen = []
+    out = tmp_path / "rapport.pdf"
+
+    report.export_pdf(app, str(out), progress=lambda d, t, m: seen.append((d, t, m)))
+
+    reader = pypdf.PdfReader(str(out), strict=True)
+    # Oppsummering på første side, deretter ett bilag per side
+    assert len(reader.pages) == 8
+    assert "Eksempel AS" in reader.pages[0].extract_text()
+    assert "Bilag 1/7" in reader.pages[1].extract_text()
+    assert "Bilag 7/7" in reader.pages[7].extract_text()
+    assert "Mangler vedlegg" in reader.pages[7].extract_text()
+    assert seen[-1] == (7, 7, "Slår sammen PDF...")
+    assert app.messages == [("Lagret PDF: rapport.pdf", True)]
+
+
+def test_ferdige_bilag_hentes_fra_fragmenter(tmp_path, monkeypatch):
+    from report_cache import FragmentCache
+
+    monkeypatch.setattr(report, "SECTION_CHUNK", 3)
+    session = _session(7)
+    fragments = FragmentCache()
+    for i in (0, 1, 4):
+        fragments.submit(report.bilag_section(session, i, 7))
+    fragments.wait()
+    # Bilag 2 endres etter utlegg og må legges ut på nytt
+    session.comments[1] = "Endret"
+
+    rendered = []
+    render_part = report.render_part
+
+    def counting_render(path, sections, *args):
+        rendered.extend(s["index"] for s in sections)
+        return render_part(path, sections, *args)
+
+    monkeypatch.setattr(report, "render_part", counting_render)
+    out = tmp_path / "rapport.pdf"
+    pages = report.write_report(session, str(out), fragments=fragments)
+    fragments.close()
+
+    assert rendered == [1, 2, 3, 5, 6]
+    assert pages == 8
+    reader = pypdf.PdfReader(str(out), strict=True)
+    assert [f"Bilag {i}/7" in reader.pages[i].extract_text() for i in range(1, 8)] == [True] * 7
+    assert "Endret" in reader.pages[2].extract_text()
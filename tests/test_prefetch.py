@@ -0,0 +1,43 @@
+import threading
+
+from gui.prefetch import RenderPrefetcher
+
+
+def test_prefetcher_bygger_nabobilag():
+    built = []
+    prefetcher = RenderPrefetcher(lambda i: built.append(i) or {"idx": i}, radius=2)
+    prefetcher.schedule(5, total=7)
+    prefetcher.wait()
+    assert sorted(built) == [3, 4, 6]
+    assert prefetcher.get(6) == {"idx": 6}
+    assert prefetcher.get(5) is None
+
+    # Allerede beregnede bilag bygges ikke på nytt
+    prefetcher.schedule(5, total=7)
+    prefetcher.wait()
+    assert sorted(built) == [3, 4, 6]
+
+
+def test_prefetcher_begrenset_buffer():
+    prefetcher = RenderPrefetcher(lambda i: {"idx": i}, radius=1, maxsize=2)
+    for i in range(3):
+        prefetcher.put(i, {"idx": i})
+    assert prefetcher.get(0) is None
+    assert prefetcher.get(2) == {"idx": 2}
+
+
+def test_prefetcher_clear_forkaster_pagaende_jobb():
+    started, release = threading.Event(), threading.Event()
+
+    def build(i):
+        started.set()
+        release.wait(5)
+        return {"idx": i}
+
+    prefetcher = RenderPrefetcher(build, radius=1)
+    prefetcher.schedule(0, total=2)
+    assert started.wait(5)
+    prefetcher.clear()
+    release.set()
+    prefetcher.wait()
+    assert prefetcher.get(1) is None
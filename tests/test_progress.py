@@ -0,0 +1,75 @@
+import threading
+
+from progress import ProgressChannel, fmt_eta
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_kanal_gir_siste_tilstand_og_eta():
+    clock = FakeClock()
+    channel = ProgressChannel("Laster hovedbok...", clock=clock)
+    assert channel.snapshot().fraction is None
+    assert channel.snapshot() is None
+
+    clock.now = 2.0
+    channel(100, 1000)
+    channel(250, 1000)
+    state = channel.snapshot()
+    assert state.done == 250
+    assert state.fraction == 0.25
+    assert state.eta == 6.0
+    assert channel.snapshot() is None
+
+    # Ny melding starter en ny fase med egen ETA
+    channel(0, 10, "Skriver PDF...")
+    state = channel.snapshot()
+    assert state.message == "Skriver PDF..."
+    assert state.eta is None
+
+
+def test_kanal_kan_kalles_fra_flere_traader():
+    channel = ProgressChannel()
+    threads = [
+        threading.Thread(target=lambda: [channel(i, 1000) for i in range(1000)])
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert channel.snapshot().total == 1000
+
+
+def test_fmt_eta():
+    assert fmt_eta(None) == ""
+    assert fmt_eta(0.2) == "ca. 1 s"
+    assert fmt_eta(42) == "ca. 42 s"
+    assert fmt_eta(300) == "ca. 5 min"
+
+
+def test_kanal_avbryter_innlesing(tmp_path, monkeypatch):
+    import pytest
+    from openpyxl import Workbook
+    import data_utils
+    from jobs import CancelToken, JobCancelled
+
+    monkeypatch.setattr(data_utils, "PROGRESS_EVERY", 2)
+    path = tmp_path / "gl.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["A", "B"])
+    for i in range(10):
+        ws.append([i, i])
+    wb.save(path)
+
+    token = CancelToken()
+    channel = ProgressChannel("Laster hovedbok...", token=token)
+    token.cancel()
+    with pytest.raises(JobCancelled):
+        data_utils.load_gl_df(str(path), progress=channel)
@@ -0,0 +1,74 @@
+from report_cache import FragmentCache, section_key
+
+
+def _section(idx, decision="Godkjent", comment=""):
+    return {"index": idx, "total": 3, "invoice": str(idx), "fields": [], "decision": decision, "comment": comment, "ledger": None}
+
+
+def _fake_render(calls):
+    def render(path, sections):
+        calls.append([s["decision"] for s in sections])
+        with open(path, "w") as fh:
+            fh.write(sections[0]["decision"])
+
+    return render
+
+
+def test_fragment_hentes_bare_med_samme_nokkel(tmp_path):
+    calls = []
+    cache = FragmentCache(_fake_render(calls))
+    cache.submit(_section(0))
+    cache.wait()
+
+    dest = tmp_path / "del.pdf"
+    assert cache.fetch(_section(0), str(dest))
+    assert dest.read_text() == "Godkjent"
+    assert not cache.fetch(_section(0, comment="Ny"), str(dest))
+    assert not cache.fetch(_section(1), str(dest))
+    assert section_key(_section(0)) != section_key(_section(0, "Ikke godkjent"))
+    # Bilagslinjene inngår ikke i nøkkelen, se ``FragmentCache.clear``
+    assert section_key({**_section(0), "ledger": ([], "0,00")}) == section_key(_section(0))
+
+    # Samme data legges ikke ut på nytt
+    cache.submit(_section(0))
+    cache.wait()
+    assert calls == [["Godkjent"]]
+    cache.close()
+
+
+def test_clear_forkaster_fragmenter(tmp_path):
+    cache = FragmentCache(_fake_render([]))
+    cache.submit(_section(0))
+    cache.wait()
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+    assert not cache.fetch(_section(0), str(tmp_path / "del.pdf"))
+    cache.close()
+
+
+def test_bilagslinjer_hentes_i_bakgrunnstraden(tmp_path):
+    import threading
+
+    threads, rendered = [], []
+
+    def prepare(section):
+        threads.append(threading.current_thread().name)
+        return {**section, "ledger": ([], "0,00")}
+
+    def render(path, sections):
+        rendered.append(sections[0]["ledger"])
+        open(path, "w").close()
+
+    cache = FragmentCache(render, prepare=prepare)
+    cache.submit(_section(0))
+    cache.wait()
+    assert threads == ["pdf-fragmenter"]
+    assert rendered == [([], "0,00")]
+
+    # Uendret bilag sendes ikke til bakgrunnstråden igjen
+    cache.submit(_section(0))
+    assert cache._worker.pending == 0
+    cache.wait()
+    assert threads == ["pdf-fragmenter"]
+    cache.close()
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pandas as pd
+
+from data_utils import ReviewStats, calc_sum_kontrollert
+
+
+def _sample():
+    return pd.DataFrame({
+        "Faktura": [1, 2, 3, 4],
+        "_netto_ore": pd.array([10000, 2550, None, -500], dtype="Int64"),
+    })
+
+
+def test_review_stats_oppdateres_inkrementelt():
+    sample = _sample()
+    stats = ReviewStats.from_sample(sample)
+    assert stats.count(None) == 4
+    assert stats.sum_for(None) == Decimal("120.50")
+
+    decisions = [None] * 4
+    for idx, dec in [(0, "Godkjent"), (1, "Ikke godkjent"), (3, "Godkjent"), (0, "Ikke godkjent")]:
+        decisions[idx] = dec
+        stats.record(idx, dec)
+
+    assert stats.count("Godkjent") == 1
+    assert stats.count("Ikke godkjent") == 2
+    assert stats.count(None) == 1
+    assert stats.sum_for("Ikke godkjent") == Decimal("125.50")
+    assert stats.sum_for("Godkjent") == Decimal("-5.00")
+    assert stats.sum_kontrollert == calc_sum_kontrollert(sample, decisions)
+
+
+def test_review_stats_fra_eksisterende_beslutninger():
+    stats = ReviewStats.from_sample(_sample(), ["Godkjent", None, "Godkjent", None])
+    assert stats.count("Godkjent") == 2
+    assert stats.sum_for("Godkjent") == Decimal("100.00")
+    assert stats.sum_for(None) == Decimal("20.50")
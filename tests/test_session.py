@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent / "benchmarks"))
+
+from synthetic import write_invoice_list, write_ledger
+
+from data_utils import load_invoice_data, load_invoice_df
+from session import Session
+
+
+def _session(tmp_path, **kwargs):
+    invoice_path = tmp_path / "fakturaliste.xlsx"
+    gl_path = tmp_path / "hovedbok.xlsx"
+    write_invoice_list(invoice_path, 30, seed=3)
+    write_ledger(gl_path, 60, invoices=30, seed=3)
+    return Session.from_files(str(invoice_path), str(gl_path), use_cache=False, **kwargs)
+
+
+def test_session_uten_gui_leser_trekker_og_registrerer(tmp_path):
+    session = _session(tmp_path)
+    assert session.has_invoices
+    assert session.invoice_col and session.gl_view is not None
+    assert session.gl_cols["invoice"] == "Fakturanr"
+
+    sample = session.make_sample(5, 2024)
+    df, _ = load_invoice_df(str(tmp_path / "fakturaliste.xlsx"))
+    expected = df.sample(n=5, random_state=2024)
+    assert list(sample[session.invoice_col]) == list(expected[session.invoice_col])
+    assert session.decisions == [None] * 5 and session.comments == [""] * 5
+
+    session.record(0, "Godkjent")
+    session.record(1, "Ikke godkjent")
+    assert session.decisions[:2] == ["Godkjent", "Ikke godkjent"]
+    assert session.review.counts["Godkjent"] == 1
+    assert session.review.counts[None] == 3
+
+    hits = session.ledger_hits(sample.iloc[0][session.invoice_col])
+    assert hits is not None and len(hits) > 0
+
+
+def test_ny_fakturaliste_forkaster_utvalget(tmp_path):
+    session = _session(tmp_path)
+    session.make_sample(5, 2024)
+    session.record(0, "Godkjent")
+
+    assert session.kunde == "Eksempel Regnskap AS"
+
+    # En liste uten kundenavn skal ikke arve navnet fra forrige liste
+    data = load_invoice_data(str(tmp_path / "fakturaliste.xlsx"))
+    session.set_invoice_data({**data, "kunde": None})
+
+    assert session.kunde == ""
+    assert session.sample_df is None
+    assert session.decisions == [] and session.review is None
@@ -0,0 +1,50 @@
+import sys
+
+from jobs import CancelToken
+from startup import ImportProfiler, parse_args, warm_up
+
+
+def test_warm_up_importerer_og_hopper_over_manglende(tmp_path, monkeypatch):
+    (tmp_path / "oppvarm_a.py").write_text("X = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "oppvarm_a", raising=False)
+
+    timings = warm_up(("oppvarm_a", "finnes_ikke_modul"))
+
+    assert list(timings) == ["oppvarm_a"]
+    assert "oppvarm_a" in sys.modules
+
+
+def test_warm_up_stopper_ved_avbrudd():
+    token = CancelToken()
+    token.cancel()
+    assert warm_up(("json",), token) == {}
+
+
+def test_import_profiler_maler_nye_importer(tmp_path, monkeypatch):
+    (tmp_path / "profil_b.py").write_text("import profil_c\n")
+    (tmp_path / "profil_c.py").write_text("Y = 2\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("profil_b", "profil_c"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    profiler = ImportProfiler()
+    profiler.install()
+    try:
+        warm_up(("profil_b", "json"))
+        profiler.mark("ferdig")
+    finally:
+        profiler.uninstall()
+
+    depths = {name: depth for name, _, depth in profiler.imports}
+    assert depths["profil_b"] == 0
+    assert depths["profil_c"] == 1
+    # Allerede importerte moduler måles ikke
+    assert "json" not in depths
+    assert profiler.marks[0][0] == "ferdig"
+    profiler.report(min_seconds=0)
+
+
+def test_parse_args_profile_startup():
+    assert parse_args(["--profile-startup"]).profile_startup
+    assert not parse_args([]).profile_startup
@@ -18,7 +18,7 @@ class DummyWidget:
 class FakeApp:
     def __init__(self):
         self.df = pd.DataFrame({'Faktura':[1], 'Beløp':[Decimal('100')]})
-        self.df['_netto_float'] = self.df['Beløp']
+        self.df['_netto_ore'] = pd.array([10000], dtype="Int64")
         self.sample_df = self.df.copy()
         self.idx = 0
         self.invoice_col = 'Faktura'
@@ -0,0 +1,53 @@
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent / "benchmarks"))
+
+from synthetic import fmt_no, write_invoice_list, write_ledger
+
+from data_utils import (
+    calc_sum_net_all,
+    gl_usecols,
+    load_gl_df,
+    load_invoice_df,
+    prepare_gl_df,
+    prepare_invoice_df,
+)
+from helpers import parse_amount
+
+
+def test_fmt_no():
+    assert fmt_no(-12345.6) == "-12 345,60"
+    assert fmt_no(1234.5, nbsp=True) == "1\xa0234,50"
+    assert parse_amount(fmt_no(98765.43)) == Decimal("98765.43")
+
+
+def test_syntetisk_fakturaliste_leses_som_eksport(tmp_path):
+    path = tmp_path / "fakturaliste.xlsx"
+    write_invoice_list(path, 50, subtotals=True)
+
+    df, kunde = load_invoice_df(str(path))
+    invoice_col, net_col = prepare_invoice_df(df)
+
+    assert kunde == "Eksempel Regnskap AS"
+    assert (invoice_col, net_col) == ("Fakturanr", "Beløp eks. mva")
+    assert df["_sum_row"].sum() == len(df) - 50
+    # Summen av fakturaene stemmer med totalsummen på siste rad
+    total = parse_amount(df[net_col].iloc[-1])
+    assert calc_sum_net_all(df) == total
+
+
+def test_syntetisk_hovedbok_matcher_fakturaer(tmp_path):
+    path = tmp_path / "hovedbok.xlsx"
+    n = write_ledger(path, 40, invoices=10, layout="amount", extra_cols=2)
+
+    full = load_gl_df(str(path))
+    gl = load_gl_df(str(path), usecols=gl_usecols)
+    cols, index = prepare_gl_df(gl)
+
+    assert len(full) == n - 5
+    assert "Dimensjon 1" in full.columns and "Dimensjon 1" not in gl.columns
+    assert cols["amount"] == "Beløp" and cols["debit"] is None
+    assert len(index.get("100003")) >= 2
+    assert full["Bilagsnr"].iloc[-1] == "Sum"
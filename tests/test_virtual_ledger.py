@@ -0,0 +1,89 @@
+from gui.ledger import VirtualTreeview
+
+
+class FakeTree:
+    def __init__(self, height=5):
+        self.items = {}
+        self.order = []
+        self._next = 0
+        self._height = height
+
+    def __getitem__(self, key):
+        assert key == "columns"
+        return ("Konto", "Beløp")
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def winfo_height(self):
+        return 1
+
+    def cget(self, key):
+        assert key == "height"
+        return self._height
+
+    def get_children(self, parent=""):
+        return tuple(self.order)
+
+    def insert(self, parent, index, values=(), tags=()):
+        iid = f"I{self._next}"
+        self._next += 1
+        self.items[iid] = (tuple(values), tuple(tags))
+        self.order.append(iid)
+        return iid
+
+    def item(self, iid, values=(), tags=()):
+        self.items[iid] = (tuple(values), tuple(tags))
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.order.remove(iid)
+            del self.items[iid]
+
+    def shown(self):
+        return [self.items[i][0] for i in self.order]
+
+
+class FakeScrollbar:
+    def configure(self, **kwargs):
+        self.command = kwargs.get("command")
+
+    def set(self, first, last):
+        self.pos = (first, last)
+
+
+def test_virtuell_visning_viser_bare_synlige_rader():
+    tree, bar = FakeTree(height=5), FakeScrollbar()
+    grid = VirtualTreeview(tree, bar)
+    rows = [(str(i), f"{i},00") for i in range(1000)]
+    grid.set_rows(rows)
+    assert tree.shown() == rows[:5]
+    assert bar.pos == (0.0, 0.005)
+
+    ids = tree.get_children()
+    bar.command("moveto", "0.5")
+    assert tree.shown() == rows[500:505]
+    # Elementene gjenbrukes ved rulling
+    assert tree.get_children() == ids
+    assert tree.items[ids[0]][1] == ("even",)
+
+    grid.yview("scroll", 1, "pages")
+    assert tree.shown() == rows[505:510]
+    assert tree.items[ids[0]][1] == ("odd",)
+
+    grid.yview("moveto", "1.0")
+    assert tree.shown() == rows[-5:]
+
+    grid.set_rows(rows[:2])
+    assert tree.shown() == rows[:2]
+    assert len(tree.get_children()) == 2
+
+
+def test_virtuell_visning_sorterer_blandede_verdier():
+    tree = FakeTree(height=10)
+    grid = VirtualTreeview(tree)
+    grid.set_rows([("a", "10,00"), ("b", ""), ("c", "-5,00"), ("d", "2 000,00")])
+    grid.sort("Beløp")
+    assert [r[0] for r in tree.shown()] == ["c", "a", "d", "b"]
+    grid.sort("Konto", reverse=True)
+    assert [r[0] for r in tree.shown()] == ["d", "c", "b", "a"]